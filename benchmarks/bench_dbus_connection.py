@@ -0,0 +1,87 @@
+"""Per-send latency of LinuxNotifier: open-per-call vs. the pooled connection.
+
+Runs against a private dbus-daemon and a fake notification server, so it
+never touches the desktop session. From the repository root:
+
+    python -m benchmarks.bench_dbus_connection [--sends 500]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from jeepney import new_method_call
+from jeepney.io.blocking import open_dbus_connection
+from loguru import logger
+
+from tests.fake_notification_server import FakeNotificationServer, PrivateSessionBus
+
+
+def _notify_message(address, index):
+    return new_method_call(
+        address,
+        "Notify",
+        "susssasa{sv}i",
+        ("bench", 0, "", f"Title {index}", "Message", [], {}, -1),
+    )
+
+
+def bench_open_per_call(sends):
+    """The pre-pool behaviour: connect, authenticate, Hello, Notify, close."""
+    from notifypy.os_notifiers._dbus import NOTIFICATIONS_ADDRESS
+
+    timings = []
+    for index in range(sends):
+        started = time.perf_counter()
+        connection = open_dbus_connection(bus="SESSION")
+        connection.send_and_get_reply(
+            _notify_message(NOTIFICATIONS_ADDRESS, index), timeout=2
+        )
+        connection.close()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_pooled(sends):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier()
+    timings = []
+    for index in range(sends):
+        started = time.perf_counter()
+        notifier.send_notification(
+            notification_title=f"Title {index}",
+            notification_subtitle="Message",
+            notification_icon="",
+            notification_audio=None,
+            application_name="bench",
+        )
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _report(name, timings):
+    timings = sorted(timings)
+    print(
+        f"{name:<16} mean {statistics.mean(timings) * 1e6:9.1f} us"
+        f"  p50 {timings[len(timings) // 2] * 1e6:9.1f} us"
+        f"  p95 {timings[int(len(timings) * 0.95)] * 1e6:9.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sends", type=int, default=500)
+    arguments = parser.parse_args()
+    logger.disable("notifypy")
+
+    with PrivateSessionBus() as bus:
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = bus.address
+        with FakeNotificationServer():
+            _report("open-per-call", bench_open_per_call(arguments.sends))
+            _report("pooled", bench_pooled(arguments.sends))
+
+
+if __name__ == "__main__":
+    main()
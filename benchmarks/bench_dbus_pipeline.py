@@ -0,0 +1,67 @@
+"""Notify throughput (notifications/sec): one round-trip per call vs. pipelined.
+
+Runs against a private dbus-daemon and a fake notification server, so it
+never touches the desktop session. From the repository root:
+
+    python -m benchmarks.bench_dbus_pipeline [--notifications 2000] [--window 64]
+"""
+
+import argparse
+import os
+import time
+
+from loguru import logger
+
+from tests.fake_notification_server import FakeNotificationServer, PrivateSessionBus
+
+
+def _notifications(amount):
+    for index in range(amount):
+        yield dict(
+            notification_title=f"Title {index}",
+            notification_subtitle="Message",
+            notification_icon="",
+            notification_audio=None,
+            application_name="bench",
+        )
+
+
+def bench_round_trip(notifier, amount):
+    started = time.perf_counter()
+    for notification in _notifications(amount):
+        notifier.send_notification(**notification)
+    return amount / (time.perf_counter() - started)
+
+
+def bench_pipelined(notifier, amount):
+    started = time.perf_counter()
+    for _ in notifier.notify_many(_notifications(amount)):
+        pass
+    return amount / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=64)
+    arguments = parser.parse_args()
+    logger.disable("notifypy")
+
+    with PrivateSessionBus() as bus:
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = bus.address
+        with FakeNotificationServer():
+            from notifypy.os_notifiers.linux import LinuxNotifier
+
+            notifier = LinuxNotifier(linux_dbus_pipeline_window=arguments.window)
+            # Open the pooled connection before timing.
+            bench_round_trip(notifier, 1)
+
+            round_trip = bench_round_trip(notifier, arguments.notifications)
+            pipelined = bench_pipelined(notifier, arguments.notifications)
+
+    print(f"round-trip  {round_trip:10.0f} notifications/sec")
+    print(f"pipelined   {pipelined:10.0f} notifications/sec")
+
+
+if __name__ == "__main__":
+    main()
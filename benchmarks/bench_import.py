@@ -0,0 +1,51 @@
+"""`import notifypy` time, measured with `python -X importtime`.
+
+Exits with status 1 when the median cumulative import time is above the
+threshold, so it can guard against import-time regressions. From the
+repository root:
+
+    python -m benchmarks.bench_import [--runs 20] [--threshold-ms 25]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def measure_import_time(module="notifypy"):
+    """Cumulative import time of the module in microseconds, in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    ).stderr.decode("utf-8")
+
+    for line in output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        if name.rstrip() == f" {module}":
+            return int(cumulative)
+    raise RuntimeError(f"{module} was not imported.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--threshold-ms", type=float, default=25)
+    arguments = parser.parse_args()
+
+    timings = [measure_import_time() / 1000 for _ in range(arguments.runs)]
+    median = statistics.median(timings)
+    print(
+        f"import notifypy  median {median:.1f} ms  min {min(timings):.1f} ms"
+        f"  max {max(timings):.1f} ms  (threshold {arguments.threshold_ms:.1f} ms)"
+    )
+    if median > arguments.threshold_ms:
+        print("import time regression!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Windows toast script generation cost (µs/notification): ElementTree vs. template.
+
+Only builds the PowerShell script, so it runs on any platform. From the
+repository root:
+
+    python -m benchmarks.bench_windows_template [--notifications 20000]
+"""
+
+import argparse
+import time
+
+from notifypy.os_notifiers.windows import WindowsNotifier
+from tests.test_windows_template import reference_toast_script
+
+
+def _arguments(amount):
+    return [
+        (
+            "Python Application (notify.py)",
+            f"Build #{index} finished",
+            "All 1234 tests passed & the wheel <notifypy> was uploaded.",
+            "C:\\Users\\me\\AppData\\notifypy\\py-logo.png",
+            None,
+        )
+        for index in range(amount)
+    ]
+
+
+def bench(generate, arguments):
+    started = time.perf_counter()
+    for notification in arguments:
+        generate(*notification)
+    return (time.perf_counter() - started) / len(arguments) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=20000)
+    arguments = _arguments(parser.parse_args().notifications)
+
+    elementtree = bench(reference_toast_script, arguments)
+    template = bench(WindowsNotifier._generate_toast_script, arguments)
+
+    print(f"elementtree {elementtree:8.2f} µs/notification")
+    print(f"template    {template:8.2f} µs/notification")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""Send hot path benchmark suite, with JSON results and baseline comparison.
+
+Measures Notify construction, per-send overhead with a no-op notifier,
+dispatcher round trips, LinuxNotifier against a private dbus-daemon and fake
+notification server, and the subprocess backends against stub binaries.
+Reports latency percentiles and memory, and never touches the desktop
+session. From the repository root:
+
+    python -m benchmarks.suite [--output results.json] [--baseline baseline.json]
+                               [--tolerance 0.25] [--iterations 2000] [--only send]
+
+With --baseline, exits with status 1 if a benchmark's median latency (or the
+memory it retains per operation) regressed by more than the tolerance.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import stat
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from loguru import logger
+
+import notifypy
+from notifypy import BaseNotifier
+
+# Benchmarks as (name, context manager factory, iterations divisor), in run order.
+BENCHMARKS = []
+
+
+class Skip(Exception):
+    """Raised by a benchmark that can't run here."""
+
+
+def benchmark(name, divisor=1):
+    """Registers a context manager yielding the operation to measure.
+
+    Slow (subprocess) benchmarks run iterations // divisor times.
+    """
+
+    def register(function):
+        BENCHMARKS.append((name, contextlib.contextmanager(function), divisor))
+        return function
+
+    return register
+
+
+class NoOpNotifier(BaseNotifier):
+    def __init__(self, **kwargs):
+        pass
+
+    def send_notification(self, **kwargs):
+        return True
+
+
+def _notifier_kwargs(index=0):
+    return dict(
+        notification_title=f"Title {index}",
+        notification_subtitle="Message",
+        notification_icon="",
+        notification_audio=None,
+        application_name="bench",
+    )
+
+
+def _stub(directory, name, script="exit 0"):
+    """An executable shell script standing in for a binary."""
+    path = os.path.join(directory, name)
+    with open(path, "w") as stub:
+        stub.write(f"#!/bin/sh\n{script}\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+@benchmark("notify_construction")
+def bench_notify_construction():
+    yield lambda: notifypy.Notify(use_custom_notifier=NoOpNotifier)
+
+
+@benchmark("notification_snapshot")
+def bench_notification_snapshot():
+    notification = notifypy.Notify(use_custom_notifier=NoOpNotifier)
+
+    def operation():
+        notification.title = "Changed"
+        return notification.notification
+
+    yield operation
+
+
+@benchmark("send_overhead")
+def bench_send_overhead():
+    """Notify's own cost per send, in the calling thread."""
+    notification = notifypy.Notify(use_custom_notifier=NoOpNotifier)
+    snapshot = notification.notification
+    yield lambda: notification._send(snapshot)
+
+
+@benchmark("send_instrumented")
+def bench_send_instrumented():
+    from notifypy.instrumentation import instrumentation
+
+    notification = notifypy.Notify(use_custom_notifier=NoOpNotifier)
+    snapshot = notification.notification
+    enabled = instrumentation.enabled
+    instrumentation.enable()
+    try:
+        yield lambda: notification._send(snapshot)
+    finally:
+        instrumentation.enabled = enabled
+
+
+@benchmark("dispatch_round_trip")
+def bench_dispatch_round_trip():
+    """send(): queued on the dispatcher, sent by a worker thread, waited for."""
+    from notifypy import NotificationDispatcher
+
+    dispatcher = NotificationDispatcher(max_workers=1)
+    notification = notifypy.Notify(
+        use_custom_notifier=NoOpNotifier, dispatcher=dispatcher
+    )
+    try:
+        yield notification.send
+    finally:
+        dispatcher.shutdown()
+
+
+@benchmark("dispatch_submit")
+def bench_dispatch_submit():
+    """send(block=False): the caller's share of a non-blocking send."""
+    from notifypy import NotificationDispatcher
+
+    dispatcher = NotificationDispatcher(max_workers=1, max_queue_size=1 << 20)
+    notification = notifypy.Notify(
+        use_custom_notifier=NoOpNotifier, dispatcher=dispatcher
+    )
+    try:
+        yield lambda: notification.send(block=False)
+    finally:
+        dispatcher.shutdown()
+
+
+@benchmark("linux_dbus")
+def bench_linux_dbus():
+    from tests.fake_notification_server import (
+        FakeNotificationServer,
+        PrivateSessionBus,
+        dbus_available,
+    )
+
+    if not dbus_available():
+        raise Skip("jeepney and dbus-daemon are required")
+
+    address = os.environ.get("DBUS_SESSION_BUS_ADDRESS")
+    with PrivateSessionBus() as bus:
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = bus.address
+        try:
+            with FakeNotificationServer():
+                from notifypy.os_notifiers.linux import LinuxNotifier
+
+                notifier = LinuxNotifier()
+                kwargs = _notifier_kwargs()
+                yield lambda: notifier.send_notification(**kwargs)
+                notifier._connection_pool.close()
+        finally:
+            if address is None:
+                del os.environ["DBUS_SESSION_BUS_ADDRESS"]
+            else:
+                os.environ["DBUS_SESSION_BUS_ADDRESS"] = address
+
+
+@benchmark("linux_notify_send_stub", divisor=20)
+def bench_linux_notify_send_stub():
+    if os.name != "posix":
+        raise Skip("needs a shell script as notify-send")
+    from notifypy.os_notifiers import linux
+
+    path = os.environ["PATH"]
+    with tempfile.TemporaryDirectory() as directory:
+        _stub(directory, "notify-send")
+        os.environ["PATH"] = directory + os.pathsep + path
+        linux.find_notify_send.cache_clear()
+        try:
+            notifier = linux.LinuxNotifierLibNotify()
+            kwargs = _notifier_kwargs()
+            yield lambda: notifier.send_notification(**kwargs)
+        finally:
+            os.environ["PATH"] = path
+            linux.find_notify_send.cache_clear()
+
+
+@benchmark("macos_notificator_stub", divisor=20)
+def bench_macos_notificator_stub():
+    if os.name != "posix":
+        raise Skip("needs a shell script as notificator")
+    from notifypy.os_notifiers.macos import MacOSNotifier
+
+    with tempfile.TemporaryDirectory() as directory:
+        scripts = os.path.join(
+            directory, "Stub.app", "Contents", "Resources", "Scripts"
+        )
+        os.makedirs(scripts)
+        _stub(scripts, "notificator")
+        notifier = MacOSNotifier(
+            custom_mac_notificator=os.path.join(directory, "Stub.app")
+        )
+        kwargs = _notifier_kwargs()
+        yield lambda: notifier.send_notification(**kwargs)
+
+
+@benchmark("macos_helper_stub")
+def bench_macos_helper_stub():
+    from notifypy.os_notifiers._helper import JsonHelper
+    from notifypy.os_notifiers.macos import MacOSNotifier
+
+    with tempfile.TemporaryDirectory() as directory:
+        notifier = MacOSNotifier(macos_persistent_helper=True)
+        notifier._helper = JsonHelper(
+            [
+                sys.executable,
+                "-m",
+                "tests.fake_notificator_helper",
+                os.path.join(directory, "requests.log"),
+            ],
+            name="fake notificator helper",
+        )
+        kwargs = _notifier_kwargs()
+        try:
+            yield lambda: notifier.send_notification(**kwargs)
+        finally:
+            notifier.close()
+
+
+@benchmark("windows_worker_stub")
+def bench_windows_worker_stub():
+    from notifypy.os_notifiers._helper import HelperProcess
+    from notifypy.os_notifiers.windows import WindowsNotifier
+
+    with tempfile.TemporaryDirectory() as directory:
+        notifier = WindowsNotifier(windows_persistent_worker=True)
+        notifier._worker = HelperProcess(
+            [
+                sys.executable,
+                "-m",
+                "tests.fake_toast_worker",
+                os.path.join(directory, "toasts.log"),
+            ],
+            name="fake toast worker",
+        )
+        kwargs = _notifier_kwargs()
+        try:
+            yield lambda: notifier.send_notification(**kwargs)
+        finally:
+            notifier.close()
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(operation, iterations, warmup):
+    """Latency statistics in microseconds, and memory, for iterations calls."""
+    for _ in range(warmup):
+        operation()
+
+    timings = []
+    gc.collect()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1e6)
+    ordered = sorted(timings)
+
+    # A separate pass: tracemalloc slows every allocation down.
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(iterations):
+        operation()
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        iterations=iterations,
+        mean_us=statistics.mean(timings),
+        p50_us=_percentile(ordered, 0.50),
+        p90_us=_percentile(ordered, 0.90),
+        p99_us=_percentile(ordered, 0.99),
+        max_us=ordered[-1],
+        ops_per_sec=iterations / (sum(timings) / 1e6),
+        peak_kib=(peak - before) / 1024,
+        retained_bytes_per_op=(after - before) / iterations,
+    )
+
+
+def run(iterations, only=None):
+    results = {}
+    for name, factory, divisor in BENCHMARKS:
+        if only and not any(part in name for part in only):
+            continue
+        count = max(10, iterations // divisor)
+        try:
+            with factory() as operation:
+                results[name] = measure(operation, count, warmup=max(1, count // 10))
+        except Skip as reason:
+            results[name] = dict(skipped=str(reason))
+        _print_result(name, results[name])
+    return results
+
+
+def _print_result(name, result):
+    if "skipped" in result:
+        print(f"{name:26} skipped: {result['skipped']}")
+        return
+    print(
+        f"{name:26} p50 {result['p50_us']:9.1f} us  p90 {result['p90_us']:9.1f} us"
+        f"  p99 {result['p99_us']:9.1f} us  {result['ops_per_sec']:10.0f} ops/s"
+        f"  peak {result['peak_kib']:8.1f} KiB"
+        f"  retained {result['retained_bytes_per_op']:7.1f} B/op"
+    )
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against baseline, as printable lines.
+
+    A benchmark regressed if its median latency grew by more than tolerance,
+    or if it retains more than tolerance times (and 64 bytes) more memory per
+    operation than the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "skipped" in result or "skipped" in base:
+            continue
+
+        ratio = result["p50_us"] / base["p50_us"] if base["p50_us"] else 1.0
+        print(f"{name:26} p50 {ratio:6.2f}x baseline")
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: p50 {base['p50_us']:.1f} -> {result['p50_us']:.1f} us"
+            )
+
+        retained, base_retained = (
+            result["retained_bytes_per_op"],
+            base["retained_bytes_per_op"],
+        )
+        if retained > max(base_retained, 0) * (1 + tolerance) + 64:
+            regressions.append(
+                f"{name}: retains {base_retained:.1f} -> {retained:.1f} bytes/op"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against this results file.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--only", action="append", help="Only run benchmarks containing this."
+    )
+    arguments = parser.parse_args()
+    logger.disable("notifypy")
+
+    results = dict(
+        meta=dict(
+            notifypy=notifypy.__version__,
+            python=platform.python_version(),
+            implementation=platform.python_implementation(),
+            platform=platform.platform(),
+            time=time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            iterations=arguments.iterations,
+        ),
+        benchmarks=run(arguments.iterations, arguments.only),
+    )
+
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline:
+            baseline = json.load(baseline)["benchmarks"]
+        regressions = compare(results["benchmarks"], baseline, arguments.tolerance)
+        if regressions:
+            print("regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,38 @@
 from .notify import Notify
+from .notification import Notification
 from .os_notifiers._base import BaseNotifier
 
 __version__ = "0.3.42"
+
+
+def __getattr__(name):
+    # Imported on first use, to keep `import notifypy` cheap.
+    if name in {"NotificationDispatcher", "configure_default_dispatcher"}:
+        from . import dispatcher
+
+        return getattr(dispatcher, name)
+    if name == "preload_assets":
+        from .assets import preload_assets
+
+        return preload_assets
+    if name == "NotificationAggregator":
+        from .aggregation import NotificationAggregator
+
+        return NotificationAggregator
+    if name in {"RetryPolicy", "CircuitBreaker"}:
+        from . import retry
+
+        return getattr(retry, name)
+    if name == "BackendChain":
+        from .chain import BackendChain
+
+        return BackendChain
+    if name == "register_backend":
+        from .registry import register_backend
+
+        return register_backend
+    if name == "Outbox":
+        from .outbox import Outbox
+
+        return Outbox
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,68 @@
+import sys
+
+_LOG_METHODS = {
+    "trace",
+    "debug",
+    "info",
+    "success",
+    "warning",
+    "error",
+    "critical",
+    "exception",
+    "log",
+}
+
+
+def _discard(*args, **kwargs):
+    pass
+
+
+class _LazyLogger:
+    """Stands in for loguru's logger, which is only imported when it's needed.
+
+    While logging for notifypy is disabled and loguru hasn't been imported by
+    anyone else, log calls are discarded without importing loguru. Once loguru
+    is imported, the recorded enable/disable state is applied to it and every
+    call is forwarded.
+    """
+
+    def __init__(self):
+        self._logger = None
+        self._disabled = False
+
+    def _resolve(self):
+        if self._logger is None:
+            from loguru import logger
+
+            if self._disabled:
+                logger.disable("notifypy")
+            self._logger = logger
+        return self._logger
+
+    def _is_discarding(self):
+        return self._logger is None and self._disabled and "loguru" not in sys.modules
+
+    def disable(self, name):
+        if name == "notifypy" and self._logger is None and "loguru" not in sys.modules:
+            self._disabled = True
+        else:
+            self._resolve().disable(name)
+
+    def enable(self, name):
+        if name == "notifypy" and self._logger is None and "loguru" not in sys.modules:
+            self._disabled = False
+        else:
+            self._resolve().enable(name)
+
+    def opt(self, *args, **kwargs):
+        if self._is_discarding():
+            return self
+        return self._resolve().opt(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name in _LOG_METHODS and self._is_discarding():
+            return _discard
+        return getattr(self._resolve(), name)
+
+
+logger = _LazyLogger()
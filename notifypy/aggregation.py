@@ -0,0 +1,246 @@
+import atexit
+import threading
+import time
+import weakref
+from collections import deque
+
+from ._logging import logger
+from .dispatcher import NotificationFuture
+
+_live_aggregators = weakref.WeakSet()
+
+
+def title_and_application(notification):
+    """The default aggregation key: notifications with the same title and application name are merged."""
+    return (notification.title, notification.application_name)
+
+
+def append_count(notification, count):
+    """The default summary: the latest notification, with ' (xN)' appended to its title."""
+    return notification.replace(title=f"{notification.title} (x{count})")
+
+
+def _resolved(result):
+    future = NotificationFuture()
+    future.set_result(result)
+    return future
+
+
+def _dropped():
+    future = NotificationFuture()
+    future.cancel()
+    return future
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """Allows `rate` notifications per second on average, and bursts of up to `burst`.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Maximum amount of tokens.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def take(self):
+        """Takes a token. Returns False if the bucket is empty."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class _Group:
+    __slots__ = ("send", "notification", "count")
+
+    def __init__(self, send, notification):
+        self.send = send
+        self.notification = notification
+        self.count = 1
+
+
+class NotificationAggregator:
+    def __init__(
+        self,
+        window=1.0,
+        key=title_and_application,
+        rate=None,
+        burst=10,
+        summarize=append_count,
+    ):
+        """Coalesces and rate-limits notifications before they're sent.
+
+        The first notification for a key is sent right away. Notifications with
+        the same key arriving within `window` seconds after it are merged: when
+        the window closes, one summary of them (by default the latest notification,
+        titled "Title (x37)") is sent instead.
+
+        With a rate, every application name gets a token bucket; notifications
+        (and summaries) sent while its bucket is empty are dropped.
+
+        Merged notifications resolve to True right away, dropped ones are cancelled.
+
+        Args:
+            window (float, optional): Seconds to merge notifications for. Defaults to 1.0.
+            key (callable, optional): Maps a Notification to its key. Defaults to title and application name.
+            rate (float, optional): Notifications per second per application. Defaults to None (no rate limit).
+            burst (int, optional): Notifications an application may send at once. Defaults to 10.
+            summarize (callable, optional): Builds the summary from the latest notification and the amount of merged notifications. Defaults to append_count.
+        """
+        if window < 0:
+            raise ValueError("The aggregation window can't be negative.")
+        if rate is not None and rate <= 0:
+            raise ValueError("The rate has to be positive.")
+
+        self.window = window
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self.summarize = summarize
+
+        # Metrics.
+        self.received = 0
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+
+        self._groups = {}
+        # Groups close in the order they were opened, as the window is fixed.
+        self._deadlines = deque()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher = None
+        self._closed = False
+
+        _live_aggregators.add(self)
+
+    @property
+    def metrics(self):
+        """A snapshot of the counters: received, sent, merged, dropped and pending (open windows)."""
+        with self._lock:
+            return dict(
+                received=self.received,
+                sent=self.sent,
+                merged=self.merged,
+                dropped=self.dropped,
+                pending=len(self._groups),
+            )
+
+    def submit(self, send, notification, deadline=None):
+        """Sends, merges or drops a notification.
+
+        Args:
+            send (callable): Sends a Notification (and its deadline), returning a NotificationFuture. Summaries are sent without a deadline.
+            notification (Notification): The notification.
+            deadline (float, optional): time.monotonic() by which the notification has to be sent, passed on to send. Defaults to None.
+
+        Returns:
+            NotificationFuture: The send's future, a resolved one if merged or a cancelled one if dropped.
+        """
+        key = self.key(notification)
+        with self._lock:
+            self.received += 1
+            group = self._groups.get(key)
+            if group is not None:
+                group.count += 1
+                group.notification = notification
+                self.merged += 1
+                return _resolved(True)
+
+            if self.window:
+                closes_at = time.monotonic() + self.window
+                self._groups[key] = _Group(send, notification)
+                self._deadlines.append((closes_at, key))
+                self._start_flusher()
+                self._wakeup.notify()
+
+            allowed = self._take_token(notification)
+
+        if not allowed:
+            return _dropped()
+        return send(notification, deadline)
+
+    def _take_token(self, notification):
+        """Counts the notification as sent or dropped. Call with the lock held."""
+        if self.rate is not None:
+            application_name = notification.application_name
+            bucket = self._buckets.get(application_name)
+            if bucket is None:
+                bucket = self._buckets[application_name] = TokenBucket(
+                    self.rate, self.burst
+                )
+            if not bucket.take():
+                self.dropped += 1
+                logger.warning(
+                    f"rate limit for {application_name} reached, dropping notification."
+                )
+                return False
+        self.sent += 1
+        return True
+
+    def _start_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_expired, daemon=True)
+            self._flusher.name = "notify.py-aggregator"
+            self._flusher.start()
+
+    def _flush_expired(self):
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._deadlines:
+                        remaining = self._deadlines[0][0] - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._wakeup.wait(remaining)
+                    else:
+                        self._wakeup.wait()
+                if self._closed:
+                    return
+                summaries = self._close_groups(time.monotonic())
+            self._send_summaries(summaries)
+
+    def _close_groups(self, now=None):
+        """Closes the windows that expired by `now` (all of them if None). Call with the lock held."""
+        summaries = []
+        while self._deadlines and (now is None or self._deadlines[0][0] <= now):
+            _, key = self._deadlines.popleft()
+            group = self._groups.pop(key)
+            if group.count > 1:
+                summary = self.summarize(group.notification, group.count)
+                if self._take_token(summary):
+                    summaries.append((group.send, summary))
+        return summaries
+
+    def _send_summaries(self, summaries):
+        for send, summary in summaries:
+            try:
+                send(summary)
+            except Exception:
+                logger.exception("Exception on sending summary notification.")
+
+    def flush(self):
+        """Closes every open window now, sending the summaries of merged notifications."""
+        with self._lock:
+            summaries = self._close_groups()
+        self._send_summaries(summaries)
+
+    def close(self):
+        """Flushes and stops the aggregator's thread."""
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+
+
+@atexit.register
+def _flush_aggregators():
+    for aggregator in list(_live_aggregators):
+        aggregator.close()
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+
+from .exceptions import InvalidAudioFormat, InvalidAudioPath, InvalidIconPath
+
+PACKAGE_DIRECTORY = os.path.dirname(__file__)
+
+# The icon used when none is given.
+DEFAULT_ICON = os.path.join(PACKAGE_DIRECTORY, "py-logo.png")
+
+
+def _resolve(path):
+    """The absolute path if it exists, else relative to the package. None if neither exists."""
+    if os.path.exists(path):
+        return os.path.abspath(path)
+    packaged = os.path.join(PACKAGE_DIRECTORY, path)
+    if os.path.exists(packaged):
+        return packaged
+    return None
+
+
+class AssetCache:
+    def __init__(self, ttl=10.0):
+        """Remembers where icon and audio paths resolved to, so setting
+        Notify.icon/audio doesn't touch the filesystem every time.
+
+        A resolved path is trusted for ttl seconds; preloaded (pinned) paths
+        are trusted until they're unpinned. Paths that don't exist aren't
+        remembered.
+
+        Args:
+            ttl (float, optional): Seconds to trust a resolved path. 0 checks every time. Defaults to 10.0.
+        """
+        self.ttl = ttl
+        self._resolved = {}
+        self._pinned = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind, path):
+        # Relative paths resolve differently after a chdir.
+        if os.path.isabs(path):
+            return (kind, path)
+        return (kind, path, os.getcwd())
+
+    def _lookup(self, key):
+        entry = self._resolved.get(key)
+        now = time.monotonic()
+        if entry is not None and (key in self._pinned or now - entry[1] < self.ttl):
+            return entry[0]
+
+        resolved = _resolve(key[1])
+        if resolved is not None:
+            with self._lock:
+                self._resolved[key] = (resolved, now)
+        return resolved
+
+    def icon(self, path):
+        """The resolved icon path.
+
+        Raises:
+            InvalidIconPath: If the icon doesn't exist.
+        """
+        resolved = self._lookup(self._key("icon", path))
+        if resolved is None:
+            raise InvalidIconPath(
+                f"Could not find specified icon path to '{path}'. Please check if it exists."
+            )
+        return resolved
+
+    def audio(self, path):
+        """The resolved audio path.
+
+        Raises:
+            InvalidAudioFormat: If it isn't a '.wav' file.
+            InvalidAudioPath: If the audio file doesn't exist.
+        """
+        # we currently only support .wav files
+        if not path.endswith(".wav"):
+            raise InvalidAudioFormat
+        resolved = self._lookup(self._key("audio", path))
+        if resolved is None:
+            raise InvalidAudioPath(
+                f"Could not find specified audio path to '{path}'. Please check if it exists."
+            )
+        return resolved
+
+    def pin(self, kind, path):
+        """Trusts the resolved path until unpinned."""
+        with self._lock:
+            self._pinned.add(self._key(kind, path))
+
+    def unpin(self, kind, path):
+        with self._lock:
+            self._pinned.discard(self._key(kind, path))
+
+    def clear(self):
+        """Forgets every resolved path, pinned ones included."""
+        with self._lock:
+            self._resolved.clear()
+            self._pinned.clear()
+
+
+asset_cache = AssetCache()
+
+
+def preload_assets(icons=(), sounds=()):
+    """Verifies icons and sounds once, at startup, and pins them.
+
+    Setting a preloaded path as Notify.icon or Notify.audio afterwards
+    doesn't touch the filesystem, and neither does sending the icon as
+    D-Bus image-data hint once it was decoded.
+
+    Args:
+        icons (iterable, optional): Icon paths.
+        sounds (iterable, optional): '.wav' paths.
+
+    Raises:
+        InvalidIconPath: If an icon doesn't exist.
+        InvalidAudioFormat: If a sound isn't a '.wav' file.
+        InvalidAudioPath: If a sound doesn't exist.
+
+    Returns:
+        dict: The resolved path for every given path.
+    """
+    from .os_notifiers._icons import icon_cache
+
+    resolved = {}
+    for icon in icons:
+        resolved[icon] = asset_cache.icon(icon)
+        asset_cache.pin("icon", icon)
+        icon_cache.pin(resolved[icon])
+    for sound in sounds:
+        resolved[sound] = asset_cache.audio(sound)
+        asset_cache.pin("audio", sound)
+    return resolved
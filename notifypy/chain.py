@@ -0,0 +1,256 @@
+import threading
+import time
+
+from ._logging import logger
+from .instrumentation import instrumentation
+from .os_notifiers._base import BaseNotifier
+from .registry import backend_registry, default_chain
+
+ROUTINGS = ("latency", "order")
+
+
+class _Backend:
+    __slots__ = (
+        "name",
+        "notifier",
+        "latency",
+        "failures",
+        "down",
+        "down_until",
+        "sent",
+        "errors",
+    )
+
+    def __init__(self, name, notifier):
+        self.name = name
+        self.notifier = notifier
+        self.latency = None
+        self.failures = 0
+        self.down = False
+        self.down_until = 0.0
+        self.sent = 0
+        self.errors = 0
+
+
+class BackendChain(BaseNotifier):
+    def __init__(
+        self,
+        backends=None,
+        routing="latency",
+        failure_threshold=3,
+        cooldown=30.0,
+        smoothing=0.2,
+        **kwargs,
+    ):
+        """A notifier that sends through the first of several backends that works.
+
+        Every backend's latency (a moving average of its successful sends) and consecutive failures are
+        tracked. A backend that failed failure_threshold times in a row is
+        down: it's skipped for cooldown seconds, then tried again. With the
+        "latency" routing, sends go to the fastest backend that isn't down
+        (backends that weren't measured yet first, ones that just failed last),
+        with "order" to the first one. If it fails, the next one is tried, with the time left until the
+        send's deadline (if it has one). Fallback-only backends (see
+        BaseNotifier.fallback_only, e.g. "log") are only used when all others
+        failed or are down.
+
+        Backends going down and coming back are logged and reported to the
+        instrumentation as backend_down and backend_up events.
+
+        Args:
+            backends (list, optional): Backend names (see register_backend), BaseNotifier subclasses or instances, best first. Defaults to this platform's default chain, e.g. ["dbus", "notify-send", "log"] on Linux.
+            routing (str, optional): "latency" or "order". Defaults to "latency".
+            failure_threshold (int, optional): Failures in a row after which a backend is down. Defaults to 3.
+            cooldown (float, optional): Seconds a down backend is skipped. Defaults to 30.0.
+            smoothing (float, optional): Weight of the newest send in the latency average. Defaults to 0.2.
+            **kwargs: Notify's keyword arguments. The ones notifiers read (see registry.notifier_kwargs) are passed on to the backends that are created.
+
+        Raises:
+            ValueError: For an unknown routing, or if no backend could be created.
+        """
+        if routing not in ROUTINGS:
+            raise ValueError(f"routing must be one of {ROUTINGS}.")
+        self.routing = routing
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+        if backends is None:
+            backends = default_chain(
+                kwargs.get("override_detected_notification_system")
+            )
+        self._backends = []
+        for backend in backends:
+            try:
+                self.register(backend, **kwargs)
+            except Exception:
+                logger.exception(f"Leaving {backend!r} out of the backend chain.")
+        if not self._backends:
+            raise ValueError("None of the backends could be created.")
+
+    def register(self, backend, position=None, **kwargs):
+        """Adds a backend to the chain, at the end or at the given position.
+
+        Args:
+            backend: A backend name (see register_backend), a BaseNotifier subclass or instance.
+            position (int, optional): Index in the chain. Defaults to the end.
+            **kwargs: Notify's keyword arguments for the notifier, if it has to be created. Only the ones notifiers read are passed on.
+
+        Raises:
+            KeyError: For unknown backend names.
+            ValueError: If backend isn't a BaseNotifier.
+        """
+        if isinstance(backend, str):
+            name = backend
+            notifier = backend_registry.notifier(
+                backend_registry.backend_class(name), **kwargs
+            )
+        elif isinstance(backend, type) and issubclass(backend, BaseNotifier):
+            name = backend.__name__
+            notifier = backend_registry.notifier(backend, **kwargs)
+        elif isinstance(backend, BaseNotifier):
+            name, notifier = type(backend).__name__, backend
+        else:
+            raise ValueError("Backends must be names or inherit from BaseNotifier.")
+
+        with self._lock:
+            backends = list(self._backends)
+            backends.insert(
+                len(backends) if position is None else position,
+                _Backend(name, notifier),
+            )
+            self._backends = backends
+
+    @property
+    def backends(self):
+        """The backends' names, in chain order."""
+        return [backend.name for backend in self._backends]
+
+    @property
+    def health(self):
+        """Per backend, in chain order: name, down, latency (seconds, None if unmeasured), failures (in a row), sent and errors."""
+        with self._lock:
+            return [
+                dict(
+                    name=backend.name,
+                    down=backend.down,
+                    latency=backend.latency,
+                    failures=backend.failures,
+                    sent=backend.sent,
+                    errors=backend.errors,
+                )
+                for backend in self._backends
+            ]
+
+    def _route(self):
+        """The backends to try, in order."""
+        now = time.monotonic()
+        preferred, fallbacks = [], []
+        for backend in self._backends:
+            if backend.down and now < backend.down_until:
+                continue
+            if backend.notifier.fallback_only:
+                fallbacks.append(backend)
+            else:
+                preferred.append(backend)
+        if self.routing == "latency":
+            # Stable: failing backends last, unmeasured ones first, ties in chain order.
+            preferred.sort(
+                key=lambda backend: (backend.failures > 0, backend.latency or 0.0)
+            )
+        return preferred + fallbacks
+
+    def _record(self, backend, sent, duration):
+        with self._lock:
+            if sent:
+                # Only successful sends: failing fast doesn't make a backend fast.
+                if backend.latency is None:
+                    backend.latency = duration
+                else:
+                    backend.latency += self.smoothing * (duration - backend.latency)
+                backend.sent += 1
+                backend.failures = 0
+                if not backend.down:
+                    return
+                backend.down = False
+                event = "backend_up"
+                logger.info(f"{backend.name} works again.")
+            else:
+                backend.errors += 1
+                backend.failures += 1
+                if backend.failures < self.failure_threshold:
+                    return
+                backend.down_until = time.monotonic() + self.cooldown
+                if backend.down:
+                    return
+                backend.down = True
+                event = "backend_down"
+                logger.warning(
+                    f"{backend.name} failed {backend.failures} times, skipping it for {self.cooldown}s."
+                )
+        instrumentation.event(event, backend.name)
+
+    @staticmethod
+    def _with_time_left(kwargs, deadline):
+        """kwargs with the send_timeout left until the deadline.
+
+        Raises:
+            TimeoutError: If the deadline passed before a backend sent the notification.
+        """
+        if deadline is None:
+            return kwargs
+        time_left = deadline - time.monotonic()
+        if time_left <= 0:
+            raise TimeoutError("No backend sent the notification in time.")
+        return dict(kwargs, send_timeout=time_left)
+
+    def send_notification(self, send_timeout=None, **kwargs):
+        deadline = None if send_timeout is None else time.monotonic() + send_timeout
+        for backend in self._route():
+            backend_kwargs = self._with_time_left(kwargs, deadline)
+            started = time.perf_counter()
+            try:
+                sent = backend.notifier.send_notification(**backend_kwargs)
+            except Exception:
+                logger.exception(
+                    f"Exception on sending notification with {backend.name}."
+                )
+                sent = False
+            self._record(backend, sent, time.perf_counter() - started)
+            if sent:
+                return True
+        logger.error("No backend could send the notification.")
+        return False
+
+    async def send_notification_async(self, send_timeout=None, **kwargs):
+        deadline = None if send_timeout is None else time.monotonic() + send_timeout
+        for backend in self._route():
+            backend_kwargs = self._with_time_left(kwargs, deadline)
+            started = time.perf_counter()
+            try:
+                sent = await backend.notifier.send_notification_async(**backend_kwargs)
+            except Exception:
+                logger.exception(
+                    f"Exception on sending notification with {backend.name}."
+                )
+                sent = False
+            self._record(backend, sent, time.perf_counter() - started)
+            if sent:
+                return True
+        logger.error("No backend could send the notification.")
+        return False
+
+    def _first(self):
+        route = self._route()
+        return route[0].notifier if route else None
+
+    def capabilities(self):
+        """The capabilities of the backend the next notification would be sent with."""
+        notifier = self._first()
+        return None if notifier is None else notifier.capabilities()
+
+    def server_information(self):
+        """The server information of the backend the next notification would be sent with."""
+        notifier = self._first()
+        return None if notifier is None else notifier.server_information()
@@ -1,5 +1,6 @@
-from .notify import Notify
 import argparse
+import os
+import sys
 
 
 def _enable_argument_parser() -> argparse.ArgumentParser:
@@ -55,20 +56,97 @@ def _enable_argument_parser() -> argparse.ArgumentParser:
         help="Overrides the check for determining appropriate notifier. (Windows, Darwin, Linux).",
         required=False,
     )
+    argument_parser.add_argument(
+        "--socket",
+        dest="userCreatedSocketPath",
+        help="Socket of the notify-py daemon. Defaults to $NOTIFYPY_SOCKET or $XDG_RUNTIME_DIR/notifypy.sock.",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--noDaemon",
+        dest="userCreatedNoDaemon",
+        help="Always send in-process, even if the notify-py daemon is running.",
+        action="store_true",
+    )
+
+    return argument_parser
 
+
+def _enable_daemon_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(
+        prog="notifypy daemon",
+        description="Run the notify-py daemon, which sends the notifications of other notifypy calls.",
+    )
+    argument_parser.add_argument(
+        "--socket",
+        dest="userCreatedSocketPath",
+        help="Socket to listen on. Defaults to $NOTIFYPY_SOCKET or $XDG_RUNTIME_DIR/notifypy.sock.",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--enableLogging", dest="userCreatedEnableLogging", action="store_true"
+    )
     return argument_parser
 
 
+def _absolute_path(path):
+    # The daemon has its own working directory.
+    if path and os.path.exists(path):
+        return os.path.abspath(path)
+    return path
+
+
+def daemon_entry(argv):
+    """Entrypoint for `notifypy daemon`."""
+    from .daemon import NotifyDaemon
+
+    arguments_recieved = _enable_daemon_argument_parser().parse_args(argv)
+    NotifyDaemon(
+        socket_path=arguments_recieved.userCreatedSocketPath,
+        enable_logging=arguments_recieved.userCreatedEnableLogging,
+    ).serve_forever()
+
+
 def entry():
     """Entrypoint for CLI (Notify-py)"""
+    if sys.argv[1:2] == ["daemon"]:
+        return daemon_entry(sys.argv[2:])
+
     parser = _enable_argument_parser()
     arguments_recieved = parser.parse_args()
 
+    if (
+        not arguments_recieved.userCreatedNoDaemon
+        and not arguments_recieved.userCreatedOverridePlatform
+    ):
+        from .daemon import send_via_daemon
+
+        notification = dict(
+            title=arguments_recieved.userCreatedTitle,
+            message=arguments_recieved.userCreatedMessage,
+            application_name=arguments_recieved.userCreatedApplicationName,
+        )
+        if arguments_recieved.userCreatedIconPath:
+            notification["icon"] = _absolute_path(
+                arguments_recieved.userCreatedIconPath
+            )
+        if arguments_recieved.userCreatedSoundPath:
+            notification["audio"] = _absolute_path(
+                arguments_recieved.userCreatedSoundPath
+            )
+
+        sent = send_via_daemon(notification, arguments_recieved.userCreatedSocketPath)
+        if sent is not None:
+            return
+        # No daemon is running, send in-process.
+
+    from .notify import Notify
+
     _current_extra_built_kwargs = {}
 
     if arguments_recieved.userCreatedOverridePlatform in ["Windows", "Darwin", "Linux"]:
         _current_extra_built_kwargs[
-            "use_custom_notifier"
+            "override_detection"
         ] = arguments_recieved.userCreatedOverridePlatform
 
     if arguments_recieved.userCreatedEnableLogging == True:
@@ -0,0 +1,188 @@
+import json
+import os
+import socket
+import socketserver
+import tempfile
+
+from ._logging import logger
+from .exceptions import UnsupportedPlatform
+
+# Keys a request may contain, see Notify.send_many.
+REQUEST_KEYS = ("title", "message", "application_name", "urgency", "icon", "audio")
+
+
+def default_socket_path():
+    """The socket path used by the daemon and the CLI.
+
+    $NOTIFYPY_SOCKET if set, else notifypy.sock in $XDG_RUNTIME_DIR,
+    else a per-user file in the temporary directory.
+    """
+    if os.getenv("NOTIFYPY_SOCKET"):
+        return os.getenv("NOTIFYPY_SOCKET")
+    if os.getenv("XDG_RUNTIME_DIR"):
+        return os.path.join(os.getenv("XDG_RUNTIME_DIR"), "notifypy.sock")
+    return os.path.join(tempfile.gettempdir(), f"notifypy-{os.getuid()}.sock")
+
+
+def _owned_by_us(socket_path):
+    """Whether the socket belongs to the current user and only they can write to it.
+
+    The fallback path is in the shared temporary directory, where another user
+    could create it first and read every notification sent through it.
+    """
+    try:
+        status = os.stat(socket_path)
+    except FileNotFoundError:
+        return False
+    if status.st_uid != os.getuid() or status.st_mode & 0o022:
+        logger.warning(
+            f"Not using {socket_path}: it isn't owned by and private to this user."
+        )
+        return False
+    return True
+
+
+def _connect(socket_path, timeout):
+    """A client socket connected to the daemon, or None if no daemon (of this user) is listening."""
+    if not _owned_by_us(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    return client
+
+
+def daemon_running(socket_path=None):
+    """True if a daemon is listening on the socket."""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+
+    client = _connect(socket_path or default_socket_path(), timeout=1)
+    if client is None:
+        return False
+    client.close()
+    return True
+
+
+def send_via_daemon(notification, socket_path=None, timeout=5):
+    """Forwards a notification to a running daemon.
+
+    Args:
+        notification (dict): any of the keys title, message, application_name, urgency, icon and audio.
+        socket_path (str, optional): Defaults to default_socket_path().
+        timeout (int, optional): Seconds to wait for the daemon. Defaults to 5.
+
+    Returns:
+        bool: True if the daemon sent the notification.
+        None: if no daemon is listening on the socket, the socket isn't this user's, or the daemon didn't answer (in time).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    client = _connect(socket_path or default_socket_path(), timeout)
+    if client is None:
+        return None
+
+    try:
+        request = {
+            key: notification[key] for key in REQUEST_KEYS if key in notification
+        }
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as response_file:
+            response = json.loads(response_file.readline())
+    except (OSError, ValueError) as exception:
+        # Hung (socket.timeout) or closed the connection (empty response).
+        logger.warning(f"notify-py daemon didn't answer: {exception!r}")
+        return None
+    finally:
+        client.close()
+
+    if response.get("error"):
+        logger.error(f"notify-py daemon: {response['error']}")
+    return response["sent"]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # One JSON request per line, answered with one JSON response per line.
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                sent = self.server.notify.send_many([request])[0]
+                response = {"sent": sent}
+            except Exception as exception:
+                logger.exception("notify-py daemon: unable to handle request.")
+                response = {"sent": False, "error": str(exception)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class NotifyDaemon:
+    def __init__(self, socket_path=None, **kwargs):
+        """Long-running notify-py process, listening on a Unix domain socket.
+
+        It holds one warm Notify object (detected backend, pooled connections)
+        and sends the notifications forwarded by `notifypy` CLI calls or
+        send_via_daemon. Requests are newline-delimited JSON objects with any of
+        the keys title, message, application_name, urgency, icon and audio; each
+        is answered with {"sent": bool} (plus "error" on failure).
+
+        Args:
+            socket_path (str, optional): Defaults to default_socket_path().
+            **kwargs: Arguments for the Notify object.
+        """
+        from .notify import Notify
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise UnsupportedPlatform("The daemon (Unix domain sockets)")
+
+        self.socket_path = socket_path or default_socket_path()
+        self.notify = Notify(**kwargs)
+        self._server = None
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        if daemon_running(self.socket_path):
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}.")
+        os.unlink(self.socket_path)
+
+    def bind(self):
+        """Binds the socket (readable by the current user only)."""
+        self._remove_stale_socket()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(
+                self.socket_path, _RequestHandler
+            )
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+        self._server.notify = self.notify
+        logger.info(f"notify-py daemon listening on {self.socket_path}")
+
+    def serve_forever(self):
+        """Binds (if needed) and serves until shutdown() or KeyboardInterrupt."""
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """Stops serve_forever from another thread."""
+        self._server.shutdown()
+
+    def close(self):
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
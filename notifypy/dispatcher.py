@@ -0,0 +1,217 @@
+import atexit
+import threading
+import weakref
+from collections import deque
+from concurrent import futures
+
+from ._logging import logger
+from .exceptions import DispatcherQueueFull
+
+# Overflow policies, used when a notification is submitted to a full queue.
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+RAISE = "raise"
+
+OVERFLOW_POLICIES = {BLOCK, DROP_OLDEST, DROP_NEWEST, RAISE}
+
+_live_dispatchers = weakref.WeakSet()
+
+
+class NotificationFuture(futures.Future):
+    """A concurrent.futures.Future for a queued notification.
+
+    It also keeps the threading.Event methods (wait, is_set) that
+    Notify.send(block=False) used to return.
+    """
+
+    def wait(self, timeout=None):
+        """Waits for the notification and returns True if it was sent.
+        Unlike result(), this never raises.
+        """
+        try:
+            return bool(self.result(timeout=timeout))
+        except Exception:
+            return False
+
+    def is_set(self):
+        """True if the notification was sent, without waiting."""
+        return self.done() and self.wait(timeout=0)
+
+
+class NotificationDispatcher:
+    def __init__(self, max_workers=4, max_queue_size=1024, overflow_policy=BLOCK):
+        """Sends notifications from a fixed amount of worker threads.
+
+        Workers are started on demand, up to max_workers. Submitted notifications
+        wait in a bounded queue; overflow_policy decides what happens when it's full:
+
+            block: wait until there's room in the queue.
+            drop_oldest: cancel the oldest queued notification to make room.
+            drop_newest: cancel the submitted notification.
+            raise: raise DispatcherQueueFull.
+
+        Queued notifications are still sent on interpreter exit.
+
+        Args:
+            max_workers (int, optional): Maximum amount of worker threads. Defaults to 4.
+            max_queue_size (int, optional): Maximum amount of queued notifications. Defaults to 1024.
+            overflow_policy (str, optional): block, drop_oldest, drop_newest or raise. Defaults to block.
+        """
+        if max_workers < 1:
+            raise ValueError("A dispatcher needs at least one worker.")
+        if max_queue_size < 1:
+            raise ValueError("A dispatcher needs a queue size of at least one.")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{overflow_policy}'. Use one of {sorted(OVERFLOW_POLICIES)}."
+            )
+
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+
+        # Amount of notifications cancelled by the drop policies.
+        self.dropped = 0
+        # Amount of workers sending a notification right now.
+        self.busy_workers = 0
+
+        self._queue = deque()
+        self._workers = []
+        self._idle_workers = 0
+        self._shutdown = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+        _live_dispatchers.add(self)
+
+    @property
+    def queue_size(self):
+        """The amount of notifications waiting for a worker."""
+        return len(self._queue)
+
+    def submit(self, function, *args, **kwargs):
+        """Queues function(*args, **kwargs) and returns its NotificationFuture.
+
+        Raises:
+            DispatcherQueueFull: If the queue is full and the overflow policy is 'raise'.
+            RuntimeError: If the dispatcher was shut down.
+        """
+        future = NotificationFuture()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot send notifications after shutdown.")
+
+            if len(self._queue) >= self.max_queue_size:
+                if self.overflow_policy == RAISE:
+                    raise DispatcherQueueFull
+                elif self.overflow_policy == DROP_NEWEST:
+                    self.dropped += 1
+                    future.cancel()
+                    logger.warning("notification queue is full, dropping notification.")
+                    return future
+                elif self.overflow_policy == DROP_OLDEST:
+                    self.dropped += 1
+                    self._queue.popleft()[0].cancel()
+                    logger.warning(
+                        "notification queue is full, dropping oldest notification."
+                    )
+                else:
+                    while len(self._queue) >= self.max_queue_size:
+                        self._not_full.wait()
+                        if self._shutdown:
+                            raise RuntimeError(
+                                "Cannot send notifications after shutdown."
+                            )
+
+            self._queue.append((future, function, args, kwargs))
+            if (
+                self._idle_workers < len(self._queue)
+                and len(self._workers) < self.max_workers
+            ):
+                self._start_worker()
+            self._not_empty.notify()
+        return future
+
+    def _start_worker(self):
+        worker = threading.Thread(target=self._work, daemon=True)
+        worker.name = "notify.py"
+        worker.start()
+        self._workers.append(worker)
+
+    def _work(self):
+        busy = False
+        while True:
+            with self._lock:
+                if busy:
+                    self.busy_workers -= 1
+                    busy = False
+                while not self._queue and not self._shutdown:
+                    self._idle_workers += 1
+                    self._not_empty.wait()
+                    self._idle_workers -= 1
+                if not self._queue:
+                    return
+                future, function, args, kwargs = self._queue.popleft()
+                self._not_full.notify()
+                self.busy_workers += 1
+                busy = True
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = function(*args, **kwargs)
+            except BaseException as exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait=True):
+        """Stops accepting notifications. Queued notifications are still sent.
+
+        Args:
+            wait (bool, optional): Wait for the queued notifications to be sent. Defaults to True.
+        """
+        with self._lock:
+            self._shutdown = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if wait:
+            for worker in list(self._workers):
+                worker.join()
+
+
+_default_dispatcher = None
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_default_dispatcher():
+    """Returns the dispatcher shared by every Notify object, creating it on first use."""
+    global _default_dispatcher
+    with _default_dispatcher_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = NotificationDispatcher()
+        return _default_dispatcher
+
+
+def configure_default_dispatcher(**kwargs):
+    """Replaces the shared dispatcher with one built from the given arguments.
+    The previous dispatcher finishes the notifications it already queued.
+
+    Args:
+        **kwargs: Arguments for NotificationDispatcher.
+    """
+    global _default_dispatcher
+    dispatcher = NotificationDispatcher(**kwargs)
+    with _default_dispatcher_lock:
+        previous, _default_dispatcher = _default_dispatcher, dispatcher
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return dispatcher
+
+
+@atexit.register
+def _shutdown_dispatchers():
+    for dispatcher in list(_live_dispatchers):
+        dispatcher.shutdown(wait=True)
@@ -54,6 +54,16 @@ class NotificationFailure(BaseNotifyPyException):
     pass
 
 
+class NotificationTimeout(NotificationFailure, TimeoutError):
+    """The notification wasn't sent before its deadline."""
+
+    def __repr__(self):
+        return f"The notification wasn't sent in time."
+
+    def __str__(self):
+        return f"The notification wasn't sent in time."
+
+
 class BinaryNotFound(BaseNotifyPyException):
     """ " A specified binary requirement was not found"""
 
@@ -81,3 +91,19 @@ class LinuxDbusException(Exception):
     """This error is raised when a connection with dbus is interrupted or is unable to be established"""
 
     pass
+
+
+class DispatcherQueueFull(BaseNotifyPyException):
+    """The dispatcher queue is full and its overflow policy is 'raise'."""
+
+    def __repr__(self):
+        return f"The notification queue is full."
+
+    def __str__(self):
+        return f"The notification queue is full."
+
+
+class HelperProcessError(BaseNotifyPyException):
+    """A long-lived helper process can't be started (or keeps exiting)."""
+
+    pass
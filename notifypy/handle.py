@@ -0,0 +1,88 @@
+import threading
+
+
+class NotificationHandle:
+    def __init__(self, notify, notification, dispatcher):
+        """A sent notification that can be updated in place. Returned by Notify.send(handle=True).
+
+        Updates reuse the id the notification server assigned (the D-Bus
+        replaces_id on Linux), so progress-style notifications replace their
+        popup instead of stacking new ones. Notifiers without ids send a new
+        notification on every update.
+
+        Updates are sent one at a time from the dispatcher. If several arrive
+        while one is being sent, only the latest state is sent next. Updates
+        get a deadline from the Notify object's send_timeout, if it has one.
+
+        Args:
+            notify (Notify): The Notify object sending the notification.
+            notification (Notification): The notification.
+            dispatcher (NotificationDispatcher): The dispatcher to send from.
+        """
+        self._notify = notify
+        self._dispatcher = dispatcher
+        self._lock = threading.Lock()
+        # Audio is only played for the update it was given to.
+        self._notification = notification.replace(audio=None)
+        self._pending = None
+        self._future = None
+
+        # The id the notification server assigned, None until it was sent.
+        self.id = None
+        # Amount of updates replaced by a later one before they were sent.
+        self.coalesced = 0
+
+    @property
+    def notification(self):
+        """The latest state of the notification (sent or not), a Notification."""
+        return self._notification
+
+    def update(self, **changes):
+        """Updates the notification in place.
+
+        Args:
+            **changes: Any of title, message, application_name, urgency, icon and audio.
+
+        Raises:
+            TypeError: For unknown attributes.
+            InvalidIconPath: If the icon doesn't exist.
+            InvalidAudioPath: If the audio file doesn't exist.
+
+        Returns:
+            NotificationFuture: Resolves once this state (or a later one) was sent. True if it was sent.
+        """
+        with self._lock:
+            return self._submit_locked(
+                self._notification.replace(**changes), self._notify._deadline()
+            )
+
+    def _submit(self, notification, deadline=None):
+        with self._lock:
+            return self._submit_locked(notification, deadline)
+
+    def _submit_locked(self, notification, deadline):
+        self._notification = notification.replace(audio=None)
+        if self._pending is not None:
+            self.coalesced += 1
+        # The latest state replaces the pending one, along with its deadline.
+        self._pending = (notification, deadline)
+        if self._future is None or self._future.cancelled():
+            self._future = self._dispatcher.submit(self._send_pending)
+        return self._future
+
+    def _send_pending(self):
+        sent = False
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if pending is None:
+                    self._future = None
+                    return sent
+
+            notification, deadline = pending
+            notification_id = self._notify._replace_notification(
+                notification, self.id or 0, deadline
+            )
+            sent = notification_id is not None
+            if notification_id:
+                self.id = notification_id
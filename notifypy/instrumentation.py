@@ -0,0 +1,499 @@
+import bisect
+import subprocess
+import sys
+import threading
+import time
+
+from ._logging import logger
+
+# Outcomes counted for every send.
+SUCCESS = "success"
+FAILURE = "failure"
+TIMEOUT = "timeout"
+
+# Upper bounds (seconds) of the send latency histogram's buckets.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def is_timeout(exception):
+    """True for the timeouts of the socket, subprocess, asyncio and concurrent.futures modules."""
+    if isinstance(exception, (TimeoutError, subprocess.TimeoutExpired)):
+        return True
+    # Separate classes before Python 3.11; only checked if already imported.
+    for module, name in (
+        ("asyncio", "TimeoutError"),
+        ("concurrent.futures", "TimeoutError"),
+    ):
+        timeout_class = getattr(sys.modules.get(module), name, None)
+        if timeout_class is not None and isinstance(exception, timeout_class):
+            return True
+    return False
+
+
+def _label_key(labels, label_names):
+    return tuple(str(labels.get(name, "")) for name in label_names)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, label_names=()):
+        """A value per combination of labels that only goes up."""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        self._add(_label_key(labels, self.label_names), amount)
+
+    def _add(self, key, amount):
+        # key: the label values, in label_names' order.
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels, self.label_names), 0)
+
+    def samples(self):
+        """(name, labels, value) for every combination of labels seen so far."""
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            (self.name, dict(zip(self.label_names, key)), value)
+            for key, value in values
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = _label_key(labels, self.label_names)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        """Counts observations per bucket (cumulative, like Prometheus) per combination of labels."""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # key: [count per bucket (not cumulative), +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        self._observe(_label_key(labels, self.label_names), value)
+
+    def _observe(self, key, value):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def count(self, **labels):
+        entry = self._values.get(_label_key(labels, self.label_names))
+        return entry[1] if entry else 0
+
+    def samples(self):
+        with self._lock:
+            values = [
+                (key, list(counts), total, value_sum)
+                for key, (counts, total, value_sum) in self._values.items()
+            ]
+
+        samples = []
+        for key, counts, total, value_sum in values:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        dict(labels, le=repr(float(bound))),
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_bucket", dict(labels, le="+Inf"), total))
+            samples.append((f"{self.name}_sum", labels, value_sum))
+            samples.append((f"{self.name}_count", labels, total))
+        return samples
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class _SendSpan:
+    """One send, from start_send until finish."""
+
+    __slots__ = ("instrumentation", "backend", "notification", "started")
+
+    def __init__(self, instrumentation, backend, notification):
+        self.instrumentation = instrumentation
+        self.backend = backend
+        self.notification = notification
+        self.started = time.perf_counter()
+
+    def finish(self, result=None, exception=None):
+        """Records the send's outcome: its result, or the exception it raised.
+
+        Returns:
+            str: success, failure or timeout.
+        """
+        duration = time.perf_counter() - self.started
+        if exception is not None:
+            outcome = TIMEOUT if is_timeout(exception) else FAILURE
+        else:
+            outcome = SUCCESS if result else FAILURE
+
+        instrumentation = self.instrumentation
+        key = (self.backend,)
+        instrumentation.in_flight._add(key, -1)
+        instrumentation.sends._add((self.backend, outcome), 1)
+        instrumentation.latency._observe(key, duration)
+        if instrumentation._after_send:
+            instrumentation._call_hooks(
+                instrumentation._after_send,
+                self.backend,
+                self.notification,
+                outcome,
+                duration,
+                exception,
+            )
+        return outcome
+
+
+class Instrumentation:
+    def __init__(self):
+        """Metrics and hooks around every notification send. Disabled by default.
+
+        While disabled, sending only checks the `enabled` attribute. Once
+        enabled (by enable() or by adding a hook), every send through a Notify
+        object is counted per backend (the notifier class' name) and outcome,
+        its latency observed and the sends in flight tracked. Dispatcher and
+        aggregator statistics are collected when the metrics are exported.
+
+        Hooks:
+            before_send(backend, notification): notification is the dict of notifier keyword arguments.
+            after_send(backend, notification, outcome, duration, exception): outcome is success, failure or timeout; exception is None unless the notifier raised.
+            on_event(event, fields): notable events, e.g. retries (see event()).
+        """
+        self.enabled = False
+        self._before_send = []
+        self._after_send = []
+        self._on_event = []
+        self._collectors = [
+            _dispatcher_samples,
+            _aggregator_samples,
+            _circuit_breaker_samples,
+        ]
+
+        self.sends = Counter(
+            "notifypy_notifications_total",
+            "Notifications sent, by backend and outcome.",
+            ("backend", "outcome"),
+        )
+        self.latency = Histogram(
+            "notifypy_send_duration_seconds",
+            "Time the backend took to send a notification.",
+            ("backend",),
+        )
+        self.in_flight = Gauge(
+            "notifypy_sends_in_flight",
+            "Notifications being sent right now.",
+            ("backend",),
+        )
+        self.events = Counter(
+            "notifypy_events_total",
+            "Notable events, e.g. retries and circuit breaker changes.",
+            ("event", "backend"),
+        )
+        self.metrics = [self.sends, self.latency, self.in_flight, self.events]
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        """Stops measuring sends. Hooks stay registered; recorded metrics are kept."""
+        self.enabled = False
+
+    def add_hooks(self, before_send=None, after_send=None, on_event=None):
+        """Registers hooks (see Instrumentation) and enables the instrumentation.
+
+        Exceptions raised by hooks are logged and otherwise ignored.
+        """
+        for hooks, hook in (
+            (self._before_send, before_send),
+            (self._after_send, after_send),
+            (self._on_event, on_event),
+        ):
+            if hook is not None:
+                hooks.append(hook)
+        self.enable()
+
+    def remove_hooks(self, *hooks):
+        for registered in (self._before_send, self._after_send, self._on_event):
+            for hook in hooks:
+                if hook in registered:
+                    registered.remove(hook)
+
+    def add_collector(self, collector):
+        """Registers a callable returning (name, kind, documentation, samples) tuples at export time."""
+        self._collectors.append(collector)
+
+    def reset(self):
+        """Forgets every recorded value and hook, and disables the instrumentation."""
+        self.enabled = False
+        for metric in self.metrics:
+            metric.clear()
+        del self._before_send[:], self._after_send[:], self._on_event[:]
+
+    def start_send(self, backend, notification):
+        """Starts measuring one send. Call finish() on the returned span when it's done."""
+        self.in_flight._add((backend,), 1)
+        if self._before_send:
+            self._call_hooks(self._before_send, backend, notification)
+        return _SendSpan(self, backend, notification)
+
+    def event(self, event, backend="", **fields):
+        """Counts a notable event and passes it to the on_event hooks. No-op while disabled."""
+        if not self.enabled:
+            return
+        self.events.inc(event=event, backend=backend)
+        self._call_hooks(self._on_event, event, dict(fields, backend=backend))
+
+    @staticmethod
+    def _call_hooks(hooks, *args):
+        for hook in hooks:
+            try:
+                hook(*args)
+            except Exception:
+                logger.exception(f"Instrumentation hook {hook!r} failed.")
+
+    def collect(self):
+        """Every metric as (name, kind, documentation, samples); samples are (name, labels, value)."""
+        families = [
+            (metric.name, metric.kind, metric.documentation, metric.samples())
+            for metric in self.metrics
+        ]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                logger.exception(f"Metrics collector {collector!r} failed.")
+        return families
+
+    def prometheus_text(self):
+        """The metrics in Prometheus' text exposition format (version 0.0.4)."""
+        lines = []
+        for name, kind, documentation, samples in self.collect():
+            lines.append(f"# HELP {name} {_escape_help(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(
+                    f"{sample_name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _dispatcher_samples():
+    # Only if the dispatcher module was imported; there's nothing to collect otherwise.
+    dispatcher = sys.modules.get(f"{__package__}.dispatcher")
+    if dispatcher is None:
+        return []
+
+    queued, busy, dropped = [], [], []
+    for index, live in enumerate(list(dispatcher._live_dispatchers)):
+        labels = {"dispatcher": str(index)}
+        queued.append(("notifypy_dispatcher_queue_size", labels, live.queue_size))
+        busy.append(("notifypy_dispatcher_busy_workers", labels, live.busy_workers))
+        dropped.append(("notifypy_dispatcher_dropped_total", labels, live.dropped))
+    return [
+        (
+            "notifypy_dispatcher_queue_size",
+            "gauge",
+            "Notifications waiting for a dispatcher worker.",
+            queued,
+        ),
+        (
+            "notifypy_dispatcher_busy_workers",
+            "gauge",
+            "Dispatcher workers sending a notification.",
+            busy,
+        ),
+        (
+            "notifypy_dispatcher_dropped_total",
+            "counter",
+            "Notifications dropped by the dispatcher's overflow policy.",
+            dropped,
+        ),
+    ]
+
+
+def _aggregator_samples():
+    aggregation = sys.modules.get(f"{__package__}.aggregation")
+    if aggregation is None:
+        return []
+
+    counted, pending = [], []
+    for index, live in enumerate(list(aggregation._live_aggregators)):
+        labels = {"aggregator": str(index)}
+        metrics = live.metrics
+        for outcome in ("received", "sent", "merged", "dropped"):
+            counted.append(
+                (
+                    "notifypy_aggregator_notifications_total",
+                    dict(labels, outcome=outcome),
+                    metrics[outcome],
+                )
+            )
+        pending.append(("notifypy_aggregator_pending", labels, metrics["pending"]))
+    return [
+        (
+            "notifypy_aggregator_notifications_total",
+            "counter",
+            "Notifications seen by the aggregator: received, sent, merged and dropped.",
+            counted,
+        ),
+        (
+            "notifypy_aggregator_pending",
+            "gauge",
+            "Aggregation windows still open.",
+            pending,
+        ),
+    ]
+
+
+def _circuit_breaker_samples():
+    retry = sys.modules.get(f"{__package__}.retry")
+    if retry is None:
+        return []
+
+    states = []
+    for index, live in enumerate(list(retry._live_breakers)):
+        for backend, current in live.states.items():
+            for state in retry.STATES:
+                labels = {"breaker": str(index), "backend": backend, "state": state}
+                states.append(("notifypy_circuit_state", labels, int(state == current)))
+    return [
+        (
+            "notifypy_circuit_state",
+            "gauge",
+            "1 for the current state of every backend's circuit: closed, open or half_open.",
+            states,
+        )
+    ]
+
+
+def _default_instrumentation():
+    return instrumentation
+
+
+class OpenTelemetryExporter:
+    def __init__(self, instrumentation=None, meter_provider=None):
+        """Records every send (and event) with OpenTelemetry instruments as well.
+
+        Needs the opentelemetry-api package. Call install() to start recording.
+
+        Args:
+            instrumentation (Instrumentation, optional): Defaults to the process-wide one.
+            meter_provider (optional): Defaults to OpenTelemetry's global meter provider.
+        """
+        try:
+            from opentelemetry import metrics
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryExporter needs the opentelemetry-api package."
+            ) from None
+
+        self.instrumentation = instrumentation or _default_instrumentation()
+        meter = (meter_provider or metrics.get_meter_provider()).get_meter("notifypy")
+        self._sends = meter.create_counter(
+            "notifypy.notifications", description="Notifications sent."
+        )
+        self._latency = meter.create_histogram(
+            "notifypy.send.duration",
+            unit="s",
+            description="Time the backend took to send a notification.",
+        )
+        self._in_flight = meter.create_up_down_counter(
+            "notifypy.sends.in_flight", description="Notifications being sent."
+        )
+        self._events = meter.create_counter(
+            "notifypy.events", description="Retries, circuit breaker changes, ..."
+        )
+
+    def install(self):
+        self.instrumentation.add_hooks(
+            before_send=self._before_send,
+            after_send=self._after_send,
+            on_event=self._on_event,
+        )
+        return self
+
+    def uninstall(self):
+        self.instrumentation.remove_hooks(
+            self._before_send, self._after_send, self._on_event
+        )
+
+    def _before_send(self, backend, notification):
+        self._in_flight.add(1, {"backend": backend})
+
+    def _after_send(self, backend, notification, outcome, duration, exception):
+        self._in_flight.add(-1, {"backend": backend})
+        self._sends.add(1, {"backend": backend, "outcome": outcome})
+        self._latency.record(duration, {"backend": backend})
+
+    def _on_event(self, event, fields):
+        self._events.add(1, {"event": event, "backend": fields.get("backend", "")})
+
+
+# Used by every Notify object.
+instrumentation = Instrumentation()
@@ -0,0 +1,120 @@
+from .assets import DEFAULT_ICON, asset_cache
+
+FIELDS = ("title", "message", "application_name", "urgency", "icon", "audio")
+
+
+def _new(title, message, application_name, urgency, icon, audio):
+    """Builds a Notification from values that are already coerced and verified."""
+    notification = object.__new__(Notification)
+    _set = object.__setattr__
+    _set(notification, "title", title)
+    _set(notification, "message", message)
+    _set(notification, "application_name", application_name)
+    _set(notification, "urgency", urgency)
+    _set(notification, "icon", icon)
+    _set(notification, "audio", audio)
+    return notification
+
+
+class Notification:
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        title="Default Title",
+        message="Default Message",
+        application_name="Python Application (notify.py)",
+        urgency="normal",
+        icon=None,
+        audio=None,
+    ):
+        """An immutable notification, validated once when it's built.
+
+        Notify.send snapshots its attributes into one of these (or sends the one
+        it's given), which then travels unchanged through the dispatcher to the
+        notifier. Setting Notify attributes afterwards can't change a queued
+        notification.
+
+        Args:
+            title (str, optional): Defaults to "Default Title".
+            message (str, optional): Defaults to "Default Message".
+            application_name (str, optional): Defaults to "Python Application (notify.py)".
+            urgency (str, optional): low, normal, critical. Defaults to "normal".
+            icon (str, optional): Path to the icon. Defaults to the notify.py logo.
+            audio (str, optional): Path to a '.wav' file. Defaults to None (no sound).
+
+        Raises:
+            InvalidIconPath: If the icon doesn't exist.
+            InvalidAudioFormat: If the audio isn't a '.wav' file.
+            InvalidAudioPath: If the audio file doesn't exist.
+        """
+        _set = object.__setattr__
+        _set(self, "title", str(title))
+        _set(self, "message", str(message))
+        _set(self, "application_name", str(application_name))
+        _set(self, "urgency", str(urgency))
+        _set(self, "icon", asset_cache.icon(icon) if icon else DEFAULT_ICON)
+        _set(self, "audio", asset_cache.audio(audio) if audio else None)
+
+    def replace(self, **changes):
+        """A copy with the given fields changed. Only the changed fields are validated.
+
+        Raises:
+            TypeError: For unknown fields.
+        """
+        unknown = set(changes) - set(FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown notification fields: {sorted(unknown)}")
+
+        values = [getattr(self, field) for field in FIELDS]
+        for index, field in enumerate(FIELDS):
+            if field not in changes:
+                continue
+            value = changes[field]
+            if field == "icon":
+                values[index] = asset_cache.icon(value) if value else DEFAULT_ICON
+            elif field == "audio":
+                values[index] = asset_cache.audio(value) if value else None
+            else:
+                values[index] = str(value)
+        return _new(*values)
+
+    def notifier_kwargs(self):
+        """The keyword arguments for a notifier's send_notification."""
+        # The slots are set through object.__setattr__, which pylint doesn't follow.
+        # pylint: disable=no-member
+        return dict(
+            notification_title=self.title,
+            notification_subtitle=self.message,
+            application_name=self.application_name,
+            notification_urgency=self.urgency,
+            notification_icon=self.icon,
+            notification_audio=self.audio,
+        )
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Notification is immutable, use replace().")
+
+    def __delattr__(self, name):
+        raise AttributeError("Notification is immutable.")
+
+    def __eq__(self, other):
+        if not isinstance(other, Notification):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __reduce__(self):
+        return (_new, self._values())
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in FIELDS)
+        return f"Notification({fields})"
@@ -1,20 +1,36 @@
-import platform
 import os
-import pathlib
-import threading
+import time
+from collections import deque
 
 
-from loguru import logger
+from ._logging import logger
 from .exceptions import (
     UnsupportedPlatform,
     InvalidAudioPath,
     InvalidIconPath,
     NotificationFailure,
+    NotificationTimeout,
     BinaryNotFound,
     InvalidAudioFormat,
 )
 
+from .assets import asset_cache
+from .instrumentation import instrumentation, is_timeout
+from .notification import Notification
 from .os_notifiers._base import BaseNotifier
+from .registry import SELECTION_KWARGS, backend_registry, select_notifier_class
+
+
+def _time_left(deadline):
+    """Seconds until the deadline.
+
+    Raises:
+        NotificationTimeout: If it passed.
+    """
+    time_left = deadline - time.monotonic()
+    if time_left <= 0:
+        raise NotificationTimeout
+    return time_left
 
 
 class Notify:
@@ -23,7 +39,7 @@ class Notify:
         default_notification_title="Default Title",
         default_notification_message="Default Message",
         default_notification_application_name="Python Application (notify.py)",
-        default_notification_urgency='normal',
+        default_notification_urgency="normal",
         default_notification_icon=None,
         default_notification_audio=None,
         enable_logging=False,
@@ -32,9 +48,18 @@ class Notify:
         """Main Notify Class.
 
         Optional Arugments:
-            override_detected_notification_system: Optional Kwarg that allows for the use of overrding the detected notifier.
+            override_detected_notification_system: Optional Kwarg that allows for the use of overrding the detected platform. (Windows, Darwin, Linux)
+            override_windows_version_detection: Optional Kwarg to use the Windows notifier on an unsupported Windows version.
+            linux_use_legacy_notifier: Optional Kwarg to always use notify-send on Linux.
             disable_logging: Optional Kwarg that will disable stdout logging from this library.
             custom_mac_notificator: Optional Kwarg for a custom mac notifier. (Probably because you want to change the icon.). This is a direct path to the parent directory (.app).
+            dispatcher: Optional Kwarg for a NotificationDispatcher to send from. Defaults to the shared dispatcher.
+            aggregator: Optional Kwarg for a NotificationAggregator that merges and rate-limits notifications before they're sent.
+            outbox: Optional Kwarg for an Outbox that keeps notifications the notifier fails to send, and delivers them later.
+            retry: Optional Kwarg for a RetryPolicy to try failed sends again with exponential backoff.
+            circuit_breaker: Optional Kwarg for a CircuitBreaker that fails sends fast while the notifier keeps failing.
+            backend_chain: Optional Kwarg for a BackendChain, or a list of backends for one (True for the platform's default chain), to fall back from one notifier to the next.
+            send_timeout: Optional Kwarg for the default timeout (seconds) of every send. See send.
 
         """
 
@@ -59,38 +84,60 @@ class Notify:
                 self._notifier_detect = selected_override
             else:
                 raise ValueError("Overrided Notifier must inherit from BaseNotifier.")
+        elif kwargs.get("backend_chain"):
+            from .chain import BackendChain
+
+            self._notifier_detect = BackendChain
         else:
+            selection_kwargs = {
+                key: kwargs[key] for key in SELECTION_KWARGS if key in kwargs
+            }
             check_if_user_override_detection = kwargs.get(
                 "override_detected_notification_system"
             )
             if check_if_user_override_detection:
-                self._notifier_detect = self._selected_notification_system(**kwargs)
-            else:
-                self._notifier_detect = self._selected_notification_system()
-
-        # Initialize.
-        self._notifier = self._notifier_detect(**kwargs)
-
-        # Set the defaults.
-        self._notification_title = default_notification_title
-        self._notification_message = default_notification_message
-        self._notification_application_name = default_notification_application_name
-        self._notification_urgency = default_notification_urgency
+                selection_kwargs["override_detection"] = (
+                    check_if_user_override_detection
+                )
+            self._notifier_detect = backend_registry.notifier_class(**selection_kwargs)
 
-        # These defaults require verification
-        if default_notification_icon:
-            self._notification_icon = self._verify_icon_path(default_notification_icon)
+        # Initialize. Detected notifiers are shared between Notify objects.
+        if kwargs.get("use_custom_notifier"):
+            self._notifier = self._notifier_detect(**kwargs)
+        elif kwargs.get("backend_chain"):
+            self._notifier = self._backend_chain(**kwargs)
         else:
-            self._notification_icon = str(
-                os.path.join(os.path.dirname(__file__), "py-logo.png")
-            )
+            self._notifier = backend_registry.notifier(self._notifier_detect, **kwargs)
+        self._dispatcher = kwargs.get("dispatcher")
+        self._aggregator = kwargs.get("aggregator")
+        self._send_timeout = kwargs.get("send_timeout")
+        self._retry = kwargs.get("retry")
+        self._circuit_breaker = kwargs.get("circuit_breaker")
+        self._outbox = kwargs.get("outbox")
+        if self._outbox is not None:
+            # Deliver what a previous run left behind.
+            self._outbox.resume(self._send_now)
+
+        # Set the defaults. The icon and audio are verified here.
+        self._notification = Notification(
+            title=default_notification_title,
+            message=default_notification_message,
+            application_name=default_notification_application_name,
+            urgency=default_notification_urgency,
+            icon=default_notification_icon,
+            audio=default_notification_audio,
+        )
 
-        if default_notification_audio:
-            self._notification_audio = self._verify_audio_path(
-                default_notification_audio
-            )
-        else:
-            self._notification_audio = None
+    @staticmethod
+    def _backend_chain(backend_chain, **kwargs):
+        """backend_chain if it's a BackendChain, else a BackendChain of the backends it lists."""
+        from .chain import BackendChain
+
+        if isinstance(backend_chain, BackendChain):
+            return backend_chain
+        if backend_chain is True:
+            backend_chain = None
+        return BackendChain(backend_chain, **kwargs)
 
     @staticmethod
     def _selected_notification_system(
@@ -98,87 +145,19 @@ class Notify:
         override_windows_version_detection: bool = False,
         linux_use_legacy_notifier: bool = False,
     ):
-
-        if override_detection:
-            logger.info(f"chosen to override to {override_detection}.")
-            selected_platform = override_detection
-        else:
-            selected_platform = platform.system()
-
-        if selected_platform == "Darwin":
-            from .os_notifiers.macos import MacOSNotifier
-
-            return MacOSNotifier
-        elif selected_platform == "Windows":
-            if platform.release() in {"10", "11"}:
-                from .os_notifiers.windows import WindowsNotifier
-
-                return WindowsNotifier
-
-            if override_windows_version_detection == True:
-                from .os_notifiers.windows import WindowsNotifier
-
-                return WindowsNotifier
-
-            raise UnsupportedPlatform(
-                f"This version of Windows ({platform.release()}) is not supported."
-            )
-        else:
-            if selected_platform != "Linux":
-                logger.warning(f'{selected_platform} might not be supported!')
-
-            if linux_use_legacy_notifier:
-                from .os_notifiers.linux import LinuxNotifierLibNotify
-
-                return LinuxNotifierLibNotify
-            else:
-
-                from .os_notifiers.linux import NOTIFY
-
-                if NOTIFY:
-                    from .os_notifiers.linux import LinuxNotifierLibNotify
-
-                    return LinuxNotifierLibNotify
-                else:
-                    from .os_notifiers.linux import LinuxNotifier
-
-                    return LinuxNotifier
+        return select_notifier_class(
+            override_detection=override_detection,
+            override_windows_version_detection=override_windows_version_detection,
+            linux_use_legacy_notifier=linux_use_legacy_notifier,
+        )
 
     @staticmethod
     def _verify_audio_path(new_audio_path):
-        # we currently only support .wav files
-        if not new_audio_path.endswith(".wav"):
-            raise InvalidAudioFormat
-
-        # first detect if it already exists.
-        if pathlib.Path(new_audio_path).exists():
-            return str(pathlib.Path(new_audio_path).absolute())
-        else:
-            # Ok doesn't exist, let's try a join
-            if pathlib.Path(
-                os.path.join(os.path.dirname(__file__), new_audio_path)
-            ).exists():
-                return str(os.path.join(os.path.dirname(__file__), new_audio_path))
-            else:
-                raise InvalidAudioPath(
-                    f"Could not find specified audio path to '{new_audio_path}'. Please check if it exists."
-                )
+        return asset_cache.audio(new_audio_path)
 
     @staticmethod
     def _verify_icon_path(new_icon_path):
-        # first detect if it already exists.
-        if pathlib.Path(new_icon_path).exists():
-            return str(pathlib.Path(new_icon_path).absolute())
-        else:
-            # Ok doesn't exist, let's try a join
-            if pathlib.Path(
-                os.path.join(os.path.dirname(__file__), new_icon_path)
-            ).exists():
-                return os.path.join(os.path.dirname(__file__), new_icon_path)
-            else:
-                raise InvalidIconPath(
-                    f"Could not find specified icon path to '{new_icon_path}'. Please check if it exists."
-                )
+        return asset_cache.icon(new_icon_path)
 
     @property
     def audio(self):
@@ -187,11 +166,11 @@ class Notify:
         Returns:
             str: direct path to '.wav' audio file.
         """
-        return self._notification_audio
+        return self._notification.audio
 
     @audio.setter
     def audio(self, new_audio_path):
-        self._notification_audio = self._verify_audio_path(new_audio_path)
+        self._notification = self._notification.replace(audio=new_audio_path)
 
     @property
     def icon(self):
@@ -202,11 +181,11 @@ class Notify:
         Returns:
             str: A direct path to a '.png' image file.
         """
-        return self._notification_icon
+        return self._notification.icon
 
     @icon.setter
     def icon(self, new_icon_path):
-        self._notification_icon = self._verify_icon_path(new_icon_path)
+        self._notification = self._notification.replace(icon=new_icon_path)
 
     @property
     def title(self):
@@ -217,11 +196,11 @@ class Notify:
         Returns:
             str: The top (often bolded) message for the notification.
         """
-        return self._notification_title
+        return self._notification.title
 
     @title.setter
     def title(self, new_title):
-        self._notification_title = new_title
+        self._notification = self._notification.replace(title=new_title)
 
     @property
     def message(self):
@@ -230,11 +209,11 @@ class Notify:
         Returns:
             str: The message for the notification.
         """
-        return self._notification_message
+        return self._notification.message
 
     @message.setter
     def message(self, new_message):
-        self._notification_message = new_message
+        self._notification = self._notification.replace(message=new_message)
 
     @property
     def application_name(self):
@@ -244,53 +223,266 @@ class Notify:
         Returns:
             str: the application name
         """
-        return self._notification_application_name
+        return self._notification.application_name
 
     @application_name.setter
     def application_name(self, new_application_name):
-        self._notification_application_name = new_application_name
+        self._notification = self._notification.replace(
+            application_name=new_application_name
+        )
 
     @property
     def urgency(self):
-        """The urgency of the notification (low, normal, critical) 
+        """The urgency of the notification (low, normal, critical)
         Works only with libnotify (Linux), as of now
 
         Returns:
             str: The urgency of the notification.
         """
-        return self._notification_urgency
+        return self._notification.urgency
 
     @urgency.setter
     def urgency(self, new_urgency):
-        self._notification_urgency = new_urgency
+        self._notification = self._notification.replace(urgency=new_urgency)
+
+    @property
+    def notification(self):
+        """The current title, message, application name, urgency, icon and audio as an immutable Notification.
+
+        Returns:
+            Notification: what send() would send now.
+        """
+        return self._notification
+
+    @property
+    def capabilities(self):
+        """The optional features the notification server supports, as reported by
+        GetCapabilities (e.g. "body", "body-markup", "icon-static", "sound").
+        Only the D-Bus notifier knows them; they're asked for once and again after reconnecting.
+
+        Returns:
+            frozenset: The capabilities.
+            None: if the notifier can't tell.
+        """
+        return self._notifier.capabilities()
+
+    @property
+    def server_information(self):
+        """The notification server's name, vendor, version and spec_version (GetServerInformation).
+
+        Returns:
+            ServerInformation: a namedtuple.
+            None: if the notifier can't tell.
+        """
+        return self._notifier.server_information()
 
-    def send(self, block=True):
+    def send(self, block=True, handle=False, notification=None, timeout=None):
         """Main send function. This will take all attributes sent and forward to
         send_notification.
 
+        Notifications are sent from the dispatcher's worker threads (see NotificationDispatcher),
+        after passing the aggregator if there is one (see NotificationAggregator).
+
+        With a timeout, the notification has a deadline: it's dropped if it's still
+        queued when the deadline passes, and the notifier is given the time left
+        (notifier processes still running at the deadline are killed). A send that
+        missed its deadline returns False, and its future raises NotificationTimeout.
+        Handle updates and the summaries of merged notifications an aggregator sends
+        later get a deadline from send_timeout, counted from when they're queued.
+
         Args:
             block (bool, optional): Optional value to not to block the main application thread. If enabled this won't return a bool. Defaults to True.
+            handle (bool, optional): Return a NotificationHandle to update the notification in place. Handles skip the aggregator. Defaults to False.
+            notification (Notification, optional): Send this instead of the attributes. May also be passed as first argument.
+            timeout (float, optional): Seconds the send may take, including the time it's queued. Defaults to the send_timeout Notify was created with, or waiting up to 35 seconds without a deadline.
 
         Returns:
             bool: as long as the block isn't set to False.
+            NotificationFuture: if block is set to False. A concurrent.futures.Future carrying the result (or exception) of send_notification.
+            NotificationHandle: if handle is set to True. Its id is set once the notification was sent.
         """
+        if isinstance(block, Notification):
+            notification, block = block, True
+
         # if block is True, wait for the notification to complete and return if it was successful
-        # else start the thread and return a threading.Event that will determine when the notification was successful
-        event = threading.Event()
+        # else return a future that will determine when the notification was successful
         try:
-            thread = threading.Thread(
-                target=lambda: self.start_notification_thread(event)
-            )
-            thread.name = "notify.py"
-            thread.start()
+            if timeout is None:
+                timeout = self._send_timeout
+            deadline = None if timeout is None else time.monotonic() + timeout
+
+            # A snapshot: later attribute changes don't affect this notification.
+            if notification is None:
+                notification = self._notification
+
+            if handle:
+                from .handle import NotificationHandle
+
+                notification_handle = NotificationHandle(
+                    self, notification, self._get_dispatcher()
+                )
+                future = notification_handle._submit(notification, deadline)
+                if block:
+                    self._wait(future, timeout)
+                return notification_handle
+
+            if self._aggregator is not None:
+                future = self._aggregator.submit(
+                    self._dispatch_aggregated, notification, deadline
+                )
+            else:
+                future = self._dispatch(notification, deadline)
             if block:
-                thread.join(timeout=35)
-                return event.is_set()
-            return event
+                return self._wait(future, timeout)
+            return future
         except Exception:
             logger.exception("Unhandled exception for sending notification.")
             raise
 
+    def _get_dispatcher(self):
+        if self._dispatcher is None:
+            from .dispatcher import get_default_dispatcher
+
+            return get_default_dispatcher()
+        return self._dispatcher
+
+    @staticmethod
+    def _wait(future, timeout):
+        """Waits for a send. Cancels it if it's still queued after timeout seconds."""
+        sent = future.wait(timeout=35 if timeout is None else timeout)
+        if not future.done():
+            future.cancel()
+            logger.error("The notification wasn't sent in time.")
+        return sent
+
+    def _deadline(self):
+        """The deadline of a send that started now, from send_timeout."""
+        if self._send_timeout is None:
+            return None
+        return time.monotonic() + self._send_timeout
+
+    def _dispatch(self, notification, deadline=None):
+        """Queues a Notification on the dispatcher."""
+        return self._get_dispatcher().submit(self._send, notification, deadline)
+
+    def _dispatch_aggregated(self, notification, deadline=None):
+        """Queues a Notification the aggregator let through. Summaries come without a deadline, they get one from send_timeout."""
+        if deadline is None:
+            deadline = self._deadline()
+        return self._dispatch(notification, deadline)
+
+    def _send(self, notification, deadline=None):
+        """Sends a Notification from the calling thread. See send_notification.
+
+        With an outbox, notifications that fail (or would overtake pending
+        ones) are appended to it instead, and False is returned. The outbox
+        retries later, so sends through it get send_timeout instead of the
+        deadline.
+        """
+        if self._outbox is None:
+            return self._send_notifier_kwargs(notification.notifier_kwargs(), deadline)
+        return self._outbox.send(self._send_now, notification)
+
+    def _send_now(self, notification):
+        return self._send_notifier_kwargs(
+            notification.notifier_kwargs(), self._deadline()
+        )
+
+    def _replace_notification(self, notification, replaces_id, deadline=None):
+        """Sends a Notification through the notifier's notify, replacing `replaces_id`.
+
+        Returns:
+            int: The notification's id (0 if the notifier doesn't assign ids).
+            None: if the notification wasn't sent (in time).
+        """
+        notifier_kwargs = notification.notifier_kwargs()
+        span = None
+        if instrumentation.enabled:
+            span = instrumentation.start_send(self._backend, notifier_kwargs)
+        try:
+            if deadline is not None:
+                notifier_kwargs = dict(
+                    notifier_kwargs, send_timeout=_time_left(deadline)
+                )
+            notification_id = self._notifier.notify(
+                replaces_id=replaces_id, **notifier_kwargs
+            )
+        except Exception as exception:
+            if span is not None:
+                span.finish(exception=exception)
+            if is_timeout(exception):
+                logger.error("Timed out sending notification.")
+            else:
+                logger.exception("Exception on sending notification.")
+            return None
+
+        if span is not None:
+            span.finish(notification_id is not None)
+
+        if notification_id is None:
+            logger.info("unable to send notification.")
+        else:
+            logger.info(f"Sent notification. id: {notification_id}")
+        return notification_id
+
+    def send_many(self, notifications):
+        """Sends many notifications through one notifier session, in the calling thread.
+        (One D-Bus connection on Linux, one PowerShell process per chunk of toasts on Windows.)
+
+        Args:
+            notifications (iterable): Notification objects, or dicts with any of the keys title, message, application_name, urgency, icon and audio (missing keys use this object's attributes). Generators are consumed lazily.
+
+        Raises:
+            InvalidIconPath: If a notification has an icon that doesn't exist.
+            InvalidAudioPath: If a notification has an audio file that doesn't exist.
+
+        Returns:
+            list: One bool per notification, in order. True if the notification was sent.
+        """
+        notifier_kwargs = (
+            self._as_notification(notification).notifier_kwargs()
+            for notification in notifications
+        )
+        if instrumentation.enabled:
+            sent = self._send_instrumented_batch(notifier_kwargs)
+        else:
+            sent = self._notifier.send_notifications(notifier_kwargs)
+        results = [bool(result) for result in sent]
+        logger.info(f"Sent {sum(results)} out of {len(results)} notifications.")
+        return results
+
+    def _send_instrumented_batch(self, notifier_kwargs):
+        """send_notifications, measuring each notification from when the notifier
+        takes it until its result arrives (pipelined sends overlap)."""
+        spans = deque()
+
+        def started(notifier_kwargs):
+            for kwargs in notifier_kwargs:
+                spans.append(instrumentation.start_send(self._backend, kwargs))
+                yield kwargs
+
+        try:
+            for result in self._notifier.send_notifications(started(notifier_kwargs)):
+                spans.popleft().finish(result)
+                yield result
+        except Exception as exception:
+            while spans:
+                spans.popleft().finish(exception=exception)
+            raise
+
+    def _as_notification(self, notification):
+        """A send_many item as Notification. Dicts fill in this object's attributes."""
+        if isinstance(notification, Notification):
+            return notification
+        # Empty icons and audio keep this object's.
+        return self._notification.replace(
+            **{
+                key: value
+                for key, value in notification.items()
+                if value or key not in ("icon", "audio")
+            }
+        )
+
     def start_notification_thread(self, event):
         """Function for sending notification via a seperate thread.
         You don't need to call this directly. Do .send(block=False)
@@ -298,14 +490,7 @@ class Notify:
         Args:
             event (threading.Thread): event to be recieved.
         """
-        result = self.send_notification(
-            supplied_title=self._notification_title,
-            supplied_message=self._notification_message,
-            supplied_application_name=self._notification_application_name,
-            supplied_urgency=self._notification_urgency,
-            supplied_icon_path=self._notification_icon,
-            supplied_audio_path=self._notification_audio,
-        )
+        result = self._send(self._notification, self._deadline())
         if result:
             event.set()
         else:
@@ -336,23 +521,250 @@ class Notify:
         Returns:
             bool: True if the notification was sent.
         """
+        return self._send_notifier_kwargs(
+            self._notifier_kwargs(
+                supplied_title,
+                supplied_message,
+                supplied_application_name,
+                supplied_urgency,
+                supplied_icon_path,
+                supplied_audio_path,
+            ),
+            self._deadline(),
+        )
+
+    @property
+    def _backend(self):
+        """The notifier's name, as label for the instrumentation."""
+        return type(self._notifier).__name__
+
+    def _send_notifier_kwargs(self, notifier_kwargs, deadline=None):
+        if self._retry is not None or self._circuit_breaker is not None:
+            return self._send_with_retries(notifier_kwargs, deadline)
+        return self._send_once(notifier_kwargs, deadline)
+
+    def _send_with_retries(self, notifier_kwargs, deadline=None):
+        """Sends through the circuit breaker, retrying as the retry policy says (and the deadline allows)."""
+        backend = self._backend
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self._circuit_allows(backend):
+                return False
+            try:
+                if self._send_once(notifier_kwargs, deadline):
+                    self._record_success(backend)
+                    return True
+                failure = None
+            except NotificationFailure as exception:
+                failure = exception
+
+            delay = self._retry_delay(backend, attempt, failure, deadline)
+            if delay is None:
+                if failure is not None:
+                    raise failure
+                return False
+            time.sleep(delay)
+
+    def _circuit_allows(self, backend):
+        if self._circuit_breaker is None or self._circuit_breaker.allow(backend):
+            return True
+        logger.info(f"Not sending, {backend} keeps failing.")
+        return False
+
+    def _record_success(self, backend):
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record_success(backend)
+
+    def _retry_delay(self, backend, attempt, failure, deadline=None):
+        """Records the failed attempt. Returns the seconds to wait before the next one, or None to give up."""
+        if self._circuit_breaker is not None:
+            from .retry import CLOSED
+
+            self._circuit_breaker.record_failure(backend)
+            if self._circuit_breaker.state(backend) != CLOSED:
+                return None
+
+        retry = self._retry
+        if (
+            retry is None
+            or attempt >= retry.attempts
+            or (failure is None and not retry.retry_on_false)
+        ):
+            return None
+        delay = retry.delay(attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        logger.info(f"Retrying the notification in {delay:.2f}s (attempt {attempt}).")
+        instrumentation.event("retry", backend, attempt=attempt, delay=delay)
+        return delay
+
+    def _send_once(self, notifier_kwargs, deadline=None):
+        span = None
+        if instrumentation.enabled:
+            span = instrumentation.start_send(self._backend, notifier_kwargs)
         try:
+            if deadline is not None:
+                notifier_kwargs = dict(
+                    notifier_kwargs, send_timeout=_time_left(deadline)
+                )
             attempt_to_send_notifiation = self._notifier.send_notification(
-                notification_title=str(supplied_title),
-                notification_subtitle=str(supplied_message),
-                application_name=str(supplied_application_name),
-                notification_urgency=str(supplied_urgency),
-                notification_icon=str(supplied_icon_path),
-                notification_audio=str(supplied_audio_path)
-                if supplied_audio_path
-                else None,
+                **notifier_kwargs
             )
             if attempt_to_send_notifiation:
                 logger.info("Sent notification.")
             else:
                 logger.info("unable to send notification.")
 
+            if span is not None:
+                span.finish(attempt_to_send_notifiation)
             return attempt_to_send_notifiation
-        except Exception:
+        except Exception as exception:
+            if span is not None:
+                span.finish(exception=exception)
+            if is_timeout(exception):
+                logger.error("Timed out sending notification.")
+                raise NotificationTimeout
             logger.exception("Exception on sending notification.")
             raise NotificationFailure
+
+    async def send_async(self, timeout=None):
+        """Awaitable send function. This will take all attributes and forward them
+        to the notifier without starting a thread.
+
+        Notifiers with native asyncio support (D-Bus, notify-send, macOS and Windows)
+        don't use any threads at all. Custom notifiers fall back to the event loop's default executor.
+
+        Args:
+            timeout (float, optional): Seconds the send may take, see send. Defaults to the send_timeout Notify was created with, or none.
+
+        Raises:
+            NotificationTimeout: If the notification wasn't sent in time.
+
+        Returns:
+            bool: True if the notification was sent.
+        """
+        if timeout is None:
+            deadline = self._deadline()
+        else:
+            deadline = time.monotonic() + timeout
+        return await self._send_notifier_kwargs_async(
+            self._notification.notifier_kwargs(), deadline
+        )
+
+    async def send_notification_async(
+        self,
+        supplied_title,
+        supplied_message,
+        supplied_application_name,
+        supplied_urgency,
+        supplied_icon_path,
+        supplied_audio_path,
+    ):
+        """Awaitable version of send_notification.
+
+        Raises:
+            NotificationFailure: If there was an Exception in sending the notification.
+
+        Returns:
+            bool: True if the notification was sent.
+        """
+        return await self._send_notifier_kwargs_async(
+            self._notifier_kwargs(
+                supplied_title,
+                supplied_message,
+                supplied_application_name,
+                supplied_urgency,
+                supplied_icon_path,
+                supplied_audio_path,
+            ),
+            self._deadline(),
+        )
+
+    async def _send_notifier_kwargs_async(self, notifier_kwargs, deadline=None):
+        if self._retry is not None or self._circuit_breaker is not None:
+            return await self._send_with_retries_async(notifier_kwargs, deadline)
+        return await self._send_once_async(notifier_kwargs, deadline)
+
+    async def _send_with_retries_async(self, notifier_kwargs, deadline=None):
+        """Awaitable version of _send_with_retries."""
+        import asyncio
+
+        backend = self._backend
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self._circuit_allows(backend):
+                return False
+            try:
+                if await self._send_once_async(notifier_kwargs, deadline):
+                    self._record_success(backend)
+                    return True
+                failure = None
+            except NotificationFailure as exception:
+                failure = exception
+
+            delay = self._retry_delay(backend, attempt, failure, deadline)
+            if delay is None:
+                if failure is not None:
+                    raise failure
+                return False
+            await asyncio.sleep(delay)
+
+    async def _send_once_async(self, notifier_kwargs, deadline=None):
+        span = None
+        if instrumentation.enabled:
+            span = instrumentation.start_send(self._backend, notifier_kwargs)
+        try:
+            if deadline is None:
+                attempt_to_send_notifiation = (
+                    await self._notifier.send_notification_async(**notifier_kwargs)
+                )
+            else:
+                import asyncio
+
+                time_left = _time_left(deadline)
+                # Also cancels notifiers that don't know about send_timeout.
+                attempt_to_send_notifiation = await asyncio.wait_for(
+                    self._notifier.send_notification_async(
+                        **dict(notifier_kwargs, send_timeout=time_left)
+                    ),
+                    time_left,
+                )
+            if attempt_to_send_notifiation:
+                logger.info("Sent notification.")
+            else:
+                logger.info("unable to send notification.")
+
+            if span is not None:
+                span.finish(attempt_to_send_notifiation)
+            return attempt_to_send_notifiation
+        except Exception as exception:
+            if span is not None:
+                span.finish(exception=exception)
+            if is_timeout(exception):
+                logger.error("Timed out sending notification.")
+                raise NotificationTimeout
+            logger.exception("Exception on sending notification.")
+            raise NotificationFailure
+
+    @staticmethod
+    def _notifier_kwargs(
+        supplied_title,
+        supplied_message,
+        supplied_application_name,
+        supplied_urgency,
+        supplied_icon_path,
+        supplied_audio_path,
+    ):
+        """Builds the keyword arguments every notifier receives."""
+        return dict(
+            notification_title=str(supplied_title),
+            notification_subtitle=str(supplied_message),
+            application_name=str(supplied_application_name),
+            notification_urgency=str(supplied_urgency),
+            notification_icon=str(supplied_icon_path),
+            notification_audio=(
+                str(supplied_audio_path) if supplied_audio_path else None
+            ),
+        )
@@ -0,0 +1,178 @@
+import atexit
+import queue
+import subprocess
+import threading
+import wave
+
+from .._logging import logger
+
+# aplay sample formats by sample width (bytes) of a PCM .wav file.
+APLAY_FORMATS = {1: "U8", 2: "S16_LE", 3: "S24_3LE", 4: "S32_LE"}
+
+# Frames written to aplay at once.
+CHUNK_FRAMES = 4096
+
+
+class AudioPlayer:
+    def __init__(self, aplay, idle_timeout=5.0, max_queued=4):
+        """Plays .wav files through one long-lived aplay process.
+
+        The files are decoded in-process and their frames are written to aplay's
+        stdin as raw PCM, so sounds don't fork a process each. aplay is only
+        restarted when the sample format changes, and exits after idle_timeout
+        seconds without sounds so the audio device isn't held open. Sounds are
+        played one after another, from a daemon thread. So that a burst of
+        notifications doesn't leave their sounds lagging far behind, at most
+        max_queued sounds wait for their turn; more are dropped.
+
+        Args:
+            aplay (str): Path to aplay.
+            idle_timeout (float, optional): Seconds to keep aplay running without sounds. Defaults to 5.0.
+            max_queued (int, optional): Sounds waiting to be played at most. None queues them all. Defaults to 4.
+        """
+        self.aplay = aplay
+        self.idle_timeout = idle_timeout
+        self.max_queued = max_queued
+        # Amount of aplay processes started, for the curious (and the tests).
+        self.started = 0
+        # Sounds dropped because too many were waiting.
+        self.dropped = 0
+
+        self._sounds = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._process = None
+        self._format = None
+        self._closing = False
+
+    def play(self, path):
+        """Queues a .wav file, without waiting for it to be played. Drops it if max_queued sounds are waiting."""
+        if self.max_queued is not None and self._sounds.qsize() >= self.max_queued:
+            self.dropped += 1
+            logger.warning(f"{self.max_queued} sounds are waiting, not playing {path}.")
+            return
+        self._sounds.put(path)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.name = "notify.py-audio"
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                path = self._sounds.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._stop_process()
+                path = self._sounds.get()
+
+            if path is None:
+                self._stop_process()
+                return
+            try:
+                self._play_file(path)
+            except Exception:
+                if not self._closing:
+                    logger.exception(f"Unable to play {path}.")
+                self._stop_process()
+
+    def _play_file(self, path):
+        with wave.open(path, "rb") as wav:
+            sample_format = APLAY_FORMATS.get(wav.getsampwidth())
+            if sample_format is None:
+                raise ValueError(f"Unsupported sample width: {wav.getsampwidth()}")
+            process = self._player(
+                (sample_format, wav.getnchannels(), wav.getframerate())
+            )
+
+            frames = wav.readframes(CHUNK_FRAMES)
+            while frames:
+                process.stdin.write(frames)
+                frames = wav.readframes(CHUNK_FRAMES)
+            process.stdin.flush()
+
+    def _player(self, audio_format):
+        """The running aplay process for the format, (re)started if needed."""
+        if self._process is not None and (
+            self._format != audio_format or self._process.poll() is not None
+        ):
+            self._stop_process()
+
+        if self._process is None:
+            sample_format, channels, rate = audio_format
+            self._process = subprocess.Popen(
+                [
+                    self.aplay,
+                    "-q",
+                    "-t",
+                    "raw",
+                    "-f",
+                    sample_format,
+                    "-c",
+                    str(channels),
+                    "-r",
+                    str(rate),
+                    "-",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            self._format = audio_format
+            self.started += 1
+        return self._process
+
+    def _stop_process(self):
+        """Lets aplay finish the written frames, then reaps it."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        process.wait()
+
+    def close(self, wait=True):
+        """Stops aplay, after playing the queued sounds or right away.
+
+        Args:
+            wait (bool, optional): Wait until the queued sounds were played. If False, they're dropped and the sound being played is cut off. Defaults to True.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        if not wait:
+            self._closing = True
+            while True:
+                try:
+                    self._sounds.get_nowait()
+                except queue.Empty:
+                    break
+            process = self._process
+            if process is not None:
+                process.terminate()
+        self._sounds.put(None)
+        if wait:
+            thread.join()
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_player(aplay):
+    """The player shared by every Linux notifier, created on first use."""
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = AudioPlayer(aplay)
+        return _player
+
+
+@atexit.register
+def _close_player():
+    # Don't hold up the interpreter's exit for sounds nobody waits for.
+    if _player is not None:
+        _player.close(wait=False)
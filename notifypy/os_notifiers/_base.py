@@ -1,7 +1,71 @@
+import functools
+
+from .._logging import logger
+
+
 class BaseNotifier(object):
     """This is a base object to be inheritied by each notifier. You can inherit this if you choose to create your own notifier."""
 
+    # BackendChain only uses fallback-only notifiers (e.g. LogNotifier) when every other backend failed.
+    fallback_only = False
+
     def send_notification(self, **kwargs):
         raise NotImplementedError(
             "You'll need to expose a send_notification method in your notifier."
         )
+
+    def capabilities(self):
+        """The optional features the notification server supports (freedesktop
+        capability names, e.g. "body", "icon-static", "sound"), or None if the
+        notifier can't tell.
+        """
+        return None
+
+    def server_information(self):
+        """The notification server's name, vendor, version and spec_version, or None if the notifier can't tell."""
+        return None
+
+    def notify(self, replaces_id=0, **kwargs):
+        """Sends a notification, replacing an earlier one if the notifier supports it.
+
+        Notifiers that can update notifications in place (D-Bus) override this.
+        The default implementation sends a new notification every time.
+
+        Args:
+            replaces_id (int, optional): Id of the notification to replace. Defaults to 0 (none).
+            **kwargs: keyword arguments for send_notification.
+
+        Returns:
+            int: The notification's id, 0 if the notifier doesn't assign ids.
+            None: if the notification wasn't sent.
+        """
+        return 0 if self.send_notification(**kwargs) else None
+
+    def send_notifications(self, notifications):
+        """Sends many notifications, yielding one result per notification in order.
+
+        The default implementation calls send_notification for each of them.
+        Override this if your notifier can send a batch through one session.
+
+        Args:
+            notifications (iterable): keyword arguments for send_notification, one dict per notification.
+        """
+        for notification in notifications:
+            try:
+                yield self.send_notification(**notification)
+            except Exception:
+                logger.exception("Exception on sending notification.")
+                yield False
+
+    async def send_notification_async(self, **kwargs):
+        """Awaitable version of send_notification.
+
+        Notifiers without native asyncio support fall back to running
+        send_notification in the event loop's default executor. Override this
+        if your notifier can send without blocking.
+        """
+        import asyncio
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(self.send_notification, **kwargs)
+        )
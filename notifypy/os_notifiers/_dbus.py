@@ -0,0 +1,379 @@
+import asyncio
+import socket
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from .._logging import logger
+from jeepney import DBusAddress, HeaderFields, MessageType
+from jeepney.io.blocking import open_dbus_connection
+from jeepney.io import asyncio as jeepney_asyncio
+from jeepney.io.common import RouterClosed
+
+NOTIFICATIONS_ADDRESS = DBusAddress(
+    "/org/freedesktop/Notifications",
+    bus_name="org.freedesktop.Notifications",
+    interface="org.freedesktop.Notifications",
+)
+
+
+def _close_connections(connections):
+    """Closes every connection in the given container. Used as a finalizer."""
+    while connections:
+        connection = connections.pop()
+        try:
+            connection.close()
+        except Exception:
+            logger.exception("linux: unable to close dbus connection.")
+
+
+class ConnectionPoolTimeout(TimeoutError):
+    """No pooled connection became free in time."""
+
+
+def is_error_reply(reply):
+    """Returns True if the given D-Bus reply is an error message."""
+    return reply.header.message_type == MessageType.error
+
+
+class DBusConnectionPool:
+    def __init__(self, bus="SESSION", max_size=2):
+        """A small pool of long-lived D-Bus connections.
+
+        Connections are opened lazily, checked before they are handed out and
+        replaced when the bus drops them. Idle connections are closed when the
+        pool is garbage collected or the interpreter exits.
+
+        Args:
+            bus (str, optional): "SESSION", "SYSTEM" or a D-Bus address. Defaults to "SESSION".
+            max_size (int, optional): Maximum amount of open connections. Defaults to 2.
+        """
+        if max_size < 1:
+            raise ValueError("A connection pool needs at least one connection.")
+
+        self.bus = bus
+        self.max_size = max_size
+        # Incremented whenever a connection is discarded, so callers can
+        # invalidate what they learned through the old connection.
+        self.generation = 0
+
+        self._idle = deque()
+        self._opened = 0
+        self._condition = threading.Condition()
+        self._finalizer = weakref.finalize(self, _close_connections, self._idle)
+
+    @property
+    def opened(self):
+        """The amount of connections currently owned by the pool (idle or in use)."""
+        return self._opened
+
+    @staticmethod
+    def _is_alive(connection):
+        """Checks (without blocking) that the peer hasn't closed the connection."""
+        try:
+            if connection.sock.fileno() == -1:
+                return False
+            return connection.sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) != b""
+        except BlockingIOError:
+            # Nothing to read, but the socket is still open.
+            return True
+        except OSError:
+            return False
+
+    def _acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection = self._idle.pop()
+                    if self._is_alive(connection):
+                        return connection
+                    logger.debug("linux: discarding dropped dbus connection.")
+                    self._discard_locked(connection)
+
+                if self._opened < self.max_size:
+                    self._opened += 1
+                    break
+
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    time_left = deadline - time.monotonic()
+                    if time_left <= 0:
+                        raise ConnectionPoolTimeout(
+                            "No pooled dbus connection became free in time."
+                        )
+                    self._condition.wait(time_left)
+
+        try:
+            connection = open_dbus_connection(bus=self.bus)
+            logger.debug("linux: opened dbus connection")
+            return connection
+        except BaseException:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, connection):
+        with self._condition:
+            if self._finalizer.alive:
+                self._idle.append(connection)
+            else:
+                self._discard_locked(connection)
+            self._condition.notify()
+
+    def _discard(self, connection):
+        with self._condition:
+            self._discard_locked(connection)
+            self._condition.notify()
+
+    def _discard_locked(self, connection):
+        self._opened -= 1
+        self.generation += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Checks out a connection for the duration of the with-block.
+
+        Connections that raise a connection error while checked out are
+        discarded instead of being returned to the pool.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a connection when all of them are in use. Defaults to waiting as long as it takes.
+
+        Raises:
+            ConnectionPoolTimeout: If no connection became free within timeout.
+        """
+        connection = self._acquire(timeout)
+        try:
+            yield connection
+        except (ConnectionError, EOFError):
+            self._discard(connection)
+            raise
+        except TimeoutError:
+            # The reply may still arrive later, jeepney will skip it.
+            self._release(connection)
+            raise
+        except OSError:
+            self._discard(connection)
+            raise
+        except BaseException:
+            self._release(connection)
+            raise
+        else:
+            self._release(connection)
+
+    def send_and_get_reply(self, message, timeout=None):
+        """Sends a method call and waits for its reply.
+
+        If the bus dropped the connection, the call is retried once on a fresh
+        connection. The timeout covers waiting for a free connection as well.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            with self.connection(self._time_left(deadline)) as connection:
+                return connection.send_and_get_reply(
+                    message, timeout=self._time_left(deadline)
+                )
+        except TimeoutError:
+            raise
+        except (ConnectionError, EOFError, OSError):
+            logger.debug("linux: dbus connection dropped, reconnecting.")
+
+        with self.connection(self._time_left(deadline)) as connection:
+            return connection.send_and_get_reply(
+                message, timeout=self._time_left(deadline)
+            )
+
+    @staticmethod
+    def _time_left(deadline):
+        return None if deadline is None else max(0, deadline - time.monotonic())
+
+    def close(self):
+        """Closes all idle connections. Connections in use are closed on release."""
+        with self._condition:
+            self._opened -= len(self._idle)
+            self._finalizer()
+            self._condition.notify_all()
+
+
+class DBusPipeline:
+    def __init__(self, connection, window=64, timeout=2):
+        """Writes method calls back-to-back on one connection and matches the
+        replies to their calls by serial number as they arrive.
+
+        Throughput is then bounded by how fast the server processes the calls,
+        instead of one round-trip per call.
+
+        Args:
+            connection (DBusConnection): A blocking jeepney connection.
+            window (int, optional): Maximum amount of calls waiting for a reply. Defaults to 64.
+            timeout (int, optional): Seconds to wait for each reply, counted from when its call was written. Defaults to 2.
+        """
+        self.connection = connection
+        self.window = window
+        self.timeout = timeout
+
+        # Set when the connection broke, calls after that point weren't written.
+        self.dropped = False
+
+    def call_many(self, messages):
+        """Sends every message and yields their replies in the same order.
+
+        Items that are exceptions instead of messages are yielded back as-is,
+        as are calls that failed (timeout, dropped connection).
+        """
+        results = {}
+        pending = OrderedDict()
+        next_index = 0
+
+        for index, message in enumerate(messages):
+            if isinstance(message, Exception):
+                results[index] = message
+            else:
+                try:
+                    serial = next(self.connection.outgoing_serial)
+                    self.connection.send(message, serial=serial)
+                    pending[serial] = (index, time.monotonic() + self.timeout)
+                except (ConnectionError, EOFError, OSError) as exception:
+                    results[index] = exception
+                    self._fail_pending(pending, results, exception)
+                    self.dropped = True
+
+                while len(pending) >= self.window and not self.dropped:
+                    self._receive_reply(pending, results)
+
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+            if self.dropped:
+                break
+
+        while pending and not self.dropped:
+            self._receive_reply(pending, results)
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+        while next_index in results:
+            yield results.pop(next_index)
+            next_index += 1
+
+    def _receive_reply(self, pending, results):
+        serial, (index, deadline) = next(iter(pending.items()))
+        try:
+            message = self.connection.receive(
+                timeout=max(0, deadline - time.monotonic())
+            )
+        except TimeoutError as exception:
+            del pending[serial]
+            results[index] = exception
+            return
+        except (ConnectionError, EOFError, OSError) as exception:
+            self._fail_pending(pending, results, exception)
+            self.dropped = True
+            return
+
+        reply_serial = message.header.fields.get(HeaderFields.reply_serial)
+        if reply_serial in pending:
+            index, _ = pending.pop(reply_serial)
+            results[index] = message
+
+    @staticmethod
+    def _fail_pending(pending, results, exception):
+        for index, _ in pending.values():
+            results[index] = exception
+        pending.clear()
+
+
+class AsyncDBusConnection:
+    def __init__(self, bus="SESSION"):
+        """One shared jeepney asyncio connection (router) per event loop.
+
+        The router is opened on first use and reopened if the bus drops it. It's
+        closed when its event loop shuts down its async generators (asyncio.run
+        does), so short-lived loops don't leave connections behind.
+
+        Args:
+            bus (str, optional): "SESSION", "SYSTEM" or a D-Bus address. Defaults to "SESSION".
+        """
+        self.bus = bus
+        # Incremented whenever a router is dropped, see DBusConnectionPool.generation.
+        self.generation = 0
+        # loop: (connection, router, closer). The router's task keeps the loop
+        # alive, so entries are removed by the closer, not by garbage collection.
+        self._routers = weakref.WeakKeyDictionary()
+        self._locks = weakref.WeakKeyDictionary()
+
+    async def _get_router(self):
+        loop = asyncio.get_event_loop()
+        if loop in self._routers:
+            return self._routers[loop][1]
+
+        lock = self._locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            if loop not in self._routers:
+                connection = await jeepney_asyncio.open_dbus_connection(bus=self.bus)
+                router = jeepney_asyncio.DBusRouter(connection)
+                logger.debug("linux: opened asyncio dbus connection")
+                closer = self._close_with_loop(router)
+                # Registers it with the loop's shutdown_asyncgens.
+                await closer.__anext__()
+                self._routers[loop] = (connection, router, closer)
+            return self._routers[loop][1]
+
+    async def _close_with_loop(self, router):
+        """Suspended until the loop finalizes it on shutdown, then drops the router."""
+        try:
+            yield
+        finally:
+            await self._drop_router(router, from_closer=True)
+
+    async def _drop_router(self, router, from_closer=False):
+        loop = asyncio.get_event_loop()
+        connection, current_router, closer = self._routers.get(loop, (None, None, None))
+        if current_router is not router:
+            return
+        del self._routers[loop]
+        self.generation += 1
+        if not from_closer:
+            # It has nothing left to close.
+            await closer.aclose()
+        try:
+            await router.__aexit__(None, None, None)
+        except (Exception, asyncio.CancelledError):
+            # The receiver task failed, or was cancelled with the loop's tasks.
+            pass
+        await connection.close()
+
+    async def send_and_get_reply(self, message, timeout=None):
+        """Sends a method call and waits for its reply.
+
+        If the bus dropped the connection, the call is retried once on a fresh
+        connection.
+        """
+        for attempt in range(2):
+            router = await self._get_router()
+            try:
+                return await asyncio.wait_for(
+                    router.send_and_get_reply(message), timeout
+                )
+            except (RouterClosed, ConnectionError, EOFError):
+                await self._drop_router(router)
+                if attempt:
+                    raise
+                logger.debug("linux: asyncio dbus connection dropped, reconnecting.")
+
+    async def close(self):
+        """Closes the connection belonging to the running event loop."""
+        loop = asyncio.get_event_loop()
+        if loop in self._routers:
+            await self._drop_router(self._routers[loop][1])
@@ -0,0 +1,252 @@
+import atexit
+import base64
+import collections
+import itertools
+import json
+import queue
+import subprocess
+import threading
+import time
+import weakref
+
+from .._logging import logger
+from ..exceptions import HelperProcessError
+
+
+def encode_frame(*fields):
+    """One request line: every field base64 encoded (UTF-8), separated by spaces.
+
+    Base64 keeps newlines in the fields from splitting the frame and sidesteps
+    the helper's console encoding.
+    """
+    return " ".join(
+        base64.b64encode(str(field).encode("utf-8")).decode("ascii") for field in fields
+    )
+
+
+def decode_frame(line):
+    return [
+        base64.b64decode(field).decode("utf-8") for field in line.split(" ") if field
+    ]
+
+
+class HelperProcess:
+    def __init__(
+        self,
+        command,
+        name="helper",
+        timeout=10.0,
+        max_restarts=5,
+        restart_window=60.0,
+        **popen_kwargs,
+    ):
+        """Supervises one long-lived helper process that answers requests.
+
+        Every request is one line written to the helper's stdin and answered by
+        one line on its stdout, one request at a time. The helper is started on
+        the first request and started again on the next request after it exited
+        or didn't answer in time.
+
+        Args:
+            command (list): The helper's command line.
+            name (str, optional): Used in log messages and the reader thread's name. Defaults to "helper".
+            timeout (float, optional): Seconds to wait for an answer before the helper is killed. Defaults to 10.0.
+            max_restarts (int, optional): Starts allowed within restart_window seconds. Defaults to 5.
+            restart_window (float, optional): Defaults to 60.0.
+            **popen_kwargs: Passed to subprocess.Popen (e.g. startupinfo).
+        """
+        self.command = command
+        self.name = name
+        self.timeout = timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self._popen_kwargs = popen_kwargs
+        # Amount of helper processes started, for the curious (and the tests).
+        self.started = 0
+
+        self._lock = threading.Lock()
+        self._process = None
+        self._answers = None
+        self._starts = collections.deque()
+        _helpers.add(self)
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.poll() is None
+
+    def request(self, line, timeout=None):
+        """Writes one request line and waits for the answer.
+
+        Args:
+            line (str): The request, without line break.
+            timeout (float, optional): This request's deadline in seconds, instead of the helper's timeout. Unlike the helper's timeout, passing it raises TimeoutError.
+
+        Raises:
+            HelperProcessError: If the helper can't be started, or was restarted max_restarts times within restart_window.
+            TimeoutError: If the helper didn't answer within timeout seconds (it's killed), or was busy with other requests that long.
+
+        Returns:
+            str: The answer line, or None if the helper exited (or didn't answer within the helper's timeout).
+        """
+        data = line.encode("utf-8") + b"\n"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Waiting for another request counts towards this one's timeout.
+        if not self._lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError(
+                f"The {self.name} was busy with other requests for {timeout} seconds."
+            )
+        try:
+            try:
+                process, answers = self._helper()
+                process.stdin.write(data)
+                process.stdin.flush()
+            except OSError:
+                # It exited before reading the request: nothing was done yet,
+                # so it's safe to write the request to a new helper.
+                self._stop_locked()
+                process, answers = self._helper()
+                try:
+                    process.stdin.write(data)
+                    process.stdin.flush()
+                except OSError:
+                    self._stop_locked()
+                    return None
+
+            try:
+                answer = answers.get(
+                    timeout=(
+                        self.timeout
+                        if deadline is None
+                        else max(0, deadline - time.monotonic())
+                    )
+                )
+            except queue.Empty:
+                logger.error(f"The {self.name} didn't answer in time, restarting it.")
+                self._stop_locked(kill=True)
+                if timeout is not None:
+                    raise TimeoutError(
+                        f"The {self.name} didn't answer within {timeout} seconds."
+                    )
+                return None
+            if answer is None:
+                logger.error(f"The {self.name} exited, restarting it.")
+                self._stop_locked()
+            return answer
+        finally:
+            self._lock.release()
+
+    def _helper(self):
+        """The running helper and its answer queue, started if needed."""
+        if self._process is not None and self._process.poll() is None:
+            return self._process, self._answers
+        self._stop_locked()
+
+        now = time.monotonic()
+        while self._starts and now - self._starts[0] > self.restart_window:
+            self._starts.popleft()
+        if len(self._starts) >= self.max_restarts:
+            raise HelperProcessError(
+                f"The {self.name} exited {len(self._starts)} times within {self.restart_window} seconds."
+            )
+        self._starts.append(now)
+
+        try:
+            process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                **self._popen_kwargs,
+            )
+        except OSError as error:
+            raise HelperProcessError(f"Unable to start the {self.name}: {error}")
+        self.started += 1
+
+        # A reader thread per process, so waiting for an answer can time out on
+        # Windows too (select doesn't work on pipes there).
+        answers = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_answers, args=(process.stdout, answers), daemon=True
+        )
+        reader.name = f"notify.py-{self.name}"
+        reader.start()
+
+        self._process, self._answers = process, answers
+        return process, answers
+
+    @staticmethod
+    def _read_answers(stdout, answers):
+        try:
+            for line in stdout:
+                answers.put(line.decode("utf-8", "replace").rstrip("\r\n"))
+        except (OSError, ValueError):
+            pass
+        answers.put(None)
+
+    def _stop_locked(self, kill=False):
+        process, self._process = self._process, None
+        self._answers = None
+        if process is None:
+            return
+        if kill:
+            process.kill()
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def close(self):
+        """Closes the helper's stdin (which makes it exit) and reaps it."""
+        with self._lock:
+            self._stop_locked()
+
+
+class JsonHelper(HelperProcess):
+    """A HelperProcess that speaks newline-delimited JSON.
+
+    Every request gets an "id", which the helper repeats in its answer, so an
+    answer that belongs to another request is never taken for this one's.
+    """
+
+    def __init__(self, command, **kwargs):
+        super().__init__(command, **kwargs)
+        self._ids = itertools.count(1)
+
+    def call(self, timeout=None, **fields):
+        """Sends the fields as one JSON request.
+
+        Raises:
+            HelperProcessError: If the helper can't be started (see HelperProcess.request).
+            TimeoutError: If timeout was given and passed (see HelperProcess.request).
+
+        Returns:
+            dict: The helper's answer, or None if it didn't answer (or answered garbage).
+        """
+        request_id = next(self._ids)
+        # ensure_ascii keeps the requests ASCII, whatever the helper's encoding.
+        answer = self.request(json.dumps(dict(fields, id=request_id)), timeout)
+        if answer is None:
+            return None
+        try:
+            answer = json.loads(answer)
+        except ValueError:
+            answer = None
+        if not isinstance(answer, dict) or answer.get("id") != request_id:
+            logger.error(f"The {self.name} answered out of turn, restarting it.")
+            self.close()
+            return None
+        return answer
+
+
+_helpers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_helpers():
+    for helper in list(_helpers):
+        helper.close()
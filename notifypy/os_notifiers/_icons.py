@@ -0,0 +1,353 @@
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict, deque
+
+from .._logging import logger
+from ..assets import DEFAULT_ICON
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Channels per pixel by PNG color type (after expanding palettes).
+_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+
+# Larger images aren't decoded in Python, their path is sent instead.
+MAX_DECODE_PIXELS = 512 * 512
+
+
+class UnsupportedImage(ValueError):
+    """The image can't be decoded by decode_png, send its path instead."""
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def _unfilter(data, width, height, bytes_per_pixel):
+    stride = width * bytes_per_pixel
+    rows = []
+    previous = bytearray(stride)
+    position = 0
+    for _ in range(height):
+        filter_type = data[position]
+        row = bytearray(data[position + 1 : position + 1 + stride])
+        position += 1 + stride
+
+        if filter_type == 1:
+            for index in range(bytes_per_pixel, stride):
+                row[index] = (row[index] + row[index - bytes_per_pixel]) & 0xFF
+        elif filter_type == 2:
+            for index in range(stride):
+                row[index] = (row[index] + previous[index]) & 0xFF
+        elif filter_type == 3:
+            for index in range(stride):
+                left = row[index - bytes_per_pixel] if index >= bytes_per_pixel else 0
+                row[index] = (row[index] + ((left + previous[index]) >> 1)) & 0xFF
+        elif filter_type == 4:
+            for index in range(stride):
+                if index >= bytes_per_pixel:
+                    left = row[index - bytes_per_pixel]
+                    upper_left = previous[index - bytes_per_pixel]
+                else:
+                    left = upper_left = 0
+                row[index] = (
+                    row[index] + _paeth(left, previous[index], upper_left)
+                ) & 0xFF
+        elif filter_type != 0:
+            raise UnsupportedImage(f"Unknown PNG filter type {filter_type}.")
+
+        rows.append(row)
+        previous = row
+    return rows
+
+
+def decode_png(data):
+    """Decodes a non-interlaced, 8-bit PNG into RGB or RGBA rows.
+
+    Returns:
+        tuple: width, height, channels (3 or 4) and a list of rows (bytearrays).
+
+    Raises:
+        UnsupportedImage: for anything else (other formats, bit depths, interlacing, huge images).
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise UnsupportedImage("Not a PNG image.")
+
+    header = None
+    palette = None
+    transparency = None
+    compressed = []
+    position = len(PNG_SIGNATURE)
+    while position + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[position : position + 8])
+        chunk = data[position + 8 : position + 8 + length]
+        position += 12 + length
+
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"PLTE":
+            palette = chunk
+        elif chunk_type == b"tRNS":
+            transparency = chunk
+        elif chunk_type == b"IDAT":
+            compressed.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+
+    if header is None:
+        raise UnsupportedImage("PNG without header.")
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or interlace or color_type not in _CHANNELS:
+        raise UnsupportedImage(
+            f"Unsupported PNG (bit depth {bit_depth}, color type {color_type}, interlace {interlace})."
+        )
+    if width * height > MAX_DECODE_PIXELS:
+        raise UnsupportedImage(f"{width}x{height} is too large to decode.")
+
+    source_channels = 1 if color_type == 3 else _CHANNELS[color_type]
+    rows = _unfilter(
+        zlib.decompress(b"".join(compressed)), width, height, source_channels
+    )
+
+    if color_type == 2 or color_type == 6:
+        return width, height, source_channels, rows
+    if color_type == 0:
+        return width, height, 3, [_repeat_gray(row) for row in rows]
+    if color_type == 4:
+        return width, height, 4, [_gray_alpha_to_rgba(row) for row in rows]
+
+    # Palette: expand to RGB, or RGBA if it has transparent entries.
+    if palette is None:
+        raise UnsupportedImage("Palette PNG without palette.")
+    if transparency:
+        alpha = transparency + b"\xff" * (len(palette) // 3 - len(transparency))
+        colors = [
+            palette[index * 3 : index * 3 + 3] + alpha[index : index + 1]
+            for index in range(len(palette) // 3)
+        ]
+        channels = 4
+    else:
+        colors = [
+            palette[index * 3 : index * 3 + 3] for index in range(len(palette) // 3)
+        ]
+        channels = 3
+    return (
+        width,
+        height,
+        channels,
+        [bytearray(b"".join(colors[index] for index in row)) for row in rows],
+    )
+
+
+def _repeat_gray(row):
+    rgb = bytearray(len(row) * 3)
+    rgb[0::3] = rgb[1::3] = rgb[2::3] = row
+    return rgb
+
+
+def _gray_alpha_to_rgba(row):
+    rgba = bytearray(len(row) * 2)
+    rgba[0::4] = rgba[1::4] = rgba[2::4] = row[0::2]
+    rgba[3::4] = row[1::2]
+    return rgba
+
+
+def downscale(width, height, channels, rows, max_size):
+    """Shrinks the image (nearest neighbour) so neither side exceeds max_size.
+
+    Returns:
+        tuple: width, height and the rows of the (possibly) smaller image.
+    """
+    if width <= max_size and height <= max_size:
+        return width, height, rows
+
+    scale = max_size / max(width, height)
+    new_width = max(1, round(width * scale))
+    new_height = max(1, round(height * scale))
+    columns = [min(width - 1, int(x / scale)) for x in range(new_width)]
+
+    new_rows = []
+    for y in range(new_height):
+        row = rows[min(height - 1, int(y / scale))]
+        new_row = bytearray(new_width * channels)
+        for channel in range(channels):
+            new_row[channel::channels] = bytes(
+                row[x * channels + channel] for x in columns
+            )
+        new_rows.append(new_row)
+    return new_width, new_height, new_rows
+
+
+def image_data(path, max_size=128):
+    """Reads a PNG file into the freedesktop image-data hint value.
+
+    Returns:
+        tuple: A jeepney variant, ("(iiibiiay)", (width, height, rowstride, has_alpha, bits_per_sample, channels, data)).
+
+    Raises:
+        UnsupportedImage: If the image can't be decoded here.
+        OSError: If the file can't be read.
+    """
+    with open(path, "rb") as image:
+        width, height, channels, rows = decode_png(image.read())
+    width, height, rows = downscale(width, height, channels, rows, max_size)
+    return (
+        "(iiibiiay)",
+        (
+            width,
+            height,
+            width * channels,
+            channels == 4,
+            8,
+            channels,
+            b"".join(rows),
+        ),
+    )
+
+
+class IconCache:
+    def __init__(self, max_bytes=8 * 1024 * 1024, max_entries=1024):
+        """Decoded icons, keyed by path, modification time and size.
+
+        Least recently used icons are evicted once the decoded pixels take up
+        more than max_bytes. Pinned icons (the bundled default and preloaded
+        ones) are never evicted, nor checked for changes once decoded. Icons that can't be decoded are remembered too, so they're
+        only tried once. Decoding runs in pure Python and takes a while for
+        large icons, so senders can have it done by a background thread
+        (see get).
+
+        Args:
+            max_bytes (int, optional): Maximum size of the cached pixels. Defaults to 8 MiB.
+            max_entries (int, optional): Maximum amount of cached icons. Defaults to 1024.
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._icons = OrderedDict()
+        self._pinned = set()
+        # Decoded pinned icons, by path and max_size.
+        self._pinned_icons = {}
+        self._lock = threading.Lock()
+        # Icons waiting for the background decoder, see get(block=False).
+        self._pending = deque()
+        self._decoding = set()
+        self._decoder = None
+
+    def pin(self, path):
+        """Never evict the icon at path."""
+        self._pinned.add(path)
+
+    def get(self, path, max_size=128, block=True):
+        """The image-data hint value for the icon, or None if it can't be decoded.
+
+        Args:
+            path (str): The icon's path.
+            max_size (int, optional): Icons are shrunk to fit this many pixels. Defaults to 128.
+            block (bool, optional): Decode an icon that isn't cached yet right away. If False, it's decoded by a background thread and None is returned until it's cached. Defaults to True.
+        """
+        pinned = self._pinned_icons.get((path, max_size))
+        if pinned is not None:
+            self.hits += 1
+            return pinned
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (path, stat.st_mtime_ns, stat.st_size, max_size)
+
+        with self._lock:
+            if key in self._icons:
+                self._icons.move_to_end(key)
+                self.hits += 1
+                return self._icons[key]
+            self.misses += 1
+            if not block:
+                self._decode_later(key)
+                return None
+
+        return self._decode(key)
+
+    def _decode(self, key):
+        path, _, _, max_size = key
+        try:
+            value = image_data(path, max_size)
+        except (UnsupportedImage, OSError, zlib.error, struct.error) as exception:
+            logger.debug(f"sending icon {path} by path: {exception}")
+            value = None
+
+        with self._lock:
+            if path in self._pinned and value is not None:
+                self._pinned_icons[(path, max_size)] = value
+            if key not in self._icons:
+                self._icons[key] = value
+                self.size += self._size_of(value)
+                self._evict()
+        return value
+
+    def _decode_later(self, key):
+        """Queues the icon for the background decoder. Called with the lock held."""
+        if key in self._decoding:
+            return
+        self._decoding.add(key)
+        self._pending.append(key)
+        if self._decoder is None:
+            self._decoder = threading.Thread(
+                target=self._decode_pending, name="notifypy-icons", daemon=True
+            )
+            self._decoder.start()
+
+    def _decode_pending(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    # Started again by the next _decode_later.
+                    self._decoder = None
+                    return
+                key = self._pending.popleft()
+            try:
+                self._decode(key)
+            except Exception:
+                logger.exception(f"unable to decode icon {key[0]}.")
+            finally:
+                with self._lock:
+                    self._decoding.discard(key)
+
+    def wait(self, timeout=None):
+        """Waits until the background decoder is done. Returns False if it's still busy after timeout seconds."""
+        decoder = self._decoder
+        if decoder is not None:
+            decoder.join(timeout)
+        return not self._decoding
+
+    @staticmethod
+    def _size_of(value):
+        return len(value[1][6]) if value else 0
+
+    def _evict(self):
+        for key in list(self._icons):
+            if self.size <= self.max_bytes and len(self._icons) <= self.max_entries:
+                break
+            if key[0] in self._pinned:
+                continue
+            self.size -= self._size_of(self._icons.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._icons.clear()
+            self._pinned_icons.clear()
+            self.size = 0
+
+
+icon_cache = IconCache()
+icon_cache.pin(DEFAULT_ICON)
@@ -0,0 +1,20 @@
+import asyncio
+
+
+async def communicate(process, timeout=None):
+    """process.communicate(), killing the process if it takes longer than timeout
+    seconds or the caller is cancelled.
+
+    Raises:
+        asyncio.TimeoutError: If the process was killed because it took too long.
+    """
+    try:
+        return await asyncio.wait_for(process.communicate(), timeout)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            try:
+                await process.wait()
+            except BaseException:
+                pass
+        raise
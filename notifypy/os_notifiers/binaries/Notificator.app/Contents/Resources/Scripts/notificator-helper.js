@@ -0,0 +1,88 @@
+// Long-lived notificator: reads one JSON request per line from stdin and
+// answers each with one JSON line on stdout.
+//
+//   osascript -l JavaScript notificator-helper.js <path to Contents/MacOS/applet>
+//
+// Request: {"id": 1, "title": "...", "subtitle": "...", "message": "...", "sound_file": "/path/to.wav"}
+// Answer:  {"id": 1, "ok": true} or {"id": 1, "ok": false, "error": "..."}
+
+ObjC.import("Cocoa")
+
+// Sounds are kept referenced until they finished playing.
+const sounds = []
+
+function answer(stdout, reply) {
+  const line = $(JSON.stringify(reply) + "\n")
+  stdout.writeData(line.dataUsingEncoding($.NSUTF8StringEncoding))
+}
+
+function playSound(path) {
+  for (let index = sounds.length - 1; index >= 0; index--) {
+    if (!sounds[index].isPlaying) sounds.splice(index, 1)
+  }
+  const sound = $.NSSound.alloc.initWithContentsOfFileByReference(path, true)
+  if (sound.isNil()) throw new Error(`Unable to play ${path}`)
+  sound.play
+  sounds.push(sound)
+}
+
+function show(applet, request) {
+  if (request.sound_file) playSound(request.sound_file)
+
+  const task = $.NSTask.alloc.init
+  task.launchPath = applet
+  task.arguments = [request.message, request.title, request.subtitle, ""]
+  task.launch
+  task.waitUntilExit
+  if (task.terminationStatus !== 0) {
+    throw new Error(`applet exited with ${task.terminationStatus}`)
+  }
+}
+
+function handle(applet, line) {
+  let request
+  try {
+    request = JSON.parse(line)
+  } catch (error) {
+    return { id: null, ok: false, error: `Invalid request: ${error}` }
+  }
+  try {
+    show(applet, request)
+    return { id: request.id, ok: true }
+  } catch (error) {
+    return { id: request.id, ok: false, error: String(error) }
+  }
+}
+
+function run(argv) {
+  const applet = argv[0]
+  const stdin = $.NSFileHandle.fileHandleWithStandardInput
+  const stdout = $.NSFileHandle.fileHandleWithStandardOutput
+
+  // Done once here instead of for every notification, like the notificator
+  // script does: notifications never fire if the app wasn't touched, and the
+  // applet mustn't start while ctrl is pressed.
+  const app = $(applet).stringByDeletingLastPathComponent.stringByDeletingLastPathComponent
+    .stringByDeletingLastPathComponent
+  $.NSFileManager.defaultManager.setAttributesOfItemAtPathError(
+    $({ NSFileModificationDate: $.NSDate.date }),
+    app,
+    null
+  )
+  while ($.NSEvent.modifierFlags & $.NSEventModifierFlagControl) {}
+
+  // Requests are ASCII (the Python side escapes everything else), so a read
+  // can't split a character.
+  let buffer = ""
+  while (true) {
+    const data = stdin.availableData
+    if (data.length === 0) return
+    buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js
+    let end
+    while ((end = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, end).trim()
+      buffer = buffer.slice(end + 1)
+      if (line) answer(stdout, handle(applet, line))
+    }
+  }
+}
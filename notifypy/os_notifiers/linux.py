@@ -1,35 +1,131 @@
-from loguru import logger
-import subprocess
+import functools
+import os
 import shlex
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from shutil import which
 
+from .._logging import logger
 from ..exceptions import BinaryNotFound
 from ._base import BaseNotifier
 
-try:
-    from jeepney import DBusAddress, new_method_call
-    from jeepney.io.blocking import open_dbus_connection
-    from shutil import which
 
-    NOTIFY = which('notify-send') # alternatively: from ctypes.util import find_library 
-
-    if NOTIFY:
+@functools.lru_cache(maxsize=None)
+def find_notify_send():
+    """Path to libnotify's notify-send, looked up once per process."""
+    notify_send = which(
+        "notify-send"
+    )  # alternatively: from ctypes.util import find_library
+    if notify_send:
         logger.info("libnotify found, using it for notifications")
-    else: # check if dbus is available
-        import os
-        _dbus_address = os.getenv("DBUS_SESSION_BUS_ADDRESS")
-        if _dbus_address:
-            logger.info("Jeepney and Dbus is available. Using DBUS for notifications..")
-        else:
-            raise ImportError
+    return notify_send
 
-    APLAY = which('aplay')
 
-    if APLAY == None:
+@functools.lru_cache(maxsize=None)
+def find_aplay():
+    """Path to aplay (Alsa), looked up once per process."""
+    aplay = which("aplay")
+    if aplay == None:
         logger.debug("aplay binary not installed.. audio will not work!")
+    return aplay
+
+
+def dbus_available():
+    """True if jeepney is installed and a session bus address is set."""
+    from importlib.util import find_spec
+
+    if find_spec("jeepney") is None:
+        return False
+
+    if os.getenv("DBUS_SESSION_BUS_ADDRESS"):
+        logger.info("Jeepney and Dbus is available. Using DBUS for notifications..")
+        return True
+    return False
+
+
+def session_bus_reachable():
+    """True if dbus_available() and a connection to the session bus can be opened.
+
+    Opens (and closes) one connection, so the result is best cached, like
+    BackendRegistry.notifier_class does.
+    """
+    if not dbus_available():
+        return False
+
+    from jeepney.io.blocking import open_dbus_connection
+
+    try:
+        connection = open_dbus_connection(bus="SESSION")
+    except Exception as error:
+        logger.info(f"The session bus isn't reachable: {error}")
+        return False
+    connection.close()
+    return True
+
+
+def __getattr__(name):
+    # NOTIFY and APLAY used to be looked up when this module was imported.
+    if name == "NOTIFY":
+        return find_notify_send()
+    if name == "APLAY":
+        return find_aplay()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# GetServerInformation's reply.
+ServerInformation = namedtuple(
+    "ServerInformation", ["name", "vendor", "version", "spec_version"]
+)
 
+# The urgency hint's byte for each Notify.urgency, like notify-send's --urgency.
+URGENCY_LEVELS = {"low": 0, "normal": 1, "critical": 2}
 
-except ImportError:
-    logger.error("libnotify nor DBUS installed.")
+# How notification audio is played, see the linux_audio_mode argument.
+AUDIO_MODES = {"auto", "hint", "player", "aplay"}
+
+
+def _play_audio(notification_audio, audio_mode="aplay"):
+    """Plays the given .wav file without waiting for it to finish.
+
+    "player" writes it to the shared long-lived aplay process, "aplay" starts
+    an aplay process for it.
+    """
+    aplay = find_aplay()
+    if aplay == None:
+        raise BinaryNotFound("aplay (Alsa)")
+
+    if audio_mode == "player":
+        from ._audio import get_player
+
+        get_player(aplay).play(notification_audio)
+        return
+
+    subprocess.Popen(
+        [aplay, notification_audio],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def _image_data_hint(information):
+    """The image hint's name for the server's notification spec version."""
+    spec_version = information.spec_version if information else ""
+    if spec_version == "1.0":
+        return "icon_data"
+    if spec_version == "1.1":
+        return "image_data"
+    return "image-data"
+
+
+def _audio_mode(kwargs):
+    audio_mode = kwargs.get("linux_audio_mode", "auto")
+    if audio_mode not in AUDIO_MODES:
+        raise ValueError(
+            f"Unknown audio mode '{audio_mode}'. Use one of {sorted(AUDIO_MODES)}."
+        )
+    return audio_mode
 
 
 class LinuxNotifierLibNotify(BaseNotifier):
@@ -37,8 +133,47 @@ class LinuxNotifierLibNotify(BaseNotifier):
         """Main Linux Notification Class
 
         This uses libnotify's tool of notfiy-send.
+
+        Optional Arguments:
+            linux_audio_mode: "hint" passes the audio as sound-file hint, "aplay" starts aplay for every sound. Otherwise ("auto", "player") sounds are played by one long-lived aplay process.
         """
-        pass
+        self._audio_mode = _audio_mode(kwargs)
+
+    @staticmethod
+    def _generate_command(
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        sound_file=None,
+        **kwargs,
+    ):
+        notification_title = " " if notification_title == "" else notification_title
+        notification_subtitle = (
+            " " if notification_subtitle == "" else notification_subtitle
+        )
+
+        generated_command = [
+            find_notify_send(),
+            notification_title,
+            notification_subtitle,
+        ]
+
+        if notification_icon:
+            generated_command.append(f"--icon={shlex.quote(notification_icon)}")
+
+        if kwargs.get("application_name"):
+            generated_command.append(
+                f"--app-name={shlex.quote(kwargs.get('application_name'))}"
+            )
+
+        if kwargs.get("notification_urgency"):
+            generated_command.extend(["-u", kwargs.get("notification_urgency")])
+
+        if sound_file:
+            generated_command.append(f"--hint=string:sound-file:{sound_file}")
+
+        logger.debug(f"Generated command: {generated_command}")
+        return generated_command
 
     def send_notification(
         self,
@@ -46,48 +181,79 @@ class LinuxNotifierLibNotify(BaseNotifier):
         notification_subtitle,
         notification_icon,
         notification_audio,
+        send_timeout=None,
         **kwargs,
     ):
         try:
-            notification_title = " " if notification_title == "" else notification_title
-            notification_subtitle = (
-                " " if notification_subtitle == "" else notification_subtitle
-            )
-
-            generated_command = [
-                NOTIFY,
+            generated_command = self._generate_command(
                 notification_title,
                 notification_subtitle,
-            ]
+                notification_icon,
+                sound_file=self._sound_file(notification_audio),
+                **kwargs,
+            )
 
-            if notification_icon:
-                generated_command.append(f"--icon={shlex.quote(notification_icon)}")
+            # Killed once the send's deadline passes.
+            subprocess.check_output(generated_command, timeout=send_timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            logger.error("notify-send didn't exit in time, killed it.")
+            raise
+        except subprocess.CalledProcessError:
+            logger.exception("Unable to send notification.")
+            return False
+        except Exception:
+            logger.exception("Unhandled exception for sending notification.")
+            return False
 
-            if kwargs.get("application_name"):
-                generated_command.append(
-                    f"--app-name={shlex.quote(kwargs.get('application_name'))}"
-                )
+    def _sound_file(self, notification_audio):
+        """The audio for the sound-file hint, or None if it's played here."""
+        if not notification_audio:
+            return None
+        if self._audio_mode == "hint":
+            return notification_audio
+        _play_audio(
+            notification_audio, "aplay" if self._audio_mode == "aplay" else "player"
+        )
+        return None
 
-            if kwargs.get('notification_urgency'):
-                generated_command.extend(["-u", kwargs.get('notification_urgency')])
+    async def send_notification_async(
+        self,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        notification_audio,
+        send_timeout=None,
+        **kwargs,
+    ):
+        import asyncio
 
-            logger.debug(f"Generated command: {generated_command}")
-            if notification_audio:
+        from ._process import communicate
 
-                if APLAY == None:
-                    raise BinaryNotFound("aplay (Alsa)")
+        try:
+            generated_command = self._generate_command(
+                notification_title,
+                notification_subtitle,
+                notification_icon,
+                sound_file=self._sound_file(notification_audio),
+                **kwargs,
+            )
 
-                subprocess.Popen(
-                    [APLAY, notification_audio],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.STDOUT,
+            process = await asyncio.create_subprocess_exec(
+                *generated_command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+            _, stderr = await communicate(process, send_timeout)
+            if process.returncode != 0:
+                logger.error(
+                    f"Unable to send notification. notify-send exited with {process.returncode}: {stderr}"
                 )
-
-            subprocess.check_output(generated_command)
+                return False
             return True
-        except subprocess.CalledProcessError:
-            logger.exception("Unable to send notification.")
-            return False
+        except asyncio.TimeoutError:
+            logger.error("notify-send didn't exit in time, killed it.")
+            raise
         except Exception:
             logger.exception("Unhandled exception for sending notification.")
             return False
@@ -97,16 +263,261 @@ class LinuxNotifier(BaseNotifier):
     def __init__(self, **kwargs):
         """Main Linux Notification Class (Dbus)
 
-        This uses jeepney library as the dbus communicator
+        This uses jeepney library as the dbus communicator. The session bus
+        connection is opened on the first notification and kept open (pooled)
+        for the following ones. Asynchronous sends share one connection per
+        event loop.
+
+        Optional Arguments:
+            linux_dbus_pool_size: Maximum amount of pooled session bus connections. Defaults to 2.
+            linux_dbus_pipeline_window: Maximum amount of Notify calls waiting for a reply in send_many. Defaults to 64.
+            linux_dbus_timeout: Seconds to wait for the notification server's replies, unless the send has its own timeout. Defaults to 2.
+            linux_icon_max_size: PNG icons are decoded once (in the background, they're sent by path until then), shrunk to fit this size (pixels) and sent as image-data hint. 0 sends the icon's path instead. Defaults to 128.
+            linux_audio_mode: How audio is played. "auto" passes it as sound-file hint if the notification server has the "sound" capability, and plays it with one long-lived aplay process otherwise. "hint" always passes the hint, "player" always uses the long-lived aplay process, and "aplay" starts aplay for every sound. Defaults to "auto".
+        """
+
+        self._pool_size = kwargs.get("linux_dbus_pool_size", 2)
+        self._pipeline_window = kwargs.get("linux_dbus_pipeline_window", 64)
+        self._dbus_timeout = kwargs.get("linux_dbus_timeout", 2)
+        self._audio_mode = _audio_mode(kwargs)
+        self._icon_max_size = kwargs.get("linux_icon_max_size", 128)
+        # (connection generation, capabilities, server information), see _server_details.
+        self._server_details_cache = None
+
+        # Created on first send, so jeepney is only imported when it's needed.
+        self._lazy_lock = threading.Lock()
+        self._lazy_connection_pool = None
+        self._lazy_async_connection = None
+
+    @property
+    def _connection_pool(self):
+        if self._lazy_connection_pool is None:
+            with self._lazy_lock:
+                if self._lazy_connection_pool is None:
+                    from ._dbus import DBusConnectionPool
+
+                    self._lazy_connection_pool = DBusConnectionPool(
+                        bus="SESSION", max_size=self._pool_size
+                    )
+        return self._lazy_connection_pool
+
+    @property
+    def _async_connection(self):
+        if self._lazy_async_connection is None:
+            with self._lazy_lock:
+                if self._lazy_async_connection is None:
+                    from ._dbus import AsyncDBusConnection
+
+                    self._lazy_async_connection = AsyncDBusConnection(bus="SESSION")
+        return self._lazy_async_connection
+
+    def _connection_generation(self):
+        """Changes whenever a pooled or asyncio connection was dropped."""
+        return (
+            (
+                self._lazy_connection_pool.generation
+                if self._lazy_connection_pool is not None
+                else 0
+            ),
+            (
+                self._lazy_async_connection.generation
+                if self._lazy_async_connection is not None
+                else 0
+            ),
+        )
+
+    def _cached_server_details(self):
+        details = self._server_details_cache
+        if details is not None and details[0] == self._connection_generation():
+            return details[1:]
+        return None
+
+    def _cache_server_details(self, generation, capabilities_reply, information_reply):
+        import asyncio
+        from ._dbus import ConnectionPoolTimeout, is_error_reply
+
+        capabilities = information = None
+        for reply in (capabilities_reply, information_reply):
+            if isinstance(reply, Exception):
+                logger.opt(exception=reply).error(
+                    "linux: unable to get the notification server's details."
+                )
+                if not isinstance(
+                    reply, (TimeoutError, asyncio.TimeoutError)
+                ) or isinstance(reply, ConnectionPoolTimeout):
+                    # The server wasn't asked: ask again on the next send.
+                    return None, None
+                break
+            if is_error_reply(reply):
+                logger.error(f"notification server returned an error: {reply.body}")
+                break
+        else:
+            capabilities = frozenset(capabilities_reply.body[0])
+            information = ServerInformation(*information_reply.body)
+            logger.debug(f"notification server: {information}, {sorted(capabilities)}")
+
+        # Servers that don't answer aren't asked again until the connection changes.
+        self._server_details_cache = (generation, capabilities, information)
+        return capabilities, information
+
+    def _server_details(self, timeout=None):
+        """The notification server's capabilities and information.
 
+        Asked for (GetCapabilities and GetServerInformation, pipelined) once,
+        and again after the connection was dropped, waiting timeout seconds
+        (linux_dbus_timeout by default) for the replies. Error replies and
+        timeouts are remembered for the connection too.
+
+        Returns:
+            tuple: frozenset of capabilities and ServerInformation, or (None, None) if the server couldn't be asked.
         """
+        details = self._cached_server_details()
+        if details is not None:
+            return details
+
+        from ._dbus import DBusPipeline
+
+        generation = self._connection_generation()
+        deadline = time.monotonic() + (
+            self._dbus_timeout if timeout is None else timeout
+        )
+        try:
+            with self._connection_pool.connection(
+                max(0, deadline - time.monotonic())
+            ) as connection:
+                replies = list(
+                    DBusPipeline(
+                        connection, timeout=max(0, deadline - time.monotonic())
+                    ).call_many(self._server_details_messages())
+                )
+        except Exception as exception:
+            replies = [exception, exception]
+        capabilities_reply, information_reply = replies
+        return self._cache_server_details(
+            generation, capabilities_reply, information_reply
+        )
+
+    async def _server_details_async(self, timeout=None):
+        details = self._cached_server_details()
+        if details is not None:
+            return details
+
+        generation = self._connection_generation()
+        deadline = time.monotonic() + (
+            self._dbus_timeout if timeout is None else timeout
+        )
+        replies = []
+        for message in self._server_details_messages():
+            try:
+                replies.append(
+                    await self._async_connection.send_and_get_reply(
+                        message, timeout=max(0, deadline - time.monotonic())
+                    )
+                )
+            except Exception as exception:
+                replies.append(exception)
+        capabilities_reply, information_reply = replies
+        return self._cache_server_details(
+            generation, capabilities_reply, information_reply
+        )
+
+    @staticmethod
+    def _server_details_messages():
+        from jeepney import new_method_call
+        from ._dbus import NOTIFICATIONS_ADDRESS
+
+        return [
+            new_method_call(NOTIFICATIONS_ADDRESS, "GetCapabilities"),
+            new_method_call(NOTIFICATIONS_ADDRESS, "GetServerInformation"),
+        ]
+
+    def capabilities(self):
+        """The notification server's capabilities (e.g. "body", "icon-static", "sound"), or None if unknown."""
+        return self._server_details()[0]
+
+    def server_information(self):
+        """The notification server's name, vendor, version and spec_version, or None if unknown."""
+        return self._server_details()[1]
+
+    def _hints(self, notification_icon, notification_audio, capabilities, information):
+        """The hints for a notification, and the icon path to send along with them."""
+        hints = self._sound_hints(notification_audio, capabilities)
+        image_data = self._image_data(notification_icon, capabilities)
+        if image_data is not None:
+            # The server doesn't need to read the file then.
+            hints[_image_data_hint(information)] = image_data
+            notification_icon = ""
+        return hints, notification_icon
+
+    def _image_data(self, notification_icon, capabilities):
+        if not notification_icon or not self._icon_max_size:
+            return None
+        if capabilities is None or not capabilities & {"icon-static", "icon-multi"}:
+            return None
+
+        from ._icons import icon_cache
+
+        # Decoding a new icon can take a good part of the send's timeout, so it
+        # happens in the background; it's sent by path until then.
+        return icon_cache.get(notification_icon, self._icon_max_size, block=False)
+
+    def _sound_hints(self, notification_audio, capabilities=None):
+        """The sound-file hint for the audio, or no hints if it's played here instead."""
+        if not notification_audio:
+            return {}
+        if self._audio_mode == "hint" or (
+            self._audio_mode == "auto" and "sound" in (capabilities or ())
+        ):
+            return {"sound-file": ("s", notification_audio)}
+
+        _play_audio(
+            notification_audio, "aplay" if self._audio_mode == "aplay" else "player"
+        )
+        return {}
 
-        self._dbus_notifications = DBusAddress(
-            "/org/freedesktop/Notifications",
-            bus_name="org.freedesktop.Notifications",
-            interface="org.freedesktop.Notifications",
+    def _create_notification_message(
+        self,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        hints=None,
+        capabilities=None,
+        **kwargs,
+    ):
+        from jeepney import new_method_call
+        from ._dbus import NOTIFICATIONS_ADDRESS
+
+        # Leave out what the server would ignore anyway.
+        if capabilities is not None:
+            if "body" not in capabilities:
+                notification_subtitle = ""
+            if not capabilities & {"icon-static", "icon-multi"}:
+                notification_icon = ""
+
+        notification_title = " " if notification_title == "" else notification_title
+        notification_subtitle = (
+            " " if notification_subtitle == "" else notification_subtitle
         )
 
+        urgency = URGENCY_LEVELS.get(kwargs.get("notification_urgency"))
+        if urgency is not None:
+            hints = dict(hints or {}, urgency=("y", urgency))
+
+        return new_method_call(
+            NOTIFICATIONS_ADDRESS,
+            "Notify",
+            "susssasa{sv}i",
+            (
+                kwargs.get("application_name"),  # App name
+                kwargs.get("replaces_id", 0),  # 0 = not replacing a notification
+                notification_icon if notification_icon else "",  # Icon
+                notification_title,  # Summary
+                notification_subtitle,
+                [],  # Actions
+                hints or {},
+                -1,  # expire_timeout (-1 = default)
+            ),
+        )
 
     def send_notification(
         self,
@@ -116,53 +527,180 @@ class LinuxNotifier(BaseNotifier):
         notification_audio,
         **kwargs,
     ):
-        try:
-            _attempt_to_open_dbus_connection = open_dbus_connection(bus="SESSION")
-            logger.debug("linux: opened dbus connection")
-        except Exception:
-            logger.exception("issue with opening DBUS connection!")
-            return False
+        return (
+            self.notify(
+                notification_title=notification_title,
+                notification_subtitle=notification_subtitle,
+                notification_icon=notification_icon,
+                notification_audio=notification_audio,
+                **kwargs,
+            )
+            is not None
+        )
+
+    def notify(
+        self,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        notification_audio,
+        replaces_id=0,
+        send_timeout=None,
+        **kwargs,
+    ):
+        """Sends a notification, replacing the notification `replaces_id` in place if given.
+
+        Raises:
+            TimeoutError: If send_timeout was given and the server didn't reply within it.
 
+        Returns:
+            int: The id the notification server assigned (the same as replaces_id when replacing).
+            None: if the notification wasn't sent.
+        """
+        timeout = self._dbus_timeout if send_timeout is None else send_timeout
+        deadline = time.monotonic() + timeout
         try:
-            notification_title = " " if notification_title == "" else notification_title
-            notification_subtitle = (
-                " " if notification_subtitle == "" else notification_subtitle
+            capabilities, information = self._server_details(timeout)
+            hints, notification_icon = self._hints(
+                notification_icon, notification_audio, capabilities, information
             )
 
-            if notification_audio:
-                # TODO: https://specifications.freedesktop.org/notification-spec/latest/ar01s09.html
-                # use sound param instead of relying on alsa?
+            create_notification = self._create_notification_message(
+                notification_title,
+                notification_subtitle,
+                notification_icon,
+                hints=hints,
+                capabilities=capabilities,
+                replaces_id=replaces_id,
+                **kwargs,
+            )
+            reply = self._connection_pool.send_and_get_reply(
+                create_notification, timeout=max(0, deadline - time.monotonic())
+            )
+            return self._notification_id(reply)
 
-                if APLAY == None:
-                    raise BinaryNotFound("aplay (Alsa)")
+        except TimeoutError:
+            if send_timeout is not None:
+                logger.error("The notification server didn't reply in time.")
+                raise
+            logger.exception("issue with sending through dbus!")
+            return None
+        except Exception:
+            logger.exception("issue with sending through dbus!")
+            return None
+
+    def send_notifications(self, notifications):
+        """Sends every notification through one pooled, pipelined connection."""
+        for notification_id in self.notify_many(notifications):
+            yield notification_id is not None
+
+    def notify_many(self, notifications):
+        """Pipelines the Notify calls for every notification on one pooled connection.
+
+        The calls are written back-to-back and the replies are matched to them
+        as they arrive, so the server's processing speed bounds throughput
+        instead of the round-trip time.
+
+        Args:
+            notifications (iterable): keyword arguments for send_notification, one dict per notification.
 
-                subprocess.Popen(
-                    [APLAY, notification_audio],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.STDOUT,
+        Yields:
+            int: The id the notification server assigned, or None if that notification failed. In order.
+        """
+        from ._dbus import DBusPipeline
+
+        notifications = iter(notifications)
+        while True:
+            # Asked for before checking out the connection the calls are written to.
+            capabilities, information = self._server_details()
+
+            with self._connection_pool.connection() as connection:
+                pipeline = DBusPipeline(
+                    connection,
+                    window=self._pipeline_window,
+                    timeout=self._dbus_timeout,
+                )
+                for result in pipeline.call_many(
+                    self._notification_messages(
+                        notifications, capabilities, information
+                    )
+                ):
+                    yield self._notification_id(result)
+
+                if not pipeline.dropped:
+                    return
+                # Reconnect for the remaining notifications.
+                logger.debug("linux: dbus connection dropped, reconnecting.")
+
+    def _notification_messages(self, notifications, capabilities, information):
+        for notification in notifications:
+            try:
+                hints, notification_icon = self._hints(
+                    notification["notification_icon"],
+                    notification["notification_audio"],
+                    capabilities,
+                    information,
                 )
-            create_notification = new_method_call(
-                self._dbus_notifications,
-                "Notify",
-                "susssasa{sv}i",
-                (
-                    kwargs.get("application_name"),  # App name
-                    0,  # Not replacing any previous notification
-                    notification_icon if notification_icon else "",  # Icon
-                    notification_title,  # Summary
-                    notification_subtitle,
-                    [],
-                    {},  # Actions, hints
-                    -1,  # expire_timeout (-1 = default)
-                ),
+                yield self._create_notification_message(
+                    **dict(notification, notification_icon=notification_icon),
+                    hints=hints,
+                    capabilities=capabilities,
+                )
+            except Exception as exception:
+                yield exception
+
+    @staticmethod
+    def _notification_id(result):
+        from ._dbus import is_error_reply
+
+        if isinstance(result, Exception):
+            logger.opt(exception=result).error("issue with sending through dbus!")
+            return None
+        if is_error_reply(result):
+            logger.error(f"notification server returned an error: {result.body}")
+            return None
+
+        logger.debug(f"confirmed notification sent! id: {result.body[0]}")
+        return result.body[0]
+
+    async def send_notification_async(
+        self,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        notification_audio,
+        send_timeout=None,
+        **kwargs,
+    ):
+        import asyncio
+
+        timeout = self._dbus_timeout if send_timeout is None else send_timeout
+        deadline = time.monotonic() + timeout
+        try:
+            capabilities, information = await self._server_details_async(timeout)
+            hints, notification_icon = self._hints(
+                notification_icon, notification_audio, capabilities, information
             )
-            reply = _attempt_to_open_dbus_connection.send_and_get_reply(
-                create_notification, timeout=2
+
+            create_notification = self._create_notification_message(
+                notification_title,
+                notification_subtitle,
+                notification_icon,
+                hints=hints,
+                capabilities=capabilities,
+                **kwargs,
             )
-            logger.debug(f"confirmed notification sent! id: {reply}")
-            _attempt_to_open_dbus_connection.close()
-            return True
+            reply = await self._async_connection.send_and_get_reply(
+                create_notification, timeout=max(0, deadline - time.monotonic())
+            )
+            return self._notification_id(reply) is not None
 
+        except asyncio.TimeoutError:
+            if send_timeout is not None:
+                logger.error("The notification server didn't reply in time.")
+                raise
+            logger.exception("issue with sending through dbus!")
+            return False
         except Exception:
             logger.exception("issue with sending through dbus!")
             return False
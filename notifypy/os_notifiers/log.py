@@ -0,0 +1,33 @@
+import sys
+
+from ._base import BaseNotifier
+
+
+class LogNotifier(BaseNotifier):
+    fallback_only = True
+
+    def __init__(self, **kwargs):
+        """A sink that writes notifications to a stream instead of showing them.
+
+        The last resort of the default BackendChain, so notifications aren't
+        lost without a trace when no notification server can be reached.
+
+        Optional Arguments:
+            log_notifier_stream: A file-like object to write to. Defaults to sys.stderr.
+        """
+        self._stream = kwargs.get("log_notifier_stream")
+
+    def send_notification(
+        self,
+        notification_title,
+        notification_subtitle,
+        application_name="",
+        notification_urgency="normal",
+        **kwargs,
+    ):
+        stream = self._stream or sys.stderr
+        stream.write(
+            f"[{application_name}] ({notification_urgency}) {notification_title}: {notification_subtitle}\n"
+        )
+        stream.flush()
+        return True
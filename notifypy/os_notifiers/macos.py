@@ -1,18 +1,33 @@
+import functools
 import os
 import pathlib
 import subprocess
 import shlex
+import threading
+from shutil import which
 
-from loguru import logger
-from ..exceptions import BinaryNotFound, NotificationFailure, InvalidMacOSNotificator
+from .._logging import logger
+from ..exceptions import (
+    BinaryNotFound,
+    HelperProcessError,
+    NotificationFailure,
+    InvalidMacOSNotificator,
+)
 from ._base import BaseNotifier
+from ._helper import JsonHelper
 
 
 class MacOSNotifier(BaseNotifier):
     def __init__(self, **kwargs):
         """Main macOS Notification System, supplied by a custom-made notificator app.
         Icon Support is **not** supported. You'll need to create your own bundle for that.
+
+        Kwargs:
+            macos_persistent_helper (bool, optional): Send notifications through one long-lived notificator helper instead of running the notificator for each. Defaults to False.
         """
+        self._use_helper = kwargs.get("macos_persistent_helper", False)
+        self._helper = None
+        self._helper_lock = threading.Lock()
 
         if kwargs.get("custom_mac_notificator"):
             """This optional kwarg exists for the use of using a custom (made) notificator without building a .whl"""
@@ -57,6 +72,7 @@ class MacOSNotifier(BaseNotifier):
             self._afplay_binary = call_find_afplay
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _find_bundled_notificator():
         """Gets the bundled Notifcator"""
         try:
@@ -72,17 +88,119 @@ class MacOSNotifier(BaseNotifier):
             raise
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _find_installed_afplay():
-        """Function to find the path for afplay"""
+        """Function to find the path for afplay, looked up once per process."""
         try:
-            run_which_for_aplay = subprocess.check_output(["which", "afplay"])
-            return run_which_for_aplay.decode("utf-8")
-        except subprocess.CalledProcessError:
-            logger.exception("Unable to find aplay.")
-            return False
+            found_afplay = which("afplay")
+            if not found_afplay:
+                logger.error("Unable to find afplay.")
+                return False
+            return found_afplay
         except Exception:
-            logger.exception("Unhandled exception for finding aplay.")
+            logger.exception("Unhandled exception for finding afplay.")
+            return False
+
+    def _generate_command(
+        self, notification_title, notification_subtitle, application_name
+    ):
+        notification_title = " " if notification_title == "" else notification_title
+        notification_subtitle = (
+            " " if notification_subtitle == "" else notification_subtitle
+        )
+
+        return [
+            self._notificator_binary,
+            "--title",
+            application_name,
+            "--subtitle",
+            notification_title,
+            "--message",
+            notification_subtitle,
+        ]
+
+    def _helper_command(self):
+        """The helper's command line, or None if the notificator bundle has no helper."""
+        scripts = os.path.dirname(self._notificator_binary)
+        helper_script = os.path.join(scripts, "notificator-helper.js")
+        if not os.path.exists(helper_script):
+            return None
+        applet = os.path.join(os.path.dirname(scripts), "..", "MacOS", "applet")
+        return [
+            "osascript",
+            "-l",
+            "JavaScript",
+            helper_script,
+            os.path.normpath(applet),
+        ]
+
+    def _get_helper(self):
+        with self._helper_lock:
+            if self._helper is None:
+                command = self._helper_command()
+                if command is None:
+                    logger.warning(
+                        "The notificator has no notificator-helper.js, running it for each notification."
+                    )
+                    self._use_helper = False
+                    return None
+                self._helper = JsonHelper(command, name="notificator helper")
+            return self._helper
+
+    def _send_with_helper(
+        self,
+        notification_title,
+        notification_subtitle,
+        application_name,
+        notification_audio,
+        send_timeout=None,
+    ):
+        """Sends the notification through the persistent helper, which plays the audio too.
+
+        Raises:
+            TimeoutError: If the helper didn't answer within send_timeout seconds (it's killed).
+
+        Returns:
+            bool: Whether it was sent, or None if the helper isn't available (run the notificator instead).
+        """
+        helper = self._get_helper()
+        if helper is None:
+            return None
+        try:
+            answer = helper.call(
+                timeout=send_timeout,
+                # The same fields as _generate_command.
+                title=application_name,
+                subtitle=notification_title or " ",
+                message=notification_subtitle or " ",
+                sound_file=notification_audio or "",
+            )
+        except HelperProcessError as error:
+            logger.error(f"{error} Running the notificator for each notification.")
+            return None
+
+        if answer is None:
             return False
+        if not answer.get("ok"):
+            logger.error(f"Unable to send notification: {answer.get('error')}")
+        return bool(answer.get("ok"))
+
+    def close(self):
+        """Stops the persistent notificator helper, if it was started."""
+        with self._helper_lock:
+            helper, self._helper = self._helper, None
+        if helper is not None:
+            helper.close()
+
+    def _play_audio(self, notification_audio):
+        if self._afplay_binary == False:
+            raise BinaryNotFound("afplay")
+
+        subprocess.Popen(
+            [self._afplay_binary.strip(), notification_audio],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+        )
 
     def send_notification(
         self,
@@ -90,46 +208,100 @@ class MacOSNotifier(BaseNotifier):
         notification_subtitle,
         application_name,
         notification_audio,
-        **kwargs
+        send_timeout=None,
+        **kwargs,
     ):
         if kwargs.get("notification_icon"):
             logger.warning(
                 "Notification icon is not supported. Read the docs for more information."
             )
 
+        if self._use_helper:
+            sent = self._send_with_helper(
+                notification_title,
+                notification_subtitle,
+                application_name,
+                notification_audio,
+                send_timeout,
+            )
+            if sent is not None:
+                return sent
+
         try:
+            if notification_audio:
+                self._play_audio(notification_audio)
 
-            notification_title = " " if notification_title == "" else notification_title
-            notification_subtitle = (
-                " " if notification_subtitle == "" else notification_subtitle
+            generated_command = self._generate_command(
+                notification_title, notification_subtitle, application_name
             )
 
-            if notification_audio:
+            # Killed once the send's deadline passes.
+            subprocess.check_output(generated_command, timeout=send_timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            logger.error("The notificator didn't exit in time, killed it.")
+            raise
+        except subprocess.CalledProcessError:
+            logger.exception("Unable to send notification.")
+            return False
+        except Exception:
+            logger.exception("Unhandled Exception for sending notifications")
+            return False
 
-                if self._afplay_binary == False:
-                    raise BinaryNotFound("afplay")
+    async def send_notification_async(
+        self,
+        notification_title,
+        notification_subtitle,
+        application_name,
+        notification_audio,
+        send_timeout=None,
+        **kwargs,
+    ):
+        import asyncio
 
-                subprocess.Popen(
-                    [self._afplay_binary.strip(), notification_audio],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.STDOUT,
-                )
+        from ._process import communicate
 
-            generated_command = [
-                self._notificator_binary,
-                "--title",
-                application_name,
-                "--subtitle",
+        if kwargs.get("notification_icon"):
+            logger.warning(
+                "Notification icon is not supported. Read the docs for more information."
+            )
+
+        if self._use_helper:
+            sent = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._send_with_helper,
                 notification_title,
-                "--message",
                 notification_subtitle,
-            ]
+                application_name,
+                notification_audio,
+                send_timeout,
+            )
+            if sent is not None:
+                return sent
+
+        try:
+            if notification_audio:
+                self._play_audio(notification_audio)
 
-            subprocess.check_output(generated_command)
+            generated_command = self._generate_command(
+                notification_title, notification_subtitle, application_name
+            )
+
+            process = await asyncio.create_subprocess_exec(
+                *generated_command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+            _, stderr = await communicate(process, send_timeout)
+            if process.returncode != 0:
+                logger.error(
+                    f"Unable to send notification. notificator exited with {process.returncode}: {stderr}"
+                )
+                return False
             return True
-        except subprocess.CalledProcessError:
-            logger.exception("Unable to send notification.")
-            return False
+        except asyncio.TimeoutError:
+            logger.error("The notificator didn't exit in time, killed it.")
+            raise
         except Exception:
             logger.exception("Unhandled Exception for sending notifications")
             return False
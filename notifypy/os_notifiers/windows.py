@@ -1,18 +1,114 @@
+import base64
 import pathlib
 import os
 import subprocess
-from xml.etree import ElementTree
 import tempfile
 import uuid
 import codecs
+import itertools
+import threading
 
-from loguru import logger
+from .._logging import logger
+from ..exceptions import HelperProcessError
 from ._base import BaseNotifier
+from ._helper import HelperProcess, encode_frame
+
+# The toast skeleton, as ElementTree serialized it for go-toast's template.
+# For some reason, go-toast set the template attribute to "ToastGeneric"
+# but it never worked for me.
+_TOAST_XML = (
+    '<toast duration="short"><visual><binding template="ToastImageAndText02">'
+    '<image id="1" src="{image}" />{title}{message}</binding></visual>{audio}</toast>'
+)
+
+# the user has provided his own audio file, no need to play the default sound.
+_SILENT_AUDIO = '<audio silent="true" />'
+
+_TOAST_SCRIPT = (
+    """$APP_ID = "{application_id}"
+
+$template = @"
+"""
+    + _TOAST_XML
+    + """
+"@
+
+$xml = New-Object Windows.Data.Xml.Dom.XmlDocument
+$xml.LoadXml($template)
+$toast = New-Object Windows.UI.Notifications.ToastNotification $xml
+[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier($APP_ID).Show($toast)
+"""
+)
+
+
+# Shows the toasts it reads from stdin, one "<app id> <toast xml>" line each
+# (both base64 encoded), and answers every line with "ok" or "error <message>".
+# The WinRT assemblies are loaded once, before the loop.
+_WORKER_LOOP = """
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    try {
+        $fields = $line.Split(" ")
+        $APP_ID = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($fields[0]))
+        $template = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($fields[1]))
+        $xml = New-Object Windows.Data.Xml.Dom.XmlDocument
+        $xml.LoadXml($template)
+        $toast = New-Object Windows.UI.Notifications.ToastNotification $xml
+        [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier($APP_ID).Show($toast)
+        [Console]::Out.WriteLine("ok")
+    } catch {
+        [Console]::Out.WriteLine("error " + ($_.Exception.Message -replace "\\s+", " "))
+    }
+    [Console]::Out.Flush()
+}
+"""
+
+
+def _escape_text(text):
+    # Same rules as ElementTree: checking first is cheaper than replacing.
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attribute(text):
+    text = _escape_text(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _text_element(text_id, text):
+    # ElementTree writes elements without text as <text id="1" />.
+    if not text:
+        return f'<text id="{text_id}" />'
+    return f'<text id="{text_id}">{_escape_text(text)}</text>'
 
 
 class WindowsNotifier(BaseNotifier):
+    # Amount of toasts shown by one PowerShell process in send_notifications.
+    TOASTS_PER_SCRIPT = 50
+
     def __init__(self, **kwargs):
-        """Main Notification System for Windows. Basically ported from go-toast/toast"""
+        """Main Notification System for Windows. Basically ported from go-toast/toast
+
+        Kwargs:
+            windows_persistent_worker (bool, optional): Show toasts from one long-lived PowerShell process instead of a new one per toast. Defaults to False.
+        """
+        self._use_worker = kwargs.get("windows_persistent_worker", False)
+        self._worker = None
+        self._worker_lock = threading.Lock()
 
         # Create the base
         self._top_ps1_script = f"""
@@ -29,61 +125,159 @@ class WindowsNotifier(BaseNotifier):
         notification_icon,
         notification_audio,
     ):
+        generated_toast_script = self._generate_toast_script(
+            application_id,
+            notification_title,
+            notification_subtitle,
+            notification_icon,
+            notification_audio,
+        )
+        generated_ps1_file = f"""
+{self._top_ps1_script}
+{generated_toast_script}"""
+        return generated_ps1_file
 
-        # Create the top <toast> element
-        top_element = ElementTree.Element("toast")
-        # set the duration for the top element
-        top_element.set("duration", "short")
+    def _generate_batch_ps1_file(self, notifications):
+        """Generates one .ps1 file that shows every given notification."""
+        generated_ps1_file = f"""
+{self._top_ps1_script}
+"""
+        for notification in notifications:
+            generated_ps1_file += self._generate_toast_script(
+                application_id=notification["application_name"],
+                notification_title=notification["notification_title"],
+                notification_subtitle=notification["notification_subtitle"],
+                notification_icon=notification["notification_icon"],
+                notification_audio=notification["notification_audio"],
+            )
+        return generated_ps1_file
 
-        # create the <visual> element
-        visual_element = ElementTree.SubElement(top_element, "visual")
+    @staticmethod
+    def _generate_toast_script(
+        application_id,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        notification_audio,
+    ):
+        """Generates the part of the .ps1 file that shows one toast.
 
-        # create <binding> element
-        binding_element = ElementTree.SubElement(visual_element, "binding")
-        # add the required attribute for this.
-        # For some reason, go-toast set the template attribute to "ToastGeneric"
-        # but it never worked for me.
-        binding_element.set("template", "ToastImageAndText02")
+        Only the title, message and icon are escaped and put into the prebuilt
+        toast skeleton, which is the same XML ElementTree would serialize.
+        """
+        return _TOAST_SCRIPT.format(
+            application_id=application_id,
+            image=_escape_attribute(notification_icon),
+            title=_text_element("1", notification_title),
+            message=_text_element("2", notification_subtitle),
+            audio=_SILENT_AUDIO if notification_audio else "",
+        )
 
-        # create <image> element
-        image_element = ElementTree.SubElement(binding_element, "image")
-        # add an Id
-        image_element.set("id", "1")
-        # add the src
-        image_element.set("src", notification_icon)
+    @staticmethod
+    def _generate_toast_xml(
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        notification_audio,
+    ):
+        """The toast's XML alone, as sent to the persistent worker."""
+        return _TOAST_XML.format(
+            image=_escape_attribute(notification_icon),
+            title=_text_element("1", notification_title),
+            message=_text_element("2", notification_subtitle),
+            audio=_SILENT_AUDIO if notification_audio else "",
+        )
 
-        # add the message and title
+    def _worker_command(self):
+        script = self._top_ps1_script + _WORKER_LOOP
+        return [
+            "Powershell",
+            "-NoProfile",
+            "-NonInteractive",
+            "-ExecutionPolicy",
+            "Bypass",
+            "-EncodedCommand",
+            base64.b64encode(script.encode("utf-16-le")).decode("ascii"),
+        ]
 
-        title_element = ElementTree.SubElement(binding_element, "text")
-        title_element.set("id", "1")
-        title_element.text = notification_title
+    def _get_worker(self):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = HelperProcess(
+                    self._worker_command(),
+                    name="PowerShell toast worker",
+                    # Loading the WinRT assemblies takes a while on the first toast.
+                    timeout=30,
+                    startupinfo=self._startupinfo(),
+                )
+            return self._worker
 
-        message_element = ElementTree.SubElement(binding_element, "text")
-        message_element.set("id", "2")
-        message_element.text = notification_subtitle
+    def _show_with_worker(
+        self,
+        application_id,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        notification_audio,
+        send_timeout=None,
+    ):
+        """Shows the toast through the persistent worker.
 
-        if notification_audio:
-            # the user has provided his own audio file, no need to play the default sound.
-            audio_element = ElementTree.SubElement(top_element, "audio")
-            audio_element.set("silent", "true")
+        Raises:
+            TimeoutError: If the worker didn't answer within send_timeout seconds (it's killed).
 
-        # Great we have a generated XML notification.
-        # We need to create the rest of the .ps1 file and dump it to the temporary directory
+        Returns:
+            bool: Whether the toast was shown, or None if the worker can't be started (show it with a .ps1 file instead).
+        """
+        toast_xml = self._generate_toast_xml(
+            notification_title,
+            notification_subtitle,
+            notification_icon,
+            notification_audio,
+        )
+        try:
+            answer = self._get_worker().request(
+                encode_frame(application_id, toast_xml), send_timeout
+            )
+        except HelperProcessError as error:
+            logger.error(f"{error} Falling back to a PowerShell process per toast.")
+            return None
 
-        generated_ps1_file = f"""
-{self._top_ps1_script}
-$APP_ID = "{application_id}"
+        if answer is not None and answer != "ok":
+            logger.error(f"Unable to show the toast: {answer}")
+        return answer == "ok"
 
-$template = @"
-{ElementTree.tostring(top_element, encoding="utf-8").decode('utf-8')}
-"@
+    def close(self):
+        """Stops the persistent PowerShell worker, if it was started."""
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.close()
 
-$xml = New-Object Windows.Data.Xml.Dom.XmlDocument
-$xml.LoadXml($template)
-$toast = New-Object Windows.UI.Notifications.ToastNotification $xml
-[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier($APP_ID).Show($toast)
-"""
-        return generated_ps1_file
+    @staticmethod
+    def _startupinfo():
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        return startupinfo
+
+    def _play_audio(self, notification_audio):
+        subprocess.Popen(
+            [
+                "Powershell",
+                f'(New-Object Media.SoundPlayer "{notification_audio}").playsync()',
+            ],
+            startupinfo=self._startupinfo(),
+        )
+
+    @staticmethod
+    def _write_ps1_file(temp_dir, generated_file):
+        """Writes the script to the temporary directory and returns its file name."""
+        generated_uuid_file = str(uuid.uuid4())
+        with codecs.open(
+            f"{temp_dir}/{generated_uuid_file}.ps1", "w", "utf_8_sig"
+        ) as ps1_file:
+            ps1_file.write(generated_file)
+        return f"{generated_uuid_file}.ps1"
 
     def send_notification(
         self,
@@ -92,8 +286,24 @@ $toast = New-Object Windows.UI.Notifications.ToastNotification $xml
         notification_icon,
         application_name,
         notification_audio,
+        send_timeout=None,
         **kwargs,
     ):
+        if notification_audio:
+            self._play_audio(notification_audio)
+
+        if self._use_worker:
+            shown = self._show_with_worker(
+                application_id=application_name,
+                notification_title=notification_title,
+                notification_subtitle=notification_subtitle,
+                notification_icon=notification_icon,
+                notification_audio=notification_audio,
+                send_timeout=send_timeout,
+            )
+            if shown is not None:
+                return shown
+
         generated_file = self._generate_notification_xml(
             notification_title=notification_title,
             notification_subtitle=notification_subtitle,
@@ -101,37 +311,119 @@ $toast = New-Object Windows.UI.Notifications.ToastNotification $xml
             application_id=application_name,
             notification_audio=notification_audio,
         )
+        self._run_ps1_file(generated_file, send_timeout)
+        return True
 
-        if notification_audio:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            subprocess.Popen(
-                [
-                    "Powershell",
-                    f'(New-Object Media.SoundPlayer "{notification_audio}").playsync()',
-                ],
-                startupinfo=startupinfo,
-            )
+    def _run_ps1_file(self, generated_file, timeout=None):
+        """Runs the script from a temporary .ps1 file and returns PowerShell's exit code.
 
+        Raises:
+            subprocess.TimeoutExpired: If PowerShell ran longer than timeout seconds (it's killed).
+        """
         # open the temporary directory
         with tempfile.TemporaryDirectory() as temp_dir:
-            generated_uuid_file = str(uuid.uuid4())
-            with codecs.open(
-                f"{temp_dir}/{generated_uuid_file}.ps1", "w", "utf_8_sig"
-            ) as ps1_file:
-                ps1_file.write(generated_file)
+            ps1_file_name = self._write_ps1_file(temp_dir, generated_file)
             # exceute the file
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            subprocess.Popen(
+            process = subprocess.Popen(
                 [
                     "Powershell",
                     "-ExecutionPolicy",
                     "Bypass",
                     "-File",
-                    f"{generated_uuid_file}.ps1",
+                    ps1_file_name,
                 ],
                 cwd=temp_dir,
-                startupinfo=startupinfo,
-            ).wait()
+                startupinfo=self._startupinfo(),
+            )
+            try:
+                return process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                logger.error("PowerShell didn't exit in time, killed it.")
+                process.kill()
+                process.wait()
+                raise
+
+    def send_notifications(self, notifications):
+        """Shows the notifications from one PowerShell process per chunk of
+        TOASTS_PER_SCRIPT notifications, instead of one process per notification.
+        With the persistent worker they're all shown by the worker.
+        """
+        if self._use_worker:
+            for notification in notifications:
+                yield self.send_notification(**notification)
+            return
+
+        notifications = iter(notifications)
+        while True:
+            chunk = list(itertools.islice(notifications, self.TOASTS_PER_SCRIPT))
+            if not chunk:
+                return
+
+            for notification in chunk:
+                if notification["notification_audio"]:
+                    self._play_audio(notification["notification_audio"])
+
+            return_code = self._run_ps1_file(self._generate_batch_ps1_file(chunk))
+
+            if return_code != 0:
+                logger.error(f"PowerShell exited with {return_code}.")
+            for _ in chunk:
+                yield return_code == 0
+
+    async def send_notification_async(
+        self,
+        notification_title,
+        notification_subtitle,
+        notification_icon,
+        application_name,
+        notification_audio,
+        send_timeout=None,
+        **kwargs,
+    ):
+        import asyncio
+
+        from ._process import communicate
+
+        if notification_audio:
+            self._play_audio(notification_audio)
+
+        if self._use_worker:
+            shown = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._show_with_worker,
+                application_name,
+                notification_title,
+                notification_subtitle,
+                notification_icon,
+                notification_audio,
+                send_timeout,
+            )
+            if shown is not None:
+                return shown
+
+        # The audio keeps the toast silent, it's already playing.
+        generated_file = self._generate_notification_xml(
+            notification_title=notification_title,
+            notification_subtitle=notification_subtitle,
+            notification_icon=notification_icon,
+            application_id=application_name,
+            notification_audio=notification_audio,
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ps1_file_name = self._write_ps1_file(temp_dir, generated_file)
+            process = await asyncio.create_subprocess_exec(
+                "Powershell",
+                "-ExecutionPolicy",
+                "Bypass",
+                "-File",
+                ps1_file_name,
+                cwd=temp_dir,
+                startupinfo=self._startupinfo(),
+            )
+            try:
+                await communicate(process, send_timeout)
+            except asyncio.TimeoutError:
+                logger.error("PowerShell didn't exit in time, killed it.")
+                raise
         return True
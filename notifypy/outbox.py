@@ -0,0 +1,390 @@
+import atexit
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import weakref
+import zlib
+
+from ._logging import logger
+
+# File header: magic, offset of the first pending record, offset after the
+# last one, and the index of the first pending record (counting every record
+# ever appended).
+HEADER = struct.Struct("<8sQQQ")
+MAGIC = b"NPYOBX01"
+
+# Record header: payload length, crc32 of created + payload, created (unix time).
+RECORD = struct.Struct("<IId")
+
+_live_outboxes = weakref.WeakSet()
+
+
+class Outbox:
+    def __init__(
+        self,
+        path,
+        max_bytes=4 * 1024 * 1024,
+        ttl=24 * 60 * 60,
+        flush_every=64,
+        flush_interval=1.0,
+        retry_interval=5.0,
+        max_attempts=10,
+    ):
+        """An append-only, memory-mapped file of notifications that couldn't be sent (yet).
+
+        Pass it to Notify as outbox=. Notifications the notifier fails to send
+        are appended to the outbox, and so is every notification sent while
+        older ones are still pending, so they're delivered in order. A
+        background thread retries the oldest pending notification every
+        retry_interval seconds and drains the outbox once it goes through.
+
+        The file is preallocated to max_bytes and never grows. When it's full,
+        delivered and expired notifications are compacted away, and if that's
+        not enough the oldest pending notifications are dropped, so senders
+        never block on a dead notification server. Notifications older than
+        ttl seconds are dropped instead of delivered, and so are notifications
+        the notifier failed to send max_attempts times in a row, so one it keeps
+        rejecting doesn't hold up the ones behind it (while the notifier is
+        down, that's one notification every max_attempts * retry_interval
+        seconds).
+
+        Appends survive a crash of the process as soon as they're written (they
+        live in the page cache); they're fsynced every flush_every appends or
+        flush_interval seconds, whichever comes first, to survive a crash of
+        the machine. Records cut short by a crash are detected (crc32) and
+        discarded when the outbox is opened again. An outbox file must only be
+        opened by one process at a time.
+
+        Args:
+            path (str): The outbox file. Created if it doesn't exist.
+            max_bytes (int, optional): Size of a new outbox file. Existing files keep their size. Defaults to 4 MiB.
+            ttl (float, optional): Seconds a notification may wait for delivery. Defaults to a day.
+            flush_every (int, optional): Appends between fsyncs. Defaults to 64.
+            flush_interval (float, optional): Maximum seconds between an append and its fsync. Defaults to 1.0.
+            retry_interval (float, optional): Seconds between delivery attempts while the notifier fails. Defaults to 5.0.
+            max_attempts (int, optional): Failed delivery attempts after which a notification is dropped. None retries until the ttl expires. Defaults to 10.
+        """
+        if max_bytes < HEADER.size + RECORD.size + 1:
+            raise ValueError("The outbox is too small to hold a notification.")
+
+        self.path = path
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+
+        # Counters.
+        self.appended = 0
+        self.delivered = 0
+        self.expired = 0
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._send = None
+        self._drainer = None
+        # Failed attempts to deliver the oldest pending notification, by its index.
+        self._failing_index = None
+        self._failures = 0
+        self._closed = False
+
+        self._open(max_bytes)
+        _live_outboxes.add(self)
+
+    def _open(self, max_bytes):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            size = os.fstat(fd).st_size
+            if size < HEADER.size:
+                os.ftruncate(fd, max_bytes)
+                size = max_bytes
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.capacity = size
+
+        magic, head, tail, head_index = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or not HEADER.size <= head <= tail <= size:
+            if magic != b"\0" * 8:
+                logger.warning(f"{self.path} isn't a valid outbox, starting empty.")
+            head = tail = HEADER.size
+            head_index = 0
+
+        self._head, self._tail, self._head_index = head, head, head_index
+        self.pending = 0
+        # Keep every intact record; a crash may have cut the last one short.
+        while self._tail < tail:
+            record = self._read(self._tail, tail)
+            if record is None:
+                logger.warning(
+                    f"{self.path}: discarding {tail - self._tail} bytes after a broken record."
+                )
+                break
+            self._tail += record[0]
+            self.pending += 1
+        self._write_header()
+
+    def _read(self, offset, end=None):
+        """(record size, created, payload) of the record at offset, or None if it's broken."""
+        end = self._tail if end is None else end
+        if offset + RECORD.size > end:
+            return None
+        length, crc, created = RECORD.unpack_from(self._map, offset)
+        size = RECORD.size + length
+        if offset + size > end:
+            return None
+        payload = self._map[offset + RECORD.size : offset + size]
+        if zlib.crc32(struct.pack("<d", created) + payload) != crc:
+            return None
+        return size, created, payload
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, self._head, self._tail, self._head_index)
+
+    def put(self, notification):
+        """Appends a Notification. Never blocks on delivery.
+
+        Returns:
+            bool: False if it's too large for the outbox and was dropped.
+        """
+        payload = json.dumps(notification.as_dict(), separators=(",", ":")).encode(
+            "utf-8"
+        )
+        created = time.time()
+        size = RECORD.size + len(payload)
+        if size > self.capacity - HEADER.size:
+            logger.error("The notification is too large for the outbox, dropping it.")
+            self.dropped += 1
+            return False
+
+        with self._lock:
+            if self._closed:
+                raise ValueError("The outbox is closed.")
+            if self._tail + size > self.capacity:
+                self._make_room_locked(size)
+
+            crc = zlib.crc32(struct.pack("<d", created) + payload)
+            RECORD.pack_into(self._map, self._tail, len(payload), crc, created)
+            self._map[self._tail + RECORD.size : self._tail + size] = payload
+            # The record is complete before the header points past it.
+            self._tail += size
+            self._write_header()
+            self.pending += 1
+            self.appended += 1
+            self._unflushed += 1
+            self._flush_if_due_locked()
+            if self.pending == 1:
+                # Wake an idle drainer, but don't cut a retry_interval short.
+                self._wakeup.notify()
+        return True
+
+    def _make_room_locked(self, size):
+        """Drops expired records, then the oldest ones if still needed, and compacts."""
+        deadline = time.time() - self.ttl
+        while self._head < self._tail:
+            record = self._read(self._head)
+            if record[1] >= deadline:
+                break
+            self._pop_locked(record[0])
+            self.expired += 1
+
+        while self._tail - self._head + size > self.capacity - HEADER.size:
+            self._pop_locked(self._read(self._head)[0])
+            self.dropped += 1
+            logger.warning("The outbox is full, dropping the oldest notification.")
+
+        # Compact: move the pending records to the start of the file.
+        length = self._tail - self._head
+        if self._head != HEADER.size:
+            self._map.move(HEADER.size, self._head, length)
+            self._head, self._tail = HEADER.size, HEADER.size + length
+            self._write_header()
+            self._map.flush()
+            self._unflushed = 0
+            self._last_flush = time.monotonic()
+
+    def _pop_locked(self, size):
+        self._head += size
+        self._head_index += 1
+        self.pending -= 1
+        if self._head == self._tail:
+            # Empty: start over at the beginning of the file.
+            self._head = self._tail = HEADER.size
+        self._write_header()
+
+    def _flush_if_due_locked(self):
+        if self._unflushed and (
+            self._unflushed >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._map.flush()
+            self._unflushed = 0
+            self._last_flush = time.monotonic()
+
+    def flush(self):
+        """fsyncs everything written so far."""
+        with self._lock:
+            if not self._closed:
+                self._map.flush()
+                self._unflushed = 0
+                self._last_flush = time.monotonic()
+
+    def _peek_locked(self):
+        """(index, created, values) of the oldest pending notification, or None."""
+        if self._head == self._tail:
+            return None
+        _, created, payload = self._read(self._head)
+        return self._head_index, created, json.loads(payload.decode("utf-8"))
+
+    def _done_locked(self, index):
+        # Unless it was dropped to make room in the meantime.
+        if index == self._head_index and self._head != self._tail:
+            self._pop_locked(self._read(self._head)[0])
+            self._unflushed += 1
+            self._flush_if_due_locked()
+
+    def drain(self, send):
+        """Delivers the pending notifications in order, until send fails.
+
+        Args:
+            send (callable): Sends a Notification and returns True if it was sent.
+
+        Returns:
+            int: The amount of notifications delivered.
+        """
+        from .notification import Notification
+
+        delivered = 0
+        while True:
+            with self._lock:
+                if self._closed:
+                    return delivered
+                oldest = self._peek_locked()
+                if oldest is None:
+                    self._map.flush()
+                    self._unflushed = 0
+                    return delivered
+            index, created, values = oldest
+
+            if time.time() - created > self.ttl:
+                with self._lock:
+                    self._done_locked(index)
+                    self.expired += 1
+                continue
+
+            try:
+                notification = Notification(**values)
+            except Exception:
+                logger.exception("Dropping a notification from the outbox.")
+                with self._lock:
+                    self._done_locked(index)
+                    self.dropped += 1
+                continue
+
+            try:
+                sent = send(notification)
+            except Exception:
+                sent = False
+            if not sent:
+                if not self._give_up(index):
+                    return delivered
+                continue
+
+            with self._lock:
+                self._done_locked(index)
+                self.delivered += 1
+            delivered += 1
+
+    def _give_up(self, index):
+        """Counts a failed attempt. Drops the notification and returns True if it failed max_attempts times."""
+        with self._lock:
+            if index != self._failing_index:
+                self._failing_index, self._failures = index, 0
+            self._failures += 1
+            if self.max_attempts is None or self._failures < self.max_attempts:
+                return False
+            logger.warning(
+                f"Dropping a notification from the outbox after {self._failures} failed attempts."
+            )
+            self._done_locked(index)
+            self.dropped += 1
+            return True
+
+    def send(self, send, notification):
+        """Sends the notification, or appends it if that fails or older ones are pending.
+
+        Returns:
+            bool: True if it was sent now, False if it was appended to the outbox.
+        """
+        if not self.pending:
+            try:
+                if send(notification):
+                    return True
+            except Exception:
+                pass
+        self.put(notification)
+        self._start_draining(send)
+        return False
+
+    def _start_draining(self, send):
+        with self._lock:
+            waiting_for_send = self._send is None
+            self._send = send
+            if self._drainer is None and not self._closed:
+                self._drainer = threading.Thread(
+                    target=self._drain_forever, daemon=True
+                )
+                self._drainer.name = "notify.py-outbox"
+                self._drainer.start()
+            elif waiting_for_send:
+                self._wakeup.notify()
+
+    def _drain_forever(self):
+        while True:
+            with self._lock:
+                while not self._closed and (not self.pending or self._send is None):
+                    self._wakeup.wait(self.flush_interval)
+                    self._flush_if_due_locked()
+                if self._closed:
+                    return
+                send = self._send
+
+            self.drain(send)
+            with self._lock:
+                if self.pending and not self._closed:
+                    # The notifier still fails; try again later.
+                    self._wakeup.wait(self.retry_interval)
+
+    def resume(self, send):
+        """Starts delivering notifications left in the outbox by a previous run.
+
+        Notify does this when it's created with an outbox that isn't empty.
+        """
+        if self.pending:
+            self._start_draining(send)
+
+    def close(self):
+        """Stops the background delivery, fsyncs and closes the file. Pending notifications stay in it."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify_all()
+            drainer = self._drainer
+        if drainer is not None and drainer is not threading.current_thread():
+            drainer.join()
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+
+
+@atexit.register
+def _close_outboxes():
+    for outbox in list(_live_outboxes):
+        outbox.close()
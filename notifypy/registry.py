@@ -0,0 +1,243 @@
+import sys
+import threading
+
+from ._logging import logger
+from .exceptions import UnsupportedPlatform
+
+# Notify keyword arguments that change which notifier is selected.
+SELECTION_KWARGS = (
+    "override_detection",
+    "override_windows_version_detection",
+    "linux_use_legacy_notifier",
+)
+
+# Notify keyword arguments the notifiers themselves read. Everything else
+# (dispatcher, aggregator, retry, ...) is Notify's and doesn't reach them.
+NOTIFIER_KWARGS = SELECTION_KWARGS + (
+    "override_detected_notification_system",
+    "custom_mac_notificator",
+    "log_notifier_stream",
+)
+NOTIFIER_KWARG_PREFIXES = ("linux_", "windows_", "macos_")
+
+# Notifiers by name, for BackendChain. Imported on first use.
+BACKENDS = {
+    "dbus": "os_notifiers.linux:LinuxNotifier",
+    "notify-send": "os_notifiers.linux:LinuxNotifierLibNotify",
+    "macos": "os_notifiers.macos:MacOSNotifier",
+    "windows": "os_notifiers.windows:WindowsNotifier",
+    "log": "os_notifiers.log:LogNotifier",
+}
+
+
+def notifier_kwargs(kwargs):
+    """The Notify keyword arguments notifiers are created with."""
+    return {
+        key: value
+        for key, value in kwargs.items()
+        if key in NOTIFIER_KWARGS or key.startswith(NOTIFIER_KWARG_PREFIXES)
+    }
+
+
+def default_chain(override_detection=None):
+    """The backend names of the default BackendChain for this platform, best first."""
+    import platform
+
+    selected_platform = override_detection or platform.system()
+    if selected_platform == "Darwin":
+        return ["macos", "log"]
+    if selected_platform == "Windows":
+        return ["windows", "log"]
+    return ["dbus", "notify-send", "log"]
+
+
+def select_notifier_class(
+    override_detection: str = False,
+    override_windows_version_detection: bool = False,
+    linux_use_legacy_notifier: bool = False,
+):
+    """Detects the notifier class for this platform. Prefer BackendRegistry.notifier_class, which caches the result."""
+    import platform
+
+    if override_detection:
+        logger.info(f"chosen to override to {override_detection}.")
+        selected_platform = override_detection
+    else:
+        selected_platform = platform.system()
+
+    if selected_platform == "Darwin":
+        from .os_notifiers.macos import MacOSNotifier
+
+        return MacOSNotifier
+    elif selected_platform == "Windows":
+        if platform.release() in {"10", "11"}:
+            from .os_notifiers.windows import WindowsNotifier
+
+            return WindowsNotifier
+
+        if override_windows_version_detection == True:
+            from .os_notifiers.windows import WindowsNotifier
+
+            return WindowsNotifier
+
+        raise UnsupportedPlatform(
+            f"This version of Windows ({platform.release()}) is not supported."
+        )
+    else:
+        if selected_platform != "Linux":
+            logger.warning(f"{selected_platform} might not be supported!")
+
+        if linux_use_legacy_notifier:
+            from .os_notifiers.linux import LinuxNotifierLibNotify
+
+            return LinuxNotifierLibNotify
+        else:
+            from .os_notifiers.linux import (
+                find_notify_send,
+                dbus_available,
+                session_bus_reachable,
+            )
+
+            # Talking to the session bus in-process spares a notify-send
+            # process per notification.
+            if session_bus_reachable():
+                from .os_notifiers.linux import LinuxNotifier
+
+                return LinuxNotifier
+            elif find_notify_send():
+                from .os_notifiers.linux import LinuxNotifierLibNotify
+
+                return LinuxNotifierLibNotify
+            else:
+                if not dbus_available():
+                    logger.error("libnotify nor DBUS installed.")
+
+                from .os_notifiers.linux import LinuxNotifier
+
+                return LinuxNotifier
+
+
+def _clear_binary_caches():
+    """Forgets the binaries the already imported notifiers looked up."""
+    linux = sys.modules.get(f"{__package__}.os_notifiers.linux")
+    if linux:
+        linux.find_notify_send.cache_clear()
+        linux.find_aplay.cache_clear()
+
+    macos = sys.modules.get(f"{__package__}.os_notifiers.macos")
+    if macos:
+        macos.MacOSNotifier._find_bundled_notificator.cache_clear()
+        macos.MacOSNotifier._find_installed_afplay.cache_clear()
+
+
+class BackendRegistry:
+    def __init__(self):
+        """Process-wide cache of the detected notifier classes and their instances.
+
+        The platform (and the binaries a notifier needs) are only detected once,
+        and Notify objects created with the same arguments share one notifier.
+        Call refresh() when the environment changed (e.g. a notification daemon
+        or notify-send was installed, or DBUS_SESSION_BUS_ADDRESS was set).
+        """
+        self._lock = threading.RLock()
+        self._notifier_classes = {}
+        self._notifiers = {}
+        self._backends = dict(BACKENDS)
+
+    def register(self, name, notifier_class):
+        """Makes a notifier available to BackendChain by name. Replaces a backend of the same name.
+
+        Args:
+            name (str): The name to use in backend chains, e.g. "my-server".
+            notifier_class (type): A BaseNotifier subclass.
+
+        Raises:
+            ValueError: If notifier_class doesn't inherit from BaseNotifier.
+        """
+        from .os_notifiers._base import BaseNotifier
+
+        if not (
+            isinstance(notifier_class, type)
+            and issubclass(notifier_class, BaseNotifier)
+        ):
+            raise ValueError("Registered notifiers must inherit from BaseNotifier.")
+        with self._lock:
+            self._backends[name] = notifier_class
+
+    def backend_class(self, name):
+        """The notifier class registered as name.
+
+        Raises:
+            KeyError: If there is no such backend.
+        """
+        with self._lock:
+            backend = self._backends[name]
+            if isinstance(backend, str):
+                import importlib
+
+                module, _, attribute = backend.partition(":")
+                backend = getattr(
+                    importlib.import_module(f"{__package__}.{module}"), attribute
+                )
+                self._backends[name] = backend
+            return backend
+
+    @property
+    def backend_names(self):
+        with self._lock:
+            return list(self._backends)
+
+    def notifier_class(self, **selection_kwargs):
+        """The notifier class for this platform, detected on first use.
+
+        Args:
+            **selection_kwargs: override_detection, override_windows_version_detection and linux_use_legacy_notifier.
+        """
+        key = tuple(sorted(selection_kwargs.items()))
+        with self._lock:
+            if key not in self._notifier_classes:
+                self._notifier_classes[key] = select_notifier_class(**selection_kwargs)
+            return self._notifier_classes[key]
+
+    def notifier(self, notifier_class, **kwargs):
+        """A shared instance of notifier_class for the given Notify keyword arguments.
+
+        Only the arguments notifiers read (see notifier_kwargs) are passed on and
+        tell notifiers apart. Arguments that can't be hashed get their own,
+        unshared, notifier.
+        """
+        kwargs = notifier_kwargs(kwargs)
+        try:
+            key = (notifier_class, frozenset(kwargs.items()))
+            hash(key)
+        except TypeError:
+            return notifier_class(**kwargs)
+
+        with self._lock:
+            if key not in self._notifiers:
+                self._notifiers[key] = notifier_class(**kwargs)
+            return self._notifiers[key]
+
+    def refresh(self):
+        """Detects the platform, binaries and notifiers again on next use.
+
+        Notify objects created before keep their notifier.
+        """
+        with self._lock:
+            self._notifier_classes.clear()
+            self._notifiers.clear()
+            _clear_binary_caches()
+        logger.info("backend registry refreshed.")
+
+
+backend_registry = BackendRegistry()
+
+
+def refresh():
+    """Refreshes the process-wide backend registry. See BackendRegistry.refresh."""
+    backend_registry.refresh()
+
+
+def register_backend(name, notifier_class):
+    """Registers a notifier for backend chains in the process-wide registry. See BackendRegistry.register."""
+    backend_registry.register(name, notifier_class)
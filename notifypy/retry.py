@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+import weakref
+
+from ._logging import logger
+from .instrumentation import instrumentation
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+_live_breakers = weakref.WeakSet()
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        attempts=3,
+        backoff=0.1,
+        multiplier=2.0,
+        max_backoff=5.0,
+        jitter=0.1,
+        retry_on_false=True,
+    ):
+        """How often, and after how long, Notify tries a failed send again.
+
+        The n-th retry waits backoff * multiplier ** (n - 1) seconds, at most
+        max_backoff, give or take jitter (a fraction of the delay) so that
+        many senders don't retry in lockstep.
+
+        Args:
+            attempts (int, optional): Tries in total, including the first one. Defaults to 3.
+            backoff (float, optional): Seconds before the first retry. Defaults to 0.1.
+            multiplier (float, optional): Growth of the delay per retry. Defaults to 2.0.
+            max_backoff (float, optional): Longest delay in seconds. Defaults to 5.0.
+            jitter (float, optional): Random variation of the delays, as a fraction. Defaults to 0.1.
+            retry_on_false (bool, optional): Also retry when the notifier returns False instead of raising. Defaults to True.
+        """
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1.")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on_false = retry_on_false
+
+    def delay(self, attempt):
+        """Seconds to wait after the given (1-based) failed attempt."""
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """Fails sends fast while a backend is down, and probes it periodically.
+
+        Every backend (notifier class) has its own circuit. It opens after
+        failure_threshold failed sends in a row; sends through an open circuit
+        return False right away instead of waiting for the backend's timeout.
+        After reset_timeout seconds, one send is let through as a probe (the
+        circuit is half open): if it succeeds the circuit closes, otherwise it
+        opens again. Can be shared between Notify objects.
+
+        State changes are logged and reported to the instrumentation as
+        circuit_open, circuit_half_open and circuit_closed events; rejected
+        sends as circuit_rejected events.
+
+        Args:
+            failure_threshold (int, optional): Failed sends in a row that open the circuit. Defaults to 5.
+            reset_timeout (float, optional): Seconds before an open circuit is probed. Defaults to 30.0.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits = {}
+        self._lock = threading.Lock()
+        _live_breakers.add(self)
+
+    def state(self, backend):
+        """closed, open or half_open."""
+        circuit = self._circuits.get(backend)
+        return CLOSED if circuit is None else circuit.state
+
+    @property
+    def states(self):
+        """{backend: state} of every backend that was sent to."""
+        with self._lock:
+            return {
+                backend: circuit.state for backend, circuit in self._circuits.items()
+            }
+
+    def allow(self, backend):
+        """Whether a send to the backend may go ahead. Lets one probe through an expired open circuit."""
+        circuit = self._circuits.get(backend)
+        if circuit is None or circuit.state == CLOSED:
+            return True
+
+        with self._lock:
+            if (
+                circuit.state == OPEN
+                and time.monotonic() - circuit.opened_at >= self.reset_timeout
+            ):
+                self._change(backend, circuit, HALF_OPEN)
+                return True
+            allowed = circuit.state == CLOSED
+        if not allowed:
+            instrumentation.event("circuit_rejected", backend)
+        return allowed
+
+    def record_success(self, backend):
+        circuit = self._circuits.get(backend)
+        if circuit is None or (circuit.state == CLOSED and not circuit.failures):
+            return
+        with self._lock:
+            circuit.failures = 0
+            if circuit.state != CLOSED:
+                self._change(backend, circuit, CLOSED)
+
+    def record_failure(self, backend):
+        with self._lock:
+            circuit = self._circuits.get(backend)
+            if circuit is None:
+                circuit = self._circuits[backend] = _Circuit()
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or (
+                circuit.state == CLOSED and circuit.failures >= self.failure_threshold
+            ):
+                circuit.opened_at = time.monotonic()
+                self._change(backend, circuit, OPEN)
+
+    def reset(self, backend=None):
+        """Closes the circuit of the backend, or of every backend."""
+        with self._lock:
+            for name, circuit in list(self._circuits.items()):
+                if backend is None or name == backend:
+                    circuit.failures = 0
+                    if circuit.state != CLOSED:
+                        self._change(name, circuit, CLOSED)
+
+    @staticmethod
+    def _change(backend, circuit, state):
+        circuit.state = state
+        if state == OPEN:
+            logger.warning(
+                f"{backend} failed {circuit.failures} times, failing fast for now."
+            )
+        else:
+            logger.info(f"{backend}'s circuit is {state.replace('_', ' ')}.")
+        instrumentation.event(f"circuit_{state}", backend, failures=circuit.failures)
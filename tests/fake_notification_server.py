@@ -0,0 +1,152 @@
+"""A private dbus-daemon and a stand-in org.freedesktop.Notifications server.
+
+Used by the D-Bus tests and the benchmarks so they never touch the desktop
+session. Run it directly to serve fake notifications on the current session bus:
+
+    dbus-run-session -- sh -c "python -m tests.fake_notification_server & python -m pytest tests/"
+"""
+
+import collections
+import itertools
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+try:
+    from jeepney import (
+        HeaderFields,
+        MessageType,
+        new_error,
+        new_method_return,
+        message_bus,
+    )
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    open_dbus_connection = None
+
+
+def dbus_available():
+    """True if a private bus and a fake server can be started here."""
+    return open_dbus_connection is not None and shutil.which("dbus-daemon") is not None
+
+
+class PrivateSessionBus:
+    """Starts a throwaway dbus-daemon and exposes its address."""
+
+    def __init__(self):
+        self._runtime_dir = tempfile.mkdtemp(prefix="notifypy-dbus-")
+        self._process = subprocess.Popen(
+            [
+                "dbus-daemon",
+                "--session",
+                "--nofork",
+                "--print-address=1",
+                f"--address=unix:dir={self._runtime_dir}",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.address = self._process.stdout.readline().decode("utf-8").strip()
+
+    def close(self):
+        self._process.terminate()
+        self._process.wait()
+        self._process.stdout.close()
+        shutil.rmtree(self._runtime_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class FakeNotificationServer:
+    """Answers org.freedesktop.Notifications calls on the given bus.
+
+    Every received Notify call is recorded in `notifications` as its argument tuple.
+    With capabilities=None, GetCapabilities isn't implemented.
+    """
+
+    def __init__(
+        self,
+        bus="SESSION",
+        capabilities=("body", "icon-static"),
+        server_information=("fake-notifyd", "notify-py", "0.1", "1.2"),
+        processing_delay=0,
+    ):
+        self.bus = bus
+        self.capabilities = None if capabilities is None else list(capabilities)
+        self.server_information = server_information
+        self.processing_delay = processing_delay
+        self.notifications = []
+        # Amount of calls received, by method name.
+        self.calls = collections.Counter()
+
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        if not self._ready.wait(timeout=5):
+            raise RuntimeError("fake notification server did not start.")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _reply(self, message):
+        member = message.header.fields.get(HeaderFields.member)
+        self.calls[member] += 1
+        if member == "Notify":
+            self.notifications.append(message.body)
+            replaces_id = message.body[1]
+            notification_id = replaces_id if replaces_id else next(self._ids)
+            return new_method_return(message, "u", (notification_id,))
+        if member == "GetCapabilities" and self.capabilities is not None:
+            return new_method_return(message, "as", (self.capabilities,))
+        if member == "GetServerInformation":
+            return new_method_return(message, "ssss", self.server_information)
+        if member == "CloseNotification":
+            return new_method_return(message)
+        return new_error(message, "org.freedesktop.DBus.Error.UnknownMethod")
+
+    def _serve(self):
+        connection = open_dbus_connection(bus=self.bus)
+        try:
+            connection.send_and_get_reply(
+                message_bus.RequestName("org.freedesktop.Notifications")
+            )
+            self._ready.set()
+            while not self._stop.is_set():
+                try:
+                    message = connection.receive(timeout=0.05)
+                except TimeoutError:
+                    continue
+                if message.header.message_type != MessageType.method_call:
+                    continue
+                if self.processing_delay:
+                    time.sleep(self.processing_delay)
+                connection.send(self._reply(message))
+        finally:
+            connection.close()
+
+
+if __name__ == "__main__":
+    server = FakeNotificationServer().start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
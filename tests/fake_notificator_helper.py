@@ -0,0 +1,31 @@
+"""Stands in for the macOS notificator-helper.js.
+
+Appends every request it reads to the file given as first argument, as JSON
+lines, and answers like the real helper. Requests whose message is "crash"
+make it exit without answering, "stale" is answered with another request's
+id and "fail" is answered with an error.
+"""
+
+import json
+import sys
+
+
+def main():
+    log_path = sys.argv[1]
+    for line in sys.stdin:
+        request = json.loads(line)
+        with open(log_path, "a") as log:
+            log.write(line)
+        if request["message"] == "crash":
+            sys.exit(1)
+        elif request["message"] == "stale":
+            answer = dict(id=request["id"] - 1, ok=True)
+        elif request["message"] == "fail":
+            answer = dict(id=request["id"], ok=False, error="applet exited with 1")
+        else:
+            answer = dict(id=request["id"], ok=True)
+        print(json.dumps(answer), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Stands in for the persistent PowerShell toast worker.
+
+Appends every toast it reads to the file given as first argument, one
+"<app id>\\t<toast xml>" line each, and answers like the real worker. Toasts
+whose XML contains "crash" make it exit without answering, "hang" makes it
+stop answering and "bad" is answered with an error.
+"""
+
+import sys
+import time
+
+from notifypy.os_notifiers._helper import decode_frame
+
+
+def main():
+    log_path = sys.argv[1]
+    for line in sys.stdin.buffer:
+        application_id, toast_xml = decode_frame(line.decode("ascii").strip())
+        if "crash" in toast_xml:
+            sys.exit(1)
+        if "hang" in toast_xml:
+            time.sleep(60)
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write(f"{application_id}\t{toast_xml}\n")
+        if "bad" in toast_xml:
+            print("error Bad toast", flush=True)
+        else:
+            print("ok", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import threading
+
+import notifypy
+from notifypy import BaseNotifier, NotificationAggregator, NotificationDispatcher
+
+
+class RecordingNotifier(BaseNotifier):
+    def __init__(self, **kwargs):
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send_notification(self, **kwargs):
+        with self.lock:
+            self.sent.append(kwargs)
+        return True
+
+
+def _notify(aggregator):
+    return notifypy.Notify(
+        use_custom_notifier=RecordingNotifier,
+        aggregator=aggregator,
+        dispatcher=NotificationDispatcher(max_workers=1),
+    )
+
+
+def test_duplicates_are_merged():
+    aggregator = NotificationAggregator(window=60)
+    notification = _notify(aggregator)
+    notification.title = "Service down"
+    for _ in range(37):
+        assert notification.send() == True
+
+    aggregator.flush()
+    notification._dispatcher.shutdown()
+    titles = [sent["notification_title"] for sent in notification._notifier.sent]
+    assert titles == ["Service down", "Service down (x37)"]
+    assert aggregator.metrics == dict(
+        received=37, sent=2, merged=36, dropped=0, pending=0
+    )
+
+
+def test_window_closes_on_its_own():
+    aggregator = NotificationAggregator(window=0.05)
+    notification = _notify(aggregator)
+    notification.send()
+    notification.send()
+
+    sent = threading.Event()
+    for _ in range(100):
+        if len(notification._notifier.sent) == 2:
+            break
+        sent.wait(0.05)
+    assert notification._notifier.sent[-1]["notification_title"].endswith("(x2)")
+
+
+def test_different_keys_are_not_merged():
+    aggregator = NotificationAggregator(window=60)
+    notification = _notify(aggregator)
+    for title in ("A", "B", "A"):
+        notification.title = title
+        notification.send()
+    assert aggregator.merged == 1
+    assert aggregator.sent == 2
+
+
+def test_custom_key():
+    aggregator = NotificationAggregator(
+        window=60, key=lambda notification: notification.application_name
+    )
+    notification = _notify(aggregator)
+    for title in ("A", "B"):
+        notification.title = title
+        notification.send()
+    assert aggregator.merged == 1
+
+
+def test_rate_limit_per_application():
+    aggregator = NotificationAggregator(window=0, rate=0.001, burst=2)
+    notification = _notify(aggregator)
+    results = []
+    for title in ("A", "B", "C"):
+        notification.title = title
+        results.append(notification.send())
+    assert results == [True, True, False]
+
+    notification.application_name = "Other application"
+    assert notification.send() == True
+    assert aggregator.dropped == 1
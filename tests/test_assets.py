@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import notifypy
+from notifypy.assets import AssetCache, DEFAULT_ICON, asset_cache
+from notifypy.exceptions import InvalidAudioFormat, InvalidAudioPath, InvalidIconPath
+
+
+@pytest.fixture
+def counted_exists(monkeypatch):
+    calls = []
+    exists = os.path.exists
+
+    def counting_exists(path):
+        # shutil.which uses it too.
+        if str(path).endswith((".png", ".wav")):
+            calls.append(path)
+        return exists(path)
+
+    monkeypatch.setattr(os.path, "exists", counting_exists)
+    return calls
+
+
+def test_resolved_paths_are_cached(counted_exists):
+    cache = AssetCache(ttl=60)
+    for _ in range(5):
+        assert cache.icon(DEFAULT_ICON) == DEFAULT_ICON
+        assert cache.audio("example_notification_sound.wav").endswith(
+            os.path.join("notifypy", "example_notification_sound.wav")
+        )
+    # One lookup each; the sound is found relative to the package on the second try.
+    assert len(counted_exists) == 3
+
+
+def test_ttl_expires(counted_exists):
+    cache = AssetCache(ttl=0)
+    cache.icon(DEFAULT_ICON)
+    cache.icon(DEFAULT_ICON)
+    assert len(counted_exists) == 2
+
+
+def test_missing_paths_raise_every_time():
+    cache = AssetCache()
+    for _ in range(2):
+        with pytest.raises(InvalidIconPath):
+            cache.icon("does/not/exist.png")
+    with pytest.raises(InvalidAudioPath):
+        cache.audio("does/not/exist.wav")
+    with pytest.raises(InvalidAudioFormat):
+        cache.audio("sound.mp3")
+
+
+def test_preloaded_assets_never_stat(counted_exists):
+    resolved = notifypy.preload_assets(
+        icons=[DEFAULT_ICON], sounds=["example_notification_sound.wav"]
+    )
+    assert resolved[DEFAULT_ICON] == DEFAULT_ICON
+    del counted_exists[:]
+
+    asset_cache.ttl, ttl = 0, asset_cache.ttl
+    try:
+        notification = notifypy.Notify()
+        notification.icon = DEFAULT_ICON
+        notification.audio = "example_notification_sound.wav"
+    finally:
+        asset_cache.ttl = ttl
+    assert counted_exists == []
+
+
+def test_preload_rejects_missing_assets():
+    with pytest.raises(InvalidIconPath):
+        notifypy.preload_assets(icons=["does/not/exist.png"])
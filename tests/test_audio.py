@@ -0,0 +1,79 @@
+import os
+import stat
+import time
+import wave
+
+import pytest
+
+from notifypy.os_notifiers._audio import AudioPlayer
+
+
+@pytest.fixture
+def fake_aplay(tmp_path):
+    """An 'aplay' that appends the raw frames it reads to a file."""
+    output = tmp_path / "played.raw"
+    aplay = tmp_path / "aplay"
+    aplay.write_text(f"#!/bin/sh\ncat >> '{output}'\n")
+    aplay.chmod(aplay.stat().st_mode | stat.S_IEXEC)
+    return str(aplay), output
+
+
+def _wav(path, frames, framerate=8000):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(framerate)
+        wav.writeframes(frames)
+    return str(path)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a shell script as aplay")
+def test_sounds_share_one_process(fake_aplay, tmp_path):
+    aplay, output = fake_aplay
+    first = _wav(tmp_path / "first.wav", b"\x01\x00" * 100)
+    second = _wav(tmp_path / "second.wav", b"\x02\x00" * 50)
+
+    player = AudioPlayer(aplay)
+    for _ in range(3):
+        player.play(first)
+    player.play(second)
+    player.close()
+
+    assert player.started == 1
+    assert output.read_bytes() == b"\x01\x00" * 300 + b"\x02\x00" * 50
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a shell script as aplay")
+def test_format_change_restarts_aplay(fake_aplay, tmp_path):
+    aplay, _ = fake_aplay
+    player = AudioPlayer(aplay)
+    player.play(_wav(tmp_path / "8k.wav", b"\x00\x00", framerate=8000))
+    player.play(_wav(tmp_path / "44k.wav", b"\x00\x00", framerate=44100))
+    player.close()
+    assert player.started == 2
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a shell script as aplay")
+def test_bursts_dont_pile_up_and_exit_doesnt_wait(tmp_path):
+    output = tmp_path / "played.raw"
+    aplay = tmp_path / "aplay"
+    # Slow to read, so the long sound below blocks the player on the pipe.
+    aplay.write_text(f"#!/bin/sh\nsleep 5 </dev/null\ncat >> '{output}'\n")
+    aplay.chmod(aplay.stat().st_mode | stat.S_IEXEC)
+    long_sound = _wav(tmp_path / "long.wav", b"\x01\x00" * 100000)
+    short_sound = _wav(tmp_path / "short.wav", b"\x02\x00")
+
+    player = AudioPlayer(str(aplay), max_queued=2)
+    player.play(long_sound)
+    time.sleep(0.2)
+    for _ in range(3):
+        player.play(short_sound)
+    assert player.dropped == 1
+
+    thread = player._thread
+    started = time.monotonic()
+    player.close(wait=False)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert time.monotonic() - started < 2
+    assert not output.exists()
@@ -0,0 +1,143 @@
+import asyncio
+import io
+import time
+
+import pytest
+
+import notifypy
+from notifypy import BackendChain, BaseNotifier
+from notifypy.instrumentation import Instrumentation
+from notifypy.os_notifiers.log import LogNotifier
+from notifypy.registry import BackendRegistry, backend_registry, register_backend
+
+
+class FakeBackend(BaseNotifier):
+    def __init__(self, works=True, delay=0.0, **kwargs):
+        self.works = works
+        self.delay = delay
+        self.sent = []
+
+    def send_notification(self, **kwargs):
+        time.sleep(self.delay)
+        if self.works == "raise":
+            raise RuntimeError("backend is broken")
+        if self.works:
+            self.sent.append(kwargs["notification_title"])
+        return self.works
+
+
+class OtherBackend(FakeBackend):
+    pass
+
+
+def _send(chain, title="Title"):
+    return chain.send_notification(
+        notification_title=title,
+        notification_subtitle="Message",
+        application_name="App",
+        notification_urgency="normal",
+        notification_icon="",
+        notification_audio=None,
+    )
+
+
+def test_falls_back_in_order():
+    broken, working = FakeBackend(works="raise"), OtherBackend()
+    chain = BackendChain([broken, working], routing="order")
+    assert _send(chain)
+    assert working.sent == ["Title"]
+    assert [backend["errors"] for backend in chain.health] == [1, 0]
+
+
+def test_down_backends_are_skipped_then_probed(monkeypatch):
+    instrumentation = Instrumentation()
+    events = []
+    instrumentation.add_hooks(on_event=lambda event, fields: events.append(event))
+    monkeypatch.setattr("notifypy.chain.instrumentation", instrumentation)
+
+    broken, working = FakeBackend(works=False), OtherBackend()
+    chain = BackendChain(
+        [broken, working], routing="order", failure_threshold=2, cooldown=60
+    )
+    for _ in range(4):
+        assert _send(chain)
+    assert chain.health[0]["down"] and chain.health[0]["errors"] == 2
+
+    # After the cooldown, it's tried again.
+    chain._backends[0].down_until = 0
+    broken.works = True
+    assert _send(chain, "Probe")
+    assert broken.sent == ["Probe"]
+    assert not chain.health[0]["down"]
+    assert events == ["backend_down", "backend_up"]
+
+
+def test_routes_to_the_fastest_backend():
+    slow, fast = FakeBackend(delay=0.02), OtherBackend()
+    chain = BackendChain([slow, fast])
+    for _ in range(5):
+        _send(chain)
+    # Each is measured once, then the faster one gets the rest.
+    assert len(slow.sent) == 1
+    assert len(fast.sent) == 4
+
+
+def test_failing_fast_doesnt_make_a_backend_fast():
+    slow, failing = FakeBackend(delay=0.02), OtherBackend(works=False)
+    chain = BackendChain([slow, failing], failure_threshold=100)
+    for _ in range(3):
+        assert _send(chain)
+    # Tried once (unmeasured), then after the working one.
+    assert chain.health[1]["latency"] is None
+    assert chain.health[1]["errors"] == 1
+    assert len(slow.sent) == 3
+
+
+def test_fallback_only_backends_are_last():
+    stream = io.StringIO()
+    log, working = LogNotifier(log_notifier_stream=stream), FakeBackend()
+    chain = BackendChain([log, working])
+    assert _send(chain)
+    assert working.sent == ["Title"] and stream.getvalue() == ""
+
+    working.works = False
+    assert _send(chain, "Logged")
+    assert stream.getvalue() == "[App] (normal) Logged: Message\n"
+
+
+def test_nothing_works():
+    chain = BackendChain([FakeBackend(works=False)])
+    assert not _send(chain)
+    assert asyncio.run(chain.send_notification_async(notification_title="T")) == False
+
+
+def test_registered_backends_by_name():
+    registry = BackendRegistry()
+    registry.register("fake", FakeBackend)
+    assert registry.backend_class("fake") is FakeBackend
+    assert registry.backend_class("log") is LogNotifier
+    with pytest.raises(ValueError):
+        registry.register("bad", object)
+    with pytest.raises(KeyError):
+        registry.backend_class("missing")
+
+
+def test_notify_with_a_chain():
+    register_backend("test-fake", FakeBackend)
+    try:
+        notification = notifypy.Notify(backend_chain=["missing", "test-fake", "log"])
+        assert notification._notifier.backends == ["test-fake", "log"]
+        assert notification.send()
+        assert notification._notifier._backends[0].notifier.sent == ["Default Title"]
+
+        chain = BackendChain([OtherBackend()])
+        chain.register(FakeBackend, position=0)
+        assert notifypy.Notify(backend_chain=chain)._notifier is chain
+        assert chain.backends == ["FakeBackend", "OtherBackend"]
+    finally:
+        backend_registry._backends.pop("test-fake")
+
+
+def test_default_chain():
+    chain = BackendChain(override_detected_notification_system="Linux")
+    assert chain.backends == ["dbus", "notify-send", "log"]
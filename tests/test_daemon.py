@@ -0,0 +1,114 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+from notifypy import BaseNotifier, cli
+from notifypy.daemon import NotifyDaemon, daemon_running, send_via_daemon
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available"
+)
+
+
+class RecordingNotifier(BaseNotifier):
+    sent = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def send_notification(self, **kwargs):
+        self.sent.append(kwargs)
+        return True
+
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "notifypy.sock")
+    monkeypatch.setenv("NOTIFYPY_SOCKET", path)
+    return path
+
+
+@pytest.fixture
+def daemon(socket_path):
+    RecordingNotifier.sent = []
+    daemon = NotifyDaemon(use_custom_notifier=RecordingNotifier)
+    daemon.bind()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join(5)
+
+
+def test_send_via_daemon(daemon):
+    assert daemon_running()
+    assert send_via_daemon({"title": "Daemon", "message": "Hello"}) is True
+    assert RecordingNotifier.sent[-1]["notification_title"] == "Daemon"
+    assert RecordingNotifier.sent[-1]["notification_subtitle"] == "Hello"
+
+
+def test_daemon_reports_errors(daemon):
+    assert send_via_daemon({"icon": "/does/not/exist.png"}) is False
+    assert RecordingNotifier.sent == []
+
+
+def test_no_daemon(socket_path):
+    assert not daemon_running()
+    assert send_via_daemon({"title": "Nobody listens"}) is None
+
+
+@pytest.mark.parametrize("hangs", [True, False])
+def test_unusable_daemon(socket_path, hangs):
+    # Hangs, or closes the connection without answering.
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def accept():
+        connection, _ = server.accept()
+        connection.recv(1024)
+        if hangs:
+            closed.wait(5)
+        connection.close()
+
+    closed = threading.Event()
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    try:
+        assert send_via_daemon({"title": "Unusable"}, timeout=0.2) is None
+    finally:
+        closed.set()
+        thread.join(5)
+        server.close()
+
+
+def test_sockets_others_can_write_to_are_not_used(daemon, socket_path):
+    os.chmod(socket_path, 0o666)
+    assert not daemon_running()
+    assert send_via_daemon({"title": "Not for others"}) is None
+    assert RecordingNotifier.sent == []
+
+
+def test_stale_socket_is_replaced(socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    daemon = NotifyDaemon(use_custom_notifier=RecordingNotifier)
+    daemon.bind()
+    try:
+        assert daemon_running()
+    finally:
+        daemon.close()
+
+
+def test_cli_forwards_to_daemon(daemon, monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["notifypy", "-t", "CLI", "-m", "Forwarded", "-a", "tests"]
+    )
+    cli.entry()
+    assert RecordingNotifier.sent[-1]["notification_title"] == "CLI"
+    assert RecordingNotifier.sent[-1]["application_name"] == "tests"
@@ -0,0 +1,100 @@
+import threading
+from concurrent import futures
+
+import pytest
+
+import notifypy
+from notifypy import BaseNotifier, NotificationDispatcher
+from notifypy.exceptions import DispatcherQueueFull, NotificationFailure
+
+
+def _blocked_dispatcher(overflow_policy):
+    """A one-worker, one-slot dispatcher whose worker is stuck until the event is set."""
+    release = threading.Event()
+    dispatcher = NotificationDispatcher(
+        max_workers=1, max_queue_size=1, overflow_policy=overflow_policy
+    )
+    running = dispatcher.submit(release.wait)
+    while not running.running():
+        pass
+    return dispatcher, release, running
+
+
+def test_future_carries_result():
+    dispatcher = NotificationDispatcher(max_workers=2)
+    future = dispatcher.submit(lambda: "sent")
+    assert isinstance(future, futures.Future)
+    assert future.result(timeout=5) == "sent"
+    assert future.wait() == True
+
+
+def test_future_carries_exception():
+    dispatcher = NotificationDispatcher(max_workers=1)
+
+    def fail():
+        raise NotificationFailure
+
+    future = dispatcher.submit(fail)
+    with pytest.raises(NotificationFailure):
+        future.result(timeout=5)
+    assert future.wait() == False
+
+
+def test_worker_count_is_bounded():
+    dispatcher = NotificationDispatcher(max_workers=3)
+    release = threading.Event()
+    pending = [dispatcher.submit(release.wait) for _ in range(50)]
+    assert len(dispatcher._workers) == 3
+    release.set()
+    assert all(future.result(timeout=5) for future in pending)
+
+
+def test_drop_newest():
+    dispatcher, release, _ = _blocked_dispatcher("drop_newest")
+    queued = dispatcher.submit(lambda: 1)
+    dropped = dispatcher.submit(lambda: 2)
+    assert dropped.cancelled()
+    release.set()
+    assert queued.result(timeout=5) == 1
+    assert dispatcher.dropped == 1
+
+
+def test_drop_oldest():
+    dispatcher, release, _ = _blocked_dispatcher("drop_oldest")
+    dropped = dispatcher.submit(lambda: 1)
+    queued = dispatcher.submit(lambda: 2)
+    assert dropped.cancelled()
+    release.set()
+    assert queued.result(timeout=5) == 2
+    assert dispatcher.dropped == 1
+
+
+def test_raise_when_full():
+    dispatcher, release, _ = _blocked_dispatcher("raise")
+    dispatcher.submit(lambda: 1)
+    with pytest.raises(DispatcherQueueFull):
+        dispatcher.submit(lambda: 2)
+    release.set()
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        NotificationDispatcher(overflow_policy="sometimes")
+
+
+def test_non_blocking_send_returns_future():
+    class CustomNotificator(BaseNotifier):
+        def __init__(self, **kwargs):
+            pass
+
+        def send_notification(self, **kwargs):
+            return kwargs["notification_title"] == "queued"
+
+    n = notifypy.Notify(
+        use_custom_notifier=CustomNotificator,
+        dispatcher=NotificationDispatcher(max_workers=1),
+    )
+    n.title = "queued"
+    future = n.send(block=False)
+    n.title = "changed after send"
+    assert future.result(timeout=5) == True
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from notifypy.exceptions import HelperProcessError
+from notifypy.os_notifiers._helper import HelperProcess, decode_frame, encode_frame
+from notifypy.os_notifiers.windows import WindowsNotifier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeWorkerNotifier(WindowsNotifier):
+    """A WindowsNotifier whose PowerShell worker is tests/fake_toast_worker.py."""
+
+    log_path = None
+
+    def __init__(self, **kwargs):
+        super().__init__(windows_persistent_worker=True, **kwargs)
+        self.ps1_files = []
+
+    def _worker_command(self):
+        return [sys.executable, "-m", "tests.fake_toast_worker", self.log_path]
+
+    def _get_worker(self):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = HelperProcess(
+                    self._worker_command(), name="fake worker", timeout=2, cwd=ROOT
+                )
+            return self._worker
+
+    def _run_ps1_file(self, generated_file, timeout=None):
+        self.ps1_files.append(generated_file)
+        return 0
+
+
+@pytest.fixture
+def notifier(tmp_path):
+    FakeWorkerNotifier.log_path = str(tmp_path / "toasts.log")
+    notifier = FakeWorkerNotifier()
+    yield notifier
+    notifier.close()
+
+
+def _toasts(notifier):
+    with open(notifier.log_path, encoding="utf-8") as log:
+        return [line.rstrip("\n").split("\t") for line in log]
+
+
+def _send(notifier, title, message="Message"):
+    return notifier.send_notification(
+        notification_title=title,
+        notification_subtitle=message,
+        notification_icon="C:\\icon.png",
+        application_name="app",
+        notification_audio=None,
+    )
+
+
+def test_frames_survive_newlines_and_unicode():
+    fields = ["app", '<text id="1">two\nlines, Grüße 🎉</text>', ""]
+    frame = encode_frame(*fields)
+    assert "\n" not in frame
+    assert decode_frame(frame) == fields[:2]
+
+
+def test_toasts_share_one_worker(notifier):
+    for index in range(5):
+        assert _send(notifier, f"Toast {index}") == True
+    assert notifier._worker.started == 1
+    toasts = _toasts(notifier)
+    assert len(toasts) == 5
+    assert toasts[0] == [
+        "app",
+        WindowsNotifier._generate_toast_xml("Toast 0", "Message", "C:\\icon.png", None),
+    ]
+    assert notifier.ps1_files == []
+
+
+def test_worker_errors_are_reported(notifier):
+    assert _send(notifier, "bad toast") == False
+    assert _send(notifier, "good toast") == True
+    assert notifier._worker.started == 1
+
+
+def test_crashed_worker_is_restarted(notifier):
+    assert _send(notifier, "crash") == False
+    assert _send(notifier, "restarted") == True
+    assert notifier._worker.started == 2
+    assert "restarted" in _toasts(notifier)[-1][1]
+
+
+def test_hanging_worker_is_killed(notifier):
+    notifier._get_worker().timeout = 0.5
+    assert _send(notifier, "hang") == False
+    assert _send(notifier, "restarted") == True
+    assert notifier._worker.started == 2
+
+
+def test_send_timeout_kills_the_worker(notifier):
+    with pytest.raises(TimeoutError):
+        notifier.send_notification(
+            notification_title="hang",
+            notification_subtitle="Message",
+            notification_icon="C:\\icon.png",
+            application_name="app",
+            notification_audio=None,
+            send_timeout=0.3,
+        )
+    assert notifier.ps1_files == []
+    assert _send(notifier, "restarted") == True
+    assert notifier._worker.started == 2
+
+
+def test_send_timeout_covers_waiting_for_the_worker(notifier):
+    busy = threading.Thread(target=_send, args=(notifier, "hang"))
+    busy.start()
+    time.sleep(0.2)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        notifier.send_notification(
+            notification_title="queued",
+            notification_subtitle="Message",
+            notification_icon="C:\\icon.png",
+            application_name="app",
+            notification_audio=None,
+            send_timeout=0.3,
+        )
+    assert time.monotonic() - started < 1
+    busy.join()
+
+
+def test_falls_back_to_ps1_files_when_the_worker_keeps_exiting(notifier):
+    worker = notifier._get_worker()
+    worker.max_restarts = 2
+    for _ in range(2):
+        assert _send(notifier, "crash") == False
+    assert _send(notifier, "fallback") == True
+    assert len(notifier.ps1_files) == 1
+    assert "fallback" in notifier.ps1_files[0]
+
+
+def test_async_fallback_keeps_the_toast_silent(notifier, monkeypatch):
+    worker = notifier._get_worker()
+    worker.max_restarts = 2
+    for _ in range(2):
+        assert _send(notifier, "crash") == False
+
+    played, scripts = [], []
+    monkeypatch.setattr(notifier, "_play_audio", played.append)
+
+    def generate(**kwargs):
+        scripts.append(WindowsNotifier._generate_notification_xml(notifier, **kwargs))
+        # PowerShell can't run here.
+        raise RuntimeError
+
+    monkeypatch.setattr(notifier, "_generate_notification_xml", generate)
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            notifier.send_notification_async(
+                notification_title="fallback",
+                notification_subtitle="Message",
+                notification_icon="C:\\icon.png",
+                application_name="app",
+                notification_audio="C:\\sound.wav",
+            )
+        )
+    assert played == ["C:\\sound.wav"]
+    assert '<audio silent="true" />' in scripts[0]
+
+
+def test_missing_helper_raises():
+    helper = HelperProcess([os.path.join(ROOT, "does-not-exist")])
+    with pytest.raises(HelperProcessError):
+        helper.request("hello")
@@ -0,0 +1,184 @@
+import os
+import struct
+import zlib
+
+import pytest
+
+from notifypy.os_notifiers._icons import (
+    DEFAULT_ICON,
+    IconCache,
+    UnsupportedImage,
+    decode_png,
+    downscale,
+)
+
+
+def _chunk(chunk_type, data):
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _filter(row, previous, bytes_per_pixel, filter_type):
+    filtered = bytearray()
+    for index, value in enumerate(row):
+        left = row[index - bytes_per_pixel] if index >= bytes_per_pixel else 0
+        up = previous[index]
+        upper_left = (
+            previous[index - bytes_per_pixel] if index >= bytes_per_pixel else 0
+        )
+        predictor = [0, left, up, (left + up) >> 1, _paeth(left, up, upper_left)]
+        filtered.append((value - predictor[filter_type]) & 0xFF)
+    return bytes([filter_type]) + bytes(filtered)
+
+
+def _png(width, height, color_type, rows, extra_chunks=b""):
+    """Encodes rows as a PNG, cycling through every filter type."""
+    bytes_per_pixel = len(rows[0]) // width
+    previous = bytes(len(rows[0]))
+    raw = b""
+    for index, row in enumerate(rows):
+        raw += _filter(row, previous, bytes_per_pixel, index % 5)
+        previous = row
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+        )
+        + extra_chunks
+        + _chunk(b"IDAT", zlib.compress(raw))
+        + _chunk(b"IEND", b"")
+    )
+
+
+def _pixels(width, height, channels):
+    return [
+        bytes(
+            (x * 37 + y * 11 + c * 53) & 0xFF
+            for x in range(width)
+            for c in range(channels)
+        )
+        for y in range(height)
+    ]
+
+
+@pytest.mark.parametrize("color_type, channels", [(2, 3), (6, 4)])
+def test_decode_rgb_and_rgba(color_type, channels):
+    rows = _pixels(7, 10, channels)
+    assert decode_png(_png(7, 10, color_type, rows)) == (7, 10, channels, rows)
+
+
+def test_decode_gray_and_gray_alpha():
+    gray = [bytes([10, 200]), bytes([30, 40])]
+    _, _, channels, rows = decode_png(_png(2, 2, 0, gray))
+    assert channels == 3
+    assert rows[0] == bytes([10, 10, 10, 200, 200, 200])
+
+    gray_alpha = [bytes([10, 128, 200, 255])]
+    _, _, channels, rows = decode_png(_png(2, 1, 4, gray_alpha))
+    assert channels == 4
+    assert rows[0] == bytes([10, 10, 10, 128, 200, 200, 200, 255])
+
+
+def test_decode_palette_with_transparency():
+    palette = _chunk(b"PLTE", bytes([255, 0, 0, 0, 0, 255]))
+    transparency = _chunk(b"tRNS", bytes([0]))
+    _, _, channels, rows = decode_png(
+        _png(2, 1, 3, [bytes([0, 1])], palette + transparency)
+    )
+    assert channels == 4
+    assert rows[0] == bytes([255, 0, 0, 0, 0, 0, 255, 255])
+
+
+def test_unsupported_images():
+    with pytest.raises(UnsupportedImage):
+        decode_png(b"\xff\xd8\xff\xe0 a jpeg")
+    header = struct.pack(">IIBBBBB", 1, 1, 16, 2, 0, 0, 0)
+    with pytest.raises(UnsupportedImage):
+        decode_png(b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", header))
+
+
+def test_downscale_keeps_aspect_ratio():
+    rows = _pixels(300, 150, 4)
+    width, height, scaled = downscale(300, 150, 4, rows, 100)
+    assert (width, height) == (100, 50)
+    assert all(len(row) == 400 for row in scaled)
+    assert scaled[0][:4] == rows[0][:4]
+
+
+def test_default_icon_decodes():
+    width, height, channels, rows = decode_png(open(DEFAULT_ICON, "rb").read())
+    assert (width, height, channels) == (110, 110, 4)
+    # Transparent corner, the logo's blue and yellow.
+    assert rows[0][3] == 0
+    assert rows[30][30 * 4 : 31 * 4] == bytes([0x37, 0x76, 0xAB, 0xFF])
+    assert rows[80][80 * 4 : 81 * 4] == bytes([0xFF, 0xCE, 0x3D, 0xFF])
+
+
+def test_icon_cache(tmp_path):
+    path = str(tmp_path / "icon.png")
+    with open(path, "wb") as icon:
+        icon.write(_png(4, 4, 6, _pixels(4, 4, 4)))
+
+    cache = IconCache()
+    signature, (width, height, rowstride, has_alpha, bits, channels, data) = cache.get(
+        path
+    )
+    assert signature == "(iiibiiay)"
+    assert (width, height, rowstride, has_alpha, bits, channels) == (
+        4,
+        4,
+        16,
+        True,
+        8,
+        4,
+    )
+    assert cache.get(path)[1][6] is data
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A changed file is decoded again.
+    with open(path, "wb") as icon:
+        icon.write(_png(2, 2, 2, _pixels(2, 2, 3)))
+    os.utime(path, ns=(0, 0))
+    assert cache.get(path)[1][:2] == (2, 2)
+
+
+def test_icon_cache_decodes_in_the_background(tmp_path):
+    path = str(tmp_path / "icon.png")
+    with open(path, "wb") as icon:
+        icon.write(_png(4, 4, 6, _pixels(4, 4, 4)))
+
+    cache = IconCache()
+    assert cache.get(path, block=False) is None
+    assert cache.wait(5)
+    assert cache.get(path, block=False)[1][:2] == (4, 4)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_icon_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for index in range(3):
+        paths.append(str(tmp_path / f"{index}.png"))
+        with open(paths[-1], "wb") as icon:
+            icon.write(_png(4, 4, 6, _pixels(4, 4, 4)))
+
+    cache = IconCache(max_bytes=2 * 64)
+    for path in paths[:2]:
+        cache.get(path)
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert cache.size == 2 * 64
+    cache.get(paths[1])
+    assert cache.misses == 4
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+
+def _modules_after(code):
+    """Heavy modules imported by running the code in a fresh interpreter."""
+    heavy_modules = ["loguru", "jeepney", "asyncio", "platform", "concurrent.futures"]
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            f"import sys\n{code}\nprint([m for m in {heavy_modules!r} if m in sys.modules])",
+        ]
+    )
+    return output.decode("utf-8").strip()
+
+
+def test_import_is_lazy():
+    assert _modules_after("import notifypy") == "[]"
+
+
+def test_linux_backend_probing_is_lazy():
+    code = "import notifypy.os_notifiers.linux as linux\nlinux.LinuxNotifier()"
+    assert _modules_after(code) == "[]"
@@ -0,0 +1,175 @@
+import pytest
+
+import notifypy
+from notifypy import BaseNotifier, NotificationAggregator, NotificationDispatcher
+from notifypy.instrumentation import Counter, Histogram, instrumentation
+
+
+class OutcomeNotifier(BaseNotifier):
+    """Sends titled "fail" unsuccessfully, raises for "raise" and times out for "timeout"."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def send_notification(self, notification_title, **kwargs):
+        if notification_title == "raise":
+            raise RuntimeError("backend is broken")
+        if notification_title == "timeout":
+            raise TimeoutError
+        return notification_title != "fail"
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.reset()
+
+
+def _notify(**kwargs):
+    return notifypy.Notify(
+        use_custom_notifier=OutcomeNotifier,
+        dispatcher=NotificationDispatcher(max_workers=1),
+        **kwargs,
+    )
+
+
+def _send(notification, *titles):
+    results = []
+    for title in titles:
+        notification.title = title
+        results.append(notification.send())
+    return results
+
+
+def test_disabled_records_nothing():
+    instrumentation.reset()
+    assert _send(_notify(), "ok") == [True]
+    assert instrumentation.sends.samples() == []
+    assert instrumentation.latency.samples() == []
+
+
+def test_outcomes_are_counted(enabled):
+    results = _send(_notify(), "ok", "ok", "fail", "raise", "timeout")
+    assert results == [True, True, False, False, False]
+
+    counts = {
+        outcome: enabled.sends.value(backend="OutcomeNotifier", outcome=outcome)
+        for outcome in ("success", "failure", "timeout")
+    }
+    assert counts == dict(success=2, failure=2, timeout=1)
+    assert enabled.latency.count(backend="OutcomeNotifier") == 5
+    assert enabled.in_flight.value(backend="OutcomeNotifier") == 0
+
+
+def test_hooks(enabled):
+    calls = []
+    enabled.add_hooks(
+        before_send=lambda backend, notification: calls.append(
+            ("before", backend, notification["notification_title"])
+        ),
+        after_send=lambda backend, notification, outcome, duration, exception: calls.append(
+            ("after", outcome, type(exception).__name__)
+        ),
+    )
+    _send(_notify(), "ok", "raise")
+    assert calls == [
+        ("before", "OutcomeNotifier", "ok"),
+        ("after", "success", "NoneType"),
+        ("before", "OutcomeNotifier", "raise"),
+        ("after", "failure", "RuntimeError"),
+    ]
+
+
+def test_failing_hooks_dont_break_sending(enabled):
+    def broken_hook(*args):
+        raise ValueError
+
+    enabled.add_hooks(before_send=broken_hook, after_send=broken_hook)
+    assert _send(_notify(), "ok") == [True]
+
+
+def test_send_many_is_measured_per_notification(enabled):
+    results = _notify().send_many([{"title": "ok"}, {"title": "fail"}, {"title": "ok"}])
+    assert results == [True, False, True]
+    assert enabled.sends.value(backend="OutcomeNotifier", outcome="success") == 2
+    assert enabled.latency.count(backend="OutcomeNotifier") == 3
+    assert enabled.in_flight.value(backend="OutcomeNotifier") == 0
+
+
+def test_events(enabled):
+    events = []
+    enabled.add_hooks(on_event=lambda event, fields: events.append((event, fields)))
+    enabled.event("retry", backend="OutcomeNotifier", attempt=2)
+    assert enabled.events.value(event="retry", backend="OutcomeNotifier") == 1
+    assert events == [("retry", dict(attempt=2, backend="OutcomeNotifier"))]
+
+    enabled.disable()
+    enabled.event("retry", backend="OutcomeNotifier")
+    assert enabled.events.value(event="retry", backend="OutcomeNotifier") == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency", "Latency.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+    assert [sample[2] for sample in histogram.samples()] == [1, 3, 4, 6.05, 4]
+    assert [sample[1].get("le") for sample in histogram.samples()[:3]] == [
+        "0.1",
+        "1.0",
+        "+Inf",
+    ]
+
+
+def test_prometheus_text(enabled):
+    aggregator = NotificationAggregator(window=60)
+    notification = _notify(aggregator=aggregator)
+    _send(notification, "ok", "ok")
+
+    counter = Counter("quoted_total", 'Label "escaping".', ("label",))
+    counter.inc(label='a "b"\nc')
+    enabled.metrics.append(counter)
+    try:
+        text = enabled.prometheus_text()
+    finally:
+        enabled.metrics.remove(counter)
+
+    lines = text.splitlines()
+    assert "# TYPE notifypy_notifications_total counter" in lines
+    assert (
+        'notifypy_notifications_total{backend="OutcomeNotifier",outcome="success"} 1'
+        in lines
+    )
+    assert 'notifypy_send_duration_seconds_count{backend="OutcomeNotifier"} 1' in lines
+    assert "# TYPE notifypy_dispatcher_queue_size gauge" in lines
+    assert any(
+        line.startswith("notifypy_aggregator_notifications_total{")
+        and 'outcome="merged"' in line
+        for line in lines
+    )
+    assert 'quoted_total{label="a \\"b\\"\\nc"} 1' in lines
+    aggregator.close()
+
+
+def test_opentelemetry_exporter(enabled):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+    from notifypy.instrumentation import OpenTelemetryExporter
+
+    reader = InMemoryMetricReader()
+    exporter = OpenTelemetryExporter(
+        meter_provider=MeterProvider(metric_readers=[reader])
+    ).install()
+    _send(_notify(), "ok")
+    exporter.uninstall()
+
+    names = {
+        metric.name
+        for resource in reader.get_metrics_data().resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    assert {"notifypy.notifications", "notifypy.send.duration"} <= names
@@ -0,0 +1,429 @@
+import os
+
+import pytest
+
+from .fake_notification_server import (
+    FakeNotificationServer,
+    PrivateSessionBus,
+    dbus_available,
+)
+
+pytestmark = pytest.mark.skipif(
+    not dbus_available(), reason="jeepney and dbus-daemon are required."
+)
+
+
+@pytest.fixture
+def session_bus(monkeypatch):
+    with PrivateSessionBus() as bus:
+        monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", bus.address)
+        yield bus
+
+
+@pytest.fixture
+def notification_server(session_bus):
+    with FakeNotificationServer() as server:
+        yield server
+
+
+def _send(notifier, title="Title", message="Message"):
+    return notifier.send_notification(
+        notification_title=title,
+        notification_subtitle=message,
+        notification_icon="",
+        notification_audio=None,
+        application_name="notify.py tests",
+    )
+
+
+def test_pooled_connection_is_reused(notification_server):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier()
+    assert notifier._connection_pool.opened == 0
+
+    for index in range(5):
+        assert _send(notifier, title=f"#{index}") == True
+
+    assert notifier._connection_pool.opened == 1
+    assert [n[3] for n in notification_server.notifications] == [
+        f"#{index}" for index in range(5)
+    ]
+
+
+def test_pooled_connection_reconnects_after_drop(notification_server):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier()
+    assert _send(notifier) == True
+
+    with notifier._connection_pool.connection() as connection:
+        connection.sock.shutdown(2)
+
+    assert _send(notifier) == True
+    assert notifier._connection_pool.opened == 1
+    assert len(notification_server.notifications) == 2
+
+
+def test_error_reply_is_a_failure(session_bus):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    # Nobody owns org.freedesktop.Notifications on this bus.
+    assert _send(LinuxNotifier()) == False
+
+
+def test_closed_pool_closes_idle_connections(notification_server):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier()
+    assert _send(notifier) == True
+
+    notifier._connection_pool.close()
+    assert notifier._connection_pool.opened == 0
+
+
+def test_waiting_for_a_pooled_connection_times_out(notification_server):
+    import time
+
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier(linux_dbus_pool_size=1)
+    with notifier._connection_pool.connection():
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            notifier.send_notification(
+                notification_title="Title",
+                notification_subtitle="Message",
+                notification_icon="",
+                notification_audio=None,
+                application_name="notify.py tests",
+                send_timeout=0.2,
+            )
+        assert time.monotonic() - started < 1
+
+    # The server wasn't asked, that's not remembered as a missing answer.
+    assert notifier.capabilities() == {"body", "icon-static"}
+    assert _send(notifier) == True
+    assert len(notification_server.notifications) == 1
+
+
+def test_send_async_shares_one_connection(notification_server):
+    import asyncio
+    import threading
+
+    import notifypy
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    n = notifypy.Notify(use_custom_notifier=LinuxNotifier)
+    threads_before = threading.active_count()
+
+    async def send_all():
+        return await asyncio.gather(*(n.send_async() for _ in range(200)))
+
+    assert all(asyncio.run(send_all()))
+    assert threading.active_count() == threads_before
+    assert len(notification_server.notifications) == 200
+    assert n._notifier._connection_pool.opened == 0
+
+
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="counts the open fds in /proc."
+)
+def test_async_connection_is_closed_with_its_loop(notification_server):
+    import asyncio
+
+    import notifypy
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    n = notifypy.Notify(use_custom_notifier=LinuxNotifier)
+    assert asyncio.run(n.send_async())
+    fds_before = len(os.listdir("/proc/self/fd"))
+
+    for _ in range(20):
+        assert asyncio.run(n.send_async())
+    assert len(os.listdir("/proc/self/fd")) <= fds_before
+    assert len(n._notifier._async_connection._routers) == 0
+    assert len(notification_server.notifications) == 21
+
+
+def test_send_many_uses_one_connection(notification_server):
+    import notifypy
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    n = notifypy.Notify(use_custom_notifier=LinuxNotifier)
+    results = n.send_many({"title": f"#{index}"} for index in range(20))
+
+    assert results == [True] * 20
+    assert n._notifier._connection_pool.opened == 1
+    assert [n[3] for n in notification_server.notifications] == [
+        f"#{index}" for index in range(20)
+    ]
+
+
+class _ReversingConnection:
+    """Answers calls only once `window` calls are pending, newest first."""
+
+    def __init__(self, window):
+        import itertools
+
+        self.outgoing_serial = itertools.count(1)
+        self.window = window
+        self.unanswered = []
+        self.replies = []
+
+    def send(self, message, serial):
+        message.header.serial = serial
+        self.unanswered.append(message)
+
+    def receive(self, timeout=None):
+        from jeepney import new_method_return
+
+        if not self.replies:
+            if len(self.unanswered) < self.window:
+                raise TimeoutError
+            self.replies = [
+                new_method_return(message, "u", (message.body[3],))
+                for message in reversed(self.unanswered)
+            ]
+            self.unanswered = []
+        return self.replies.pop(0)
+
+
+def test_pipeline_matches_out_of_order_replies():
+    from jeepney import new_method_call
+    from notifypy.os_notifiers._dbus import NOTIFICATIONS_ADDRESS, DBusPipeline
+
+    messages = [
+        new_method_call(
+            NOTIFICATIONS_ADDRESS,
+            "Notify",
+            "susssasa{sv}i",
+            ("tests", 0, "", index, "", [], {}, -1),
+        )
+        for index in range(8)
+    ]
+    pipeline = DBusPipeline(_ReversingConnection(window=4), window=4)
+    replies = list(pipeline.call_many(iter(messages)))
+
+    assert [reply.body[0] for reply in replies] == list(range(8))
+
+
+def test_notify_many_returns_notification_ids(notification_server):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier(linux_dbus_pipeline_window=8)
+    notification_ids = list(
+        notifier.notify_many(
+            dict(
+                notification_title=f"#{index}",
+                notification_subtitle="",
+                notification_icon="",
+                notification_audio=None,
+                application_name="notify.py tests",
+            )
+            for index in range(50)
+        )
+    )
+
+    assert notification_ids == list(range(1, 51))
+
+
+def test_notify_replaces_in_place(notification_server):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier()
+    kwargs = dict(
+        notification_subtitle="",
+        notification_icon="",
+        notification_audio=None,
+        application_name="notify.py tests",
+    )
+    notification_id = notifier.notify(notification_title="0%", **kwargs)
+    assert (
+        notifier.notify(notification_title="50%", replaces_id=notification_id, **kwargs)
+        == notification_id
+    )
+    assert [n[1] for n in notification_server.notifications] == [0, notification_id]
+
+
+def test_handle_updates_are_coalesced(session_bus):
+    import notifypy
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    with FakeNotificationServer(processing_delay=0.02) as server:
+        notification = notifypy.Notify(
+            use_custom_notifier=LinuxNotifier,
+            dispatcher=notifypy.NotificationDispatcher(max_workers=1),
+        )
+        notification.title = "Build"
+        notification.message = "0%"
+        handle = notification.send(handle=True)
+        assert handle.id
+
+        for percent in range(1, 101):
+            future = handle.update(message=f"{percent}%")
+        assert future.wait(timeout=10) == True
+
+    assert handle.coalesced > 0
+    assert len(server.notifications) == 101 - handle.coalesced
+    assert server.notifications[-1][4] == "100%"
+    assert {n[1] for n in server.notifications[1:]} == {handle.id}
+
+
+def _send_with_audio(notifier):
+    return notifier.send_notification(
+        notification_title="Sound",
+        notification_subtitle="",
+        notification_icon="",
+        notification_audio="/tmp/sound.wav",
+        application_name="notify.py tests",
+    )
+
+
+def test_sound_hint_when_server_plays_sounds(session_bus, monkeypatch):
+    from notifypy.os_notifiers import linux
+
+    played = []
+    monkeypatch.setattr(linux, "_play_audio", lambda *args: played.append(args))
+
+    with FakeNotificationServer(capabilities=("body", "sound")) as server:
+        assert _send_with_audio(linux.LinuxNotifier()) == True
+
+    assert server.notifications[0][6] == {"sound-file": ("s", "/tmp/sound.wav")}
+    assert played == []
+
+
+def test_sound_played_locally_without_capability(notification_server, monkeypatch):
+    from notifypy.os_notifiers import linux
+
+    played = []
+    monkeypatch.setattr(linux, "_play_audio", lambda *args: played.append(args))
+
+    assert _send_with_audio(linux.LinuxNotifier()) == True
+    assert notification_server.notifications[0][6] == {}
+    assert played == [("/tmp/sound.wav", "player")]
+
+
+def test_server_details_are_cached_per_connection(notification_server):
+    import notifypy
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notification = notifypy.Notify(use_custom_notifier=LinuxNotifier)
+    assert notification.capabilities == {"body", "icon-static"}
+    assert notification.server_information.name == "fake-notifyd"
+    notifier = notification._notifier
+    for _ in range(3):
+        assert _send(notifier) == True
+    assert notification_server.calls["GetCapabilities"] == 1
+    assert notification_server.calls["GetServerInformation"] == 1
+
+    with notifier._connection_pool.connection() as connection:
+        connection.sock.shutdown(2)
+    # The first send finds out about the drop and reconnects, the next asks again.
+    assert _send(notifier) == True
+    assert _send(notifier) == True
+    assert notification_server.calls["GetCapabilities"] == 2
+
+
+def test_missing_server_details_are_cached_per_connection(session_bus):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    with FakeNotificationServer(capabilities=None) as server:
+        notifier = LinuxNotifier()
+        for _ in range(3):
+            assert _send(notifier) == True
+        assert notifier.capabilities() is None
+    assert server.calls["GetCapabilities"] == 1
+
+
+def test_payload_is_tailored_to_the_server(session_bus):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    with FakeNotificationServer(capabilities=()) as server:
+        assert (
+            LinuxNotifier().send_notification(
+                notification_title="Title",
+                notification_subtitle="Ignored body",
+                notification_icon="/ignored/icon.png",
+                notification_audio=None,
+                application_name="notify.py tests",
+            )
+            == True
+        )
+
+    _, _, icon, summary, body, _, _, _ = server.notifications[0]
+    assert (icon, summary, body) == ("", "Title", " ")
+
+
+def test_icon_is_sent_as_image_data(notification_server):
+    from notifypy.os_notifiers._icons import DEFAULT_ICON, icon_cache
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    icon_cache.clear()
+    notifier = LinuxNotifier(linux_icon_max_size=64)
+
+    def send():
+        return notifier.send_notification(
+            notification_title="Title",
+            notification_subtitle="Message",
+            notification_icon=DEFAULT_ICON,
+            notification_audio=None,
+            application_name="notify.py tests",
+        )
+
+    # Sent by path while it's decoded in the background.
+    assert send() == True
+    assert notification_server.notifications[0][2] == DEFAULT_ICON
+    assert "image-data" not in notification_server.notifications[0][6]
+    assert icon_cache.wait(5)
+
+    assert send() == True
+    icon, hints = (
+        notification_server.notifications[1][2],
+        notification_server.notifications[1][6],
+    )
+    assert icon == ""
+    signature, (width, height, rowstride, has_alpha, _, channels, data) = hints[
+        "image-data"
+    ]
+    assert signature == "(iiibiiay)"
+    assert (width, height, rowstride, has_alpha, channels) == (64, 64, 256, True, 4)
+    assert len(data) == 64 * 256
+
+
+def test_urgency_hint(notification_server):
+    from notifypy.os_notifiers.linux import LinuxNotifier
+
+    notifier = LinuxNotifier()
+    for urgency in ("low", "critical", "unknown"):
+        assert (
+            notifier.send_notification(
+                notification_title="Title",
+                notification_subtitle="Message",
+                notification_icon="",
+                notification_audio=None,
+                notification_urgency=urgency,
+                application_name="notify.py tests",
+            )
+            == True
+        )
+
+    assert [n[6] for n in notification_server.notifications] == [
+        {"urgency": ("y", 0)},
+        {"urgency": ("y", 2)},
+        {},
+    ]
+
+
+def test_session_bus_is_preferred_over_notify_send(session_bus, monkeypatch):
+    from notifypy.os_notifiers import linux
+    from notifypy.registry import select_notifier_class
+
+    monkeypatch.setattr(linux, "find_notify_send", lambda: "/usr/bin/notify-send")
+    assert select_notifier_class(override_detection="Linux") is linux.LinuxNotifier
+
+    monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", "unix:path=/nonexistent/bus")
+    assert (
+        select_notifier_class(override_detection="Linux")
+        is linux.LinuxNotifierLibNotify
+    )
@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+
+import pytest
+
+from notifypy.os_notifiers._helper import JsonHelper
+from notifypy.os_notifiers.macos import MacOSNotifier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeHelperNotifier(MacOSNotifier):
+    """A MacOSNotifier whose helper is tests/fake_notificator_helper.py."""
+
+    log_path = None
+
+    def __init__(self, **kwargs):
+        super().__init__(macos_persistent_helper=True, **kwargs)
+
+    def _get_helper(self):
+        with self._helper_lock:
+            if self._helper is None:
+                self._helper = JsonHelper(
+                    [
+                        sys.executable,
+                        "-m",
+                        "tests.fake_notificator_helper",
+                        self.log_path,
+                    ],
+                    name="fake helper",
+                    timeout=2,
+                    cwd=ROOT,
+                )
+            return self._helper
+
+
+@pytest.fixture
+def notifier(tmp_path):
+    FakeHelperNotifier.log_path = str(tmp_path / "requests.log")
+    notifier = FakeHelperNotifier()
+    yield notifier
+    notifier.close()
+
+
+def _requests(notifier):
+    with open(notifier.log_path) as log:
+        return [json.loads(line) for line in log]
+
+
+def _send(notifier, message, title="Title", audio=None):
+    return notifier.send_notification(
+        notification_title=title,
+        notification_subtitle=message,
+        application_name="app",
+        notification_audio=audio,
+    )
+
+
+def test_helper_command_points_at_the_bundled_applet():
+    command = MacOSNotifier()._helper_command()
+    assert command[:3] == ["osascript", "-l", "JavaScript"]
+    assert os.path.exists(command[3])
+    assert command[4].endswith(
+        os.path.join("Notificator.app", "Contents", "MacOS", "applet")
+    )
+    assert os.path.exists(command[4])
+
+
+def test_notifications_share_one_helper(notifier):
+    for index in range(3):
+        assert _send(notifier, f"Message {index}") == True
+    assert _send(notifier, "", title="", audio="/sound.wav") == True
+
+    assert notifier._helper.started == 1
+    requests = _requests(notifier)
+    assert [request["id"] for request in requests] == [1, 2, 3, 4]
+    assert requests[0] == dict(
+        id=1, title="app", subtitle="Title", message="Message 0", sound_file=""
+    )
+    # Like the notificator's command line, empty texts are sent as a space.
+    assert requests[3]["subtitle"] == requests[3]["message"] == " "
+    assert requests[3]["sound_file"] == "/sound.wav"
+
+
+def test_unicode_is_sent_as_ascii(notifier):
+    assert _send(notifier, "Grüße 🎉\nsecond line") == True
+    assert _requests(notifier)[0]["message"] == "Grüße 🎉\nsecond line"
+
+
+def test_helper_errors_are_reported(notifier):
+    assert _send(notifier, "fail") == False
+    assert _send(notifier, "fine") == True
+    assert notifier._helper.started == 1
+
+
+def test_crashed_helper_is_restarted(notifier):
+    assert _send(notifier, "crash") == False
+    assert _send(notifier, "fine") == True
+    assert notifier._helper.started == 2
+
+
+def test_out_of_turn_answer_restarts_the_helper(notifier):
+    assert _send(notifier, "stale") == False
+    assert _send(notifier, "fine") == True
+    assert notifier._helper.started == 2
@@ -2,6 +2,7 @@ import notifypy
 import pytest
 import pathlib
 import platform
+import threading
 
 
 from notifypy import BaseNotifier
@@ -143,3 +144,107 @@ def test_macOS_custom_notificator():
         == custom_notificator_path + "/Contents/Resources/Scripts/notificator"
     )
     assert n.send() == True
+
+
+def test_send_async_custom_notifier():
+    import asyncio
+
+    class CustomNotificator(BaseNotifier):
+        def __init__(self, **kwargs):
+            self.sent = []
+
+        def send_notification(self, **kwargs):
+            self.sent.append(kwargs["notification_title"])
+            return True
+
+    n = notifypy.Notify(use_custom_notifier=CustomNotificator)
+    n.title = "async"
+    assert asyncio.run(n.send_async()) == True
+    assert n._notifier.sent == ["async"]
+
+
+def test_send_many_custom_notifier():
+    class CustomNotificator(BaseNotifier):
+        def __init__(self, **kwargs):
+            pass
+
+        def send_notification(self, **kwargs):
+            if kwargs["notification_title"] == "fail":
+                raise RuntimeError
+            return kwargs["notification_subtitle"] == "Default Message"
+
+    n = notifypy.Notify(use_custom_notifier=CustomNotificator)
+    assert n.send_many(
+        iter([{"title": "first"}, {"title": "fail"}, {"message": "other"}])
+    ) == [True, False, False]
+
+
+def test_send_handle_custom_notifier():
+    class CustomNotificator(BaseNotifier):
+        def __init__(self, **kwargs):
+            self.sent = []
+
+        def send_notification(self, **kwargs):
+            self.sent.append(kwargs["notification_subtitle"])
+            return True
+
+    n = notifypy.Notify(use_custom_notifier=CustomNotificator)
+    handle = n.send(handle=True)
+    assert handle.update(message="updated").wait(timeout=5) == True
+    # Notifiers without ids send a new notification for every update.
+    assert handle.id is None
+    assert n._notifier.sent == ["Default Message", "updated"]
+    with pytest.raises(TypeError):
+        handle.update(subtitle="unknown")
+
+
+def test_notification_is_immutable():
+    notification = notifypy.Notification(title="Frozen", message=42)
+    assert notification.message == "42"
+    assert not hasattr(notification, "__dict__")
+    with pytest.raises(AttributeError):
+        notification.title = "Thawed"
+
+    changed = notification.replace(title="Changed")
+    assert (notification.title, changed.title) == ("Frozen", "Changed")
+    assert changed.message is notification.message
+    with pytest.raises(notifypy.exceptions.InvalidIconPath):
+        notification.replace(icon="does/not/exist.png")
+
+
+def test_send_notification_object():
+    class CustomNotificator(BaseNotifier):
+        def __init__(self, **kwargs):
+            self.sent = []
+
+        def send_notification(self, **kwargs):
+            self.sent.append(kwargs)
+            return True
+
+    n = notifypy.Notify(use_custom_notifier=CustomNotificator)
+    notification = notifypy.Notification(title="Value", message="Object")
+    assert n.send(notification) == True
+    # Passed through without being converted again.
+    assert n._notifier.sent[0]["notification_title"] is notification.title
+    assert n._notifier.sent[0]["notification_subtitle"] is notification.message
+
+
+def test_send_snapshots_attributes():
+    release = threading.Event()
+
+    class CustomNotificator(BaseNotifier):
+        def __init__(self, **kwargs):
+            self.sent = []
+
+        def send_notification(self, **kwargs):
+            release.wait(5)
+            self.sent.append(kwargs["notification_title"])
+            return True
+
+    n = notifypy.Notify(use_custom_notifier=CustomNotificator)
+    n.title = "First"
+    future = n.send(block=False)
+    n.title = "Second"
+    release.set()
+    assert future.wait(timeout=5) == True
+    assert n._notifier.sent == ["First"]
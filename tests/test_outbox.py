@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+
+import notifypy
+from notifypy import BaseNotifier, Notification, NotificationDispatcher
+from notifypy.outbox import HEADER, Outbox
+
+
+class FlakyNotifier(BaseNotifier):
+    """Fails until up is set."""
+
+    def __init__(self, **kwargs):
+        self.up = False
+        self.sent = []
+
+    def send_notification(self, **kwargs):
+        if not self.up:
+            return False
+        self.sent.append(kwargs["notification_title"])
+        return True
+
+
+def _titles(outbox):
+    titles = []
+
+    def send(notification):
+        titles.append(notification.title)
+        return True
+
+    outbox.drain(send)
+    return titles
+
+
+def test_drains_in_order_across_reopening(tmp_path):
+    path = str(tmp_path / "outbox")
+    outbox = Outbox(path)
+    for index in range(5):
+        outbox.put(Notification(title=f"N{index}"))
+    outbox.close()
+
+    outbox = Outbox(path)
+    assert outbox.pending == 5
+    assert _titles(outbox) == [f"N{index}" for index in range(5)]
+    assert outbox.pending == 0
+    outbox.close()
+
+
+def test_drain_stops_at_the_first_failure(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox"))
+    for title in ("A", "B", "C"):
+        outbox.put(Notification(title=title))
+
+    calls = []
+
+    def send(notification):
+        calls.append(notification.title)
+        return len(calls) == 1
+
+    assert outbox.drain(send) == 1
+    assert calls == ["A", "B"]
+    assert _titles(outbox) == ["B", "C"]
+    outbox.close()
+
+
+def test_rejected_notifications_dont_block_the_outbox(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox"), max_attempts=3)
+    for title in ("Rejected", "A", "B"):
+        outbox.put(Notification(title=title))
+
+    delivered = []
+
+    def send(notification):
+        if notification.title == "Rejected":
+            return False
+        delivered.append(notification.title)
+        return True
+
+    assert [outbox.drain(send) for _ in range(3)] == [0, 0, 2]
+    assert delivered == ["A", "B"]
+    assert (outbox.pending, outbox.dropped) == (0, 1)
+    outbox.close()
+
+
+def test_appends_dont_cut_the_retry_interval_short(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox"), retry_interval=60)
+    attempts = []
+
+    def send(notification):
+        attempts.append(notification.title)
+        return False
+
+    assert outbox.send(send, Notification(title="First")) == False
+    # The drainer tried once and waits now.
+    threading.Event().wait(0.1)
+    for index in range(5):
+        outbox.send(send, Notification(title=f"N{index}"))
+    threading.Event().wait(0.2)
+    # The direct send, and the drainer's first attempt.
+    assert attempts == ["First", "First"]
+    outbox.close()
+
+
+def test_torn_record_is_discarded(tmp_path):
+    path = str(tmp_path / "outbox")
+    outbox = Outbox(path)
+    outbox.put(Notification(title="Kept"))
+    outbox.put(Notification(title="Torn"))
+    tail = outbox._tail
+    outbox.close()
+
+    # A crash while the last payload was being written.
+    with open(path, "r+b") as outbox_file:
+        outbox_file.seek(tail - 3)
+        outbox_file.write(b"\0\0\0")
+
+    outbox = Outbox(path)
+    assert outbox.pending == 1
+    assert _titles(outbox) == ["Kept"]
+    outbox.close()
+
+
+def test_expired_notifications_are_dropped(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox"), ttl=0.05)
+    outbox.put(Notification(title="Old"))
+    outbox.put(Notification(title="Older"))
+    time.sleep(0.1)
+    outbox.put(Notification(title="New"))
+
+    assert _titles(outbox) == ["New"]
+    assert outbox.expired == 2
+    outbox.close()
+
+
+def test_full_outbox_compacts_then_drops_the_oldest(tmp_path):
+    record = len(Notification(title="N00").as_dict().__repr__()) + 64
+    outbox = Outbox(str(tmp_path / "outbox"), max_bytes=HEADER.size + 4 * record)
+    size = os.path.getsize(outbox.path)
+
+    for index in range(3):
+        outbox.put(Notification(title=f"N{index:02}"))
+    assert _titles(outbox)[:1] == ["N00"]
+
+    # Delivered records are compacted away before anything is dropped.
+    for index in range(3, 40):
+        outbox.put(Notification(title=f"N{index:02}"))
+    assert outbox.dropped > 0
+    remaining = _titles(outbox)
+    assert remaining == sorted(remaining)
+    assert remaining[-1] == "N39"
+    assert outbox.dropped + len(remaining) == 37
+    assert os.path.getsize(outbox.path) == size
+    outbox.close()
+
+
+def test_notify_queues_until_the_notifier_recovers(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox"), retry_interval=0.02)
+    notification = notifypy.Notify(
+        use_custom_notifier=FlakyNotifier,
+        outbox=outbox,
+        dispatcher=NotificationDispatcher(max_workers=1),
+    )
+    notifier = notification._notifier
+
+    for title in ("A", "B", "C"):
+        notification.title = title
+        assert notification.send() == False
+    assert outbox.pending == 3
+
+    notifier.up = True
+    # Queued behind the pending notifications, unless they're delivered by now.
+    notification.title = "D"
+    notification.send()
+
+    waited = threading.Event()
+    for _ in range(200):
+        if len(notifier.sent) == 4:
+            break
+        waited.wait(0.02)
+    assert notifier.sent == ["A", "B", "C", "D"]
+    assert outbox.delivered >= 3
+
+    notification.title = "E"
+    assert notification.send() == True
+    outbox.close()
+    notification._dispatcher.shutdown()
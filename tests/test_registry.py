@@ -0,0 +1,62 @@
+import gc
+import platform
+import weakref
+
+import notifypy
+from notifypy import NotificationAggregator
+from notifypy.registry import BackendRegistry, backend_registry, notifier_kwargs
+
+
+def test_notifier_is_shared():
+    first, second = notifypy.Notify(), notifypy.Notify()
+    assert first._notifier is second._notifier
+
+
+def test_different_arguments_get_their_own_notifier():
+    first = notifypy.Notify()
+    second = notifypy.Notify(linux_dbus_pool_size=1)
+    assert first._notifier is not second._notifier
+
+
+def test_notify_only_arguments_share_the_notifier():
+    shared = notifypy.Notify()._notifier
+    aggregators = []
+    for _ in range(10):
+        aggregator = NotificationAggregator()
+        aggregators.append(weakref.ref(aggregator))
+        notification = notifypy.Notify(aggregator=aggregator, send_timeout=5)
+        assert notification._notifier is shared
+    del aggregator, notification
+
+    # The registry doesn't keep them alive.
+    gc.collect()
+    assert not [ref for ref in aggregators if ref() is not None]
+
+
+def test_notifier_kwargs():
+    assert notifier_kwargs(
+        dict(linux_dbus_timeout=1, macos_persistent_helper=True, retry=object())
+    ) == dict(linux_dbus_timeout=1, macos_persistent_helper=True)
+
+
+def test_platform_is_detected_once(monkeypatch):
+    calls = []
+    system = platform.system
+
+    def counting_system():
+        calls.append(1)
+        return system()
+
+    monkeypatch.setattr(platform, "system", counting_system)
+    registry = BackendRegistry()
+    for _ in range(5):
+        registry.notifier_class()
+    assert len(calls) == 1
+
+
+def test_refresh():
+    before = notifypy.Notify()
+    backend_registry.refresh()
+    after = notifypy.Notify()
+    assert before._notifier is not after._notifier
+    assert before._notifier_detect is after._notifier_detect
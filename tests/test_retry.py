@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+import notifypy
+from notifypy import BaseNotifier
+from notifypy.exceptions import NotificationFailure
+from notifypy.instrumentation import Instrumentation
+from notifypy.retry import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RetryPolicy
+
+
+class ScriptedNotifier(BaseNotifier):
+    """Returns (or raises) the next of its results; succeeds once they run out."""
+
+    def __init__(self, **kwargs):
+        self.results = []
+        self.calls = 0
+
+    def send_notification(self, **kwargs):
+        self.calls += 1
+        result = self.results.pop(0) if self.results else True
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _notify(**kwargs):
+    return notifypy.Notify(use_custom_notifier=ScriptedNotifier, **kwargs)
+
+
+@pytest.fixture
+def events(monkeypatch):
+    instrumentation = Instrumentation()
+    recorded = []
+    instrumentation.add_hooks(on_event=lambda event, fields: recorded.append(event))
+    monkeypatch.setattr("notifypy.notify.instrumentation", instrumentation)
+    monkeypatch.setattr("notifypy.retry.instrumentation", instrumentation)
+    return recorded
+
+
+def test_delays_grow_exponentially():
+    retry = RetryPolicy(backoff=0.1, multiplier=2, max_backoff=0.3, jitter=0)
+    assert [retry.delay(attempt) for attempt in (1, 2, 3)] == [0.1, 0.2, 0.3]
+
+    retry = RetryPolicy(backoff=1, jitter=0.5)
+    assert all(0.5 <= retry.delay(1) <= 1.5 for _ in range(100))
+
+
+def test_transient_failures_are_retried(events):
+    notification = _notify(retry=RetryPolicy(attempts=3, backoff=0))
+    notification._notifier.results = [False, RuntimeError("busy"), True]
+    assert notification.send_notification("T", "M", "App", "normal", "", None)
+    assert notification._notifier.calls == 3
+    assert events == ["retry", "retry"]
+
+
+def test_gives_up_after_the_last_attempt():
+    notification = _notify(retry=RetryPolicy(attempts=2, backoff=0))
+    notification._notifier.results = [False, False, True]
+    assert notification.send_notification("T", "M", "App", "normal", "", None) == False
+    assert notification._notifier.calls == 2
+
+    notification._notifier.results = [RuntimeError("down")] * 2
+    with pytest.raises(NotificationFailure):
+        notification.send_notification("T", "M", "App", "normal", "", None)
+
+
+def test_false_is_not_retried_unless_asked():
+    notification = _notify(retry=RetryPolicy(backoff=0, retry_on_false=False))
+    notification._notifier.results = [False]
+    assert notification.send_notification("T", "M", "App", "normal", "", None) == False
+    assert notification._notifier.calls == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers(events):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    notification = _notify(circuit_breaker=breaker)
+    notifier = notification._notifier
+    send = lambda: notification.send_notification("T", "M", "App", "normal", "", None)
+
+    notifier.results = [False, False]
+    assert send() == False and send() == False
+    assert breaker.state("ScriptedNotifier") == OPEN
+
+    # Open: the notifier isn't called.
+    assert send() == False
+    assert notifier.calls == 2
+
+    # A failed probe opens it again, a successful one closes it.
+    breaker._circuits["ScriptedNotifier"].opened_at -= 60
+    notifier.results = [False]
+    assert send() == False
+    assert breaker.state("ScriptedNotifier") == OPEN
+    breaker._circuits["ScriptedNotifier"].opened_at -= 60
+    assert send() == True
+    assert breaker.state("ScriptedNotifier") == CLOSED
+    assert notifier.calls == 4
+
+    assert events == [
+        "circuit_open",
+        "circuit_rejected",
+        "circuit_half_open",
+        "circuit_open",
+        "circuit_half_open",
+        "circuit_closed",
+    ]
+
+
+def test_open_circuit_stops_retrying():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    notification = _notify(
+        retry=RetryPolicy(attempts=5, backoff=0), circuit_breaker=breaker
+    )
+    notification._notifier.results = [False] * 5
+    assert notification.send_notification("T", "M", "App", "normal", "", None) == False
+    assert notification._notifier.calls == 2
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure("Backend")
+    assert breaker.allow("Backend")
+    assert breaker.state("Backend") == HALF_OPEN
+    assert not breaker.allow("Backend")
+
+    breaker.reset()
+    assert breaker.states == {"Backend": CLOSED}
+
+
+def test_async_retries():
+    notification = _notify(retry=RetryPolicy(attempts=2, backoff=0))
+    notification._notifier.results = [False]
+    assert asyncio.run(notification.send_async()) == True
+    assert notification._notifier.calls == 2
+
+
+def test_circuit_states_are_collected():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure("Collected")
+    text = Instrumentation().prometheus_text()
+    assert 'backend="Collected",state="open"} 1' in text
+    assert 'backend="Collected",state="closed"} 0' in text
+
+
+def test_retries_stop_at_the_deadline():
+    notification = _notify(retry=RetryPolicy(attempts=5, backoff=1), send_timeout=0.2)
+    notification._notifier.results = [False] * 5
+    started = time.monotonic()
+    assert notification.send_notification("T", "M", "App", "normal", "", None) == False
+    assert time.monotonic() - started < 0.5
+    assert notification._notifier.calls == 1
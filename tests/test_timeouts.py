@@ -0,0 +1,163 @@
+import asyncio
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+import notifypy
+from notifypy import BaseNotifier, NotificationAggregator, NotificationDispatcher
+from notifypy.exceptions import NotificationTimeout
+from notifypy.os_notifiers import linux
+
+
+class SlowNotifier(BaseNotifier):
+    """Takes `delay` seconds, unless send_timeout runs out first."""
+
+    delay = 0.5
+
+    def __init__(self, **kwargs):
+        self.sent = []
+        self.timeouts = []
+
+    def send_notification(self, send_timeout=None, **kwargs):
+        self.timeouts.append(send_timeout)
+        if send_timeout is not None and send_timeout < self.delay:
+            time.sleep(send_timeout)
+            raise TimeoutError
+        time.sleep(self.delay)
+        self.sent.append(kwargs["notification_title"])
+        return True
+
+
+def _notify(**kwargs):
+    return notifypy.Notify(
+        use_custom_notifier=SlowNotifier,
+        dispatcher=NotificationDispatcher(max_workers=1),
+        **kwargs,
+    )
+
+
+def test_send_returns_false_at_the_deadline():
+    notification = _notify()
+    started = time.monotonic()
+    assert notification.send(timeout=0.1) == False
+    assert time.monotonic() - started < 0.4
+    assert 0 < notification._notifier.timeouts[0] <= 0.1
+
+
+def test_future_raises_notification_timeout():
+    notification = _notify(send_timeout=0.1)
+    future = notification.send(block=False)
+    with pytest.raises(NotificationTimeout):
+        future.result(timeout=5)
+    # It's a TimeoutError too.
+    assert isinstance(future.exception(), TimeoutError)
+
+
+def test_expired_notifications_are_not_sent():
+    notification = _notify()
+    busy = notification.send(block=False)
+    notification.title = "Stale"
+    stale = notification.send(block=False, timeout=0.1)
+
+    assert busy.result(timeout=5) == True
+    with pytest.raises(NotificationTimeout):
+        stale.result(timeout=5)
+    assert notification._notifier.sent == ["Default Title"]
+    assert len(notification._notifier.timeouts) == 1
+
+
+def test_without_timeout_nothing_is_passed():
+    notification = _notify()
+    assert notification.send() == True
+    assert notification._notifier.timeouts == [None]
+
+
+def test_aggregated_sends_have_the_deadline():
+    notification = _notify(aggregator=NotificationAggregator(window=0.05))
+    notification._notifier.delay = 0
+    assert notification.send(timeout=5) == True
+    assert notification.send(timeout=5) == True  # Merged.
+    notification._aggregator.close()
+    notification._dispatcher.shutdown()
+
+    first, summary = notification._notifier.timeouts
+    assert 0 < first <= 5
+    # Summaries are sent later, without the original deadline.
+    assert summary is None
+
+
+def test_aggregated_sends_without_timeout_have_no_deadline():
+    notification = _notify(aggregator=NotificationAggregator(window=0.2))
+    notification._notifier.delay = 0
+    assert notification.send() == True
+    notification._aggregator.close()
+    notification._dispatcher.shutdown()
+    assert notification._notifier.timeouts == [None]
+
+
+def test_handles_have_the_deadline():
+    notification = _notify(send_timeout=5)
+    notification._notifier.delay = 0
+    handle = notification.send(handle=True, timeout=0.2)
+    handle.update(title="Updated").result(timeout=5)
+
+    sent, updated = notification._notifier.timeouts
+    assert 0 < sent <= 0.2
+    assert 0.2 < updated <= 5
+
+    notification._notifier.delay = 0.5
+    assert notification.send(handle=True, timeout=0.1) is not None
+    assert notification._notifier.timeouts[-1] <= 0.1
+
+
+def test_async_deadline():
+    notification = _notify()
+    with pytest.raises(NotificationTimeout):
+        asyncio.run(notification.send_async(timeout=0.1))
+
+
+@pytest.fixture
+def hanging_notify_send(tmp_path, monkeypatch):
+    """A notify-send that writes its pid and hangs."""
+    pid_file = tmp_path / "pid"
+    stub = tmp_path / "notify-send"
+    stub.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+    stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    linux.find_notify_send.cache_clear()
+    yield pid_file
+    linux.find_notify_send.cache_clear()
+
+
+def _killed(pid_file):
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        threading.Event().wait(0.02)
+    return False
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a shell script as notify-send")
+def test_hung_notify_send_is_killed(hanging_notify_send):
+    notification = notifypy.Notify(
+        use_custom_notifier=linux.LinuxNotifierLibNotify,
+        dispatcher=NotificationDispatcher(max_workers=1),
+    )
+    future = notification.send(block=False, timeout=0.3)
+    with pytest.raises(NotificationTimeout):
+        future.result(timeout=5)
+    assert _killed(hanging_notify_send)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a shell script as notify-send")
+def test_hung_notify_send_is_killed_async(hanging_notify_send):
+    notification = notifypy.Notify(use_custom_notifier=linux.LinuxNotifierLibNotify)
+    with pytest.raises(NotificationTimeout):
+        asyncio.run(notification.send_async(timeout=0.3))
+    assert _killed(hanging_notify_send)
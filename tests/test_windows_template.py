@@ -0,0 +1,106 @@
+from xml.etree import ElementTree
+
+import pytest
+
+from notifypy.os_notifiers.windows import WindowsNotifier
+
+
+def reference_toast_script(
+    application_id,
+    notification_title,
+    notification_subtitle,
+    notification_icon,
+    notification_audio,
+):
+    """The toast script as it was built with ElementTree before it was templated."""
+    top_element = ElementTree.Element("toast")
+    top_element.set("duration", "short")
+    visual_element = ElementTree.SubElement(top_element, "visual")
+    binding_element = ElementTree.SubElement(visual_element, "binding")
+    binding_element.set("template", "ToastImageAndText02")
+    image_element = ElementTree.SubElement(binding_element, "image")
+    image_element.set("id", "1")
+    image_element.set("src", notification_icon)
+    title_element = ElementTree.SubElement(binding_element, "text")
+    title_element.set("id", "1")
+    title_element.text = notification_title
+    message_element = ElementTree.SubElement(binding_element, "text")
+    message_element.set("id", "2")
+    message_element.text = notification_subtitle
+    if notification_audio:
+        audio_element = ElementTree.SubElement(top_element, "audio")
+        audio_element.set("silent", "true")
+
+    return f"""$APP_ID = "{application_id}"
+
+$template = @"
+{ElementTree.tostring(top_element, encoding="utf-8").decode('utf-8')}
+"@
+
+$xml = New-Object Windows.Data.Xml.Dom.XmlDocument
+$xml.LoadXml($template)
+$toast = New-Object Windows.UI.Notifications.ToastNotification $xml
+[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier($APP_ID).Show($toast)
+"""
+
+
+TEXTS = [
+    "",
+    "Default Title",
+    "Tom & Jerry <tom@example.com> > 3",
+    "He said \"hi\" and 'bye'",
+    "line one\nline two\r\nthree\ttabbed",
+    "&amp; already escaped &#10;",
+    '{braces} {0} %s $APP_ID @"',
+    "Grüße, 東京, emoji 🎉",
+    "]]> <![CDATA[",
+]
+
+ICONS = [
+    "",
+    "C:\\Users\\me\\icon.png",
+    'C:\\odd "name" & <dir>\\tab\there\nline.png',
+    "C:\\Grüße\\🎉.png",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("audio", [None, "C:\\sound.wav"])
+def test_toast_script_matches_elementtree(text, audio):
+    arguments = ("Python Application (notify.py)", text, text[::-1], ICONS[1], audio)
+    assert WindowsNotifier._generate_toast_script(*arguments) == reference_toast_script(
+        *arguments
+    )
+
+
+@pytest.mark.parametrize("icon", ICONS)
+def test_icon_attribute_matches_elementtree(icon):
+    arguments = ("app", "Title", "Message", icon, None)
+    assert WindowsNotifier._generate_toast_script(*arguments) == reference_toast_script(
+        *arguments
+    )
+
+
+def test_batch_file_matches_elementtree():
+    notifications = [
+        dict(
+            application_name="app",
+            notification_title=title,
+            notification_subtitle="Message",
+            notification_icon=ICONS[2],
+            notification_audio=None,
+        )
+        for title in TEXTS
+    ]
+    notifier = WindowsNotifier()
+    expected = f"\n{notifier._top_ps1_script}\n" + "".join(
+        reference_toast_script(
+            notification["application_name"],
+            notification["notification_title"],
+            notification["notification_subtitle"],
+            notification["notification_icon"],
+            notification["notification_audio"],
+        )
+        for notification in notifications
+    )
+    assert notifier._generate_batch_ps1_file(notifications) == expected